@@ -1,31 +1,63 @@
 """
 Address cascading: streets by postcode, numbers by postcode+street.
+Answered from the address index built at load; `prefix` turns the lists into typeahead queries.
+GET /addresses/search?q=...: typo-tolerant free-text search over all buildings (trigram index).
+Index lookups are cheap, so these handlers run inline on the event loop (no worker pool).
 """
+from typing import Optional
+
 from fastapi import APIRouter, Query
 
-from backend.services.address_parser import (
-    get_unique_numbers_for_street,
-    get_unique_streets_for_postcode,
-)
-from backend.services.excel_loader import get_buildings
+from backend.services.address_parser import get_numbers as index_numbers
+from backend.services.address_parser import get_postcodes as index_postcodes
+from backend.services.address_parser import get_streets as index_streets
+from backend.services.address_search import search_addresses
+from backend.services.excel_loader import get_indexes
+from backend.services.metrics import stage
 
 router = APIRouter()
 
 
+@router.get("/postcodes")
+async def get_postcodes(prefix: str = Query("", description="Postcode prefix")) -> dict:
+    """Return postcodes that exist in DB and start with prefix."""
+    postcodes = index_postcodes(get_indexes()["addresses"], prefix)
+    return {"prefix": prefix, "postcodes": postcodes}
+
+
 @router.get("/streets")
-def get_streets(postcode: str = Query(..., description="Postal code")) -> dict:
+async def get_streets(
+    postcode: str = Query(..., description="Postal code"),
+    prefix: Optional[str] = Query(None, description="Street name prefix (typeahead); postcode then matches as prefix"),
+) -> dict:
     """Return list of street names that exist in DB for this postcode."""
-    df = get_buildings()
-    streets = get_unique_streets_for_postcode(df, postcode)
+    with stage("address.streets"):
+        streets = index_streets(get_indexes()["addresses"], postcode, prefix)
     return {"postcode": postcode, "streets": streets}
 
 
 @router.get("/numbers")
-def get_numbers(
+async def get_numbers(
     postcode: str = Query(..., description="Postal code"),
     street: str = Query(..., description="Street name"),
+    prefix: Optional[str] = Query(None, description="House number prefix (typeahead)"),
 ) -> dict:
     """Return list of house numbers that exist in DB for this postcode and street."""
-    df = get_buildings()
-    numbers = get_unique_numbers_for_street(df, postcode, street)
+    with stage("address.numbers"):
+        numbers = index_numbers(get_indexes()["addresses"], postcode, street, prefix)
     return {"postcode": postcode, "street": street, "numbers": numbers}
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description="Free-text address, e.g. 'Zehlendorfer Strasse 43 a'"),
+    postcode: Optional[str] = Query(None, description="Only buildings in this postcode"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum results"),
+) -> dict:
+    """
+    Buildings ranked by how well their address matches q: spelling variants ("Str." / "Straße", umlauts,
+    "43 a" / "43a") and typos are tolerated. truncated is true when the time budget cut the search short.
+    """
+    with stage("address.search"):
+        found = search_addresses(get_indexes()["address_search"], q, postcode, limit)
+    return {"q": q, "postcode": postcode, **found}
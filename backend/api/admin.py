@@ -0,0 +1,39 @@
+"""
+Admin endpoints: reload the workbook without restarting workers.
+Enabled only when ADMIN_TOKEN is set; requests must send it as X-Admin-Token.
+"""
+import asyncio
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from backend.services.excel_loader import get_load_info, reload_data, start_reload
+
+router = APIRouter()
+
+
+def _check_token(token: Optional[str]) -> None:
+    expected = os.environ.get("ADMIN_TOKEN", "").strip()
+    if not expected:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not token or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/reload")
+async def post_reload(
+    wait: bool = Query(False, description="Wait for the reload to finish and return the new load info"),
+    x_admin_token: Optional[str] = Header(None),
+) -> dict:
+    """Rebuild frames and indexes in the background, then swap them in atomically."""
+    _check_token(x_admin_token)
+    if wait:
+        try:
+            info = await asyncio.to_thread(reload_data)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Reload failed: {e}") from e
+        return {"status": "reloaded", "data": info}
+    started = start_reload()
+    return {"status": "reloading" if started else "already_reloading", "data": get_load_info()}
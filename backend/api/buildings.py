@@ -1,86 +1,101 @@
 """
 Building search and get by id. Returns building row + optional Calculator-derived prefill (RentPerUnit, facade_sqm_suggestion, etc.).
+GET /buildings/{id}/energy: load-time energy rollups (mean, median, last 12 months, seasonal, monthly profile).
+Building payloads are serialized once at load; responses are rendered with orjson.
 """
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
-from backend.services.address_parser import parse_address
-from backend.services.calculator_service import get_facade_sqm_suggestion, run_calculator
-from backend.services.excel_loader import get_buildings
+from backend.api.responses import FastJSONResponse
+from backend.services.address_parser import find_building_id
+from backend.services.cache import cache_from_env
+from backend.services.calculator_service import get_energy_rollup, get_facade_sqm_suggestion, run_calculator
+from backend.services.excel_loader import add_reload_listener, get_snapshot
+from backend.services.metrics import stage
+from backend.services.worker_pool import run_in_pool
 
 router = APIRouter()
 
+# Prefill fields keyed by (data version, building_id)
+_prefill_cache = cache_from_env("prefill", "PREFILL")
+add_reload_listener(_prefill_cache.clear)
 
-def _row_to_building(row) -> Dict[str, Any]:
-    d = row.to_dict() if hasattr(row, "to_dict") else dict(row)
-    out = {}
-    for k, v in d.items():
-        if v is None:
-            continue
-        if hasattr(v, "item"):
-            v = v.item()
-        if isinstance(v, float) and (v != v or v == float("inf")):
-            continue
-        out[str(k)] = v
-    if "address" in out:
-        street, number = parse_address(str(out["address"]))
-        out["street"] = street
-        out["number"] = number
-    if "city" not in out and "district" in out:
-        out["city"] = "Berlin"
-    return out
-
-
-def _add_prefill(building: Dict[str, Any], building_id: str) -> Dict[str, Any]:
-    """Add facade_sqm_suggestion, RentPerUnit, EnergyCostsPerMonth from calculator."""
+
+def _compute_prefill(building_id: str) -> Dict[str, Any]:
+    prefill: Dict[str, Any] = {}
     suggestion = get_facade_sqm_suggestion(building_id)
     if suggestion is not None:
-        building["facade_sqm_suggestion"] = suggestion
+        prefill["facade_sqm_suggestion"] = suggestion
     try:
         calc = run_calculator(building_id, "Window replacement - triple glazing", {})
         if "error" not in calc:
-            building["RentPerUnit"] = calc.get("RentPerUnit")
-            building["EnergyCostsPerMonth"] = calc.get("EnergyCostsPerMonth")
+            prefill["RentPerUnit"] = calc.get("RentPerUnit")
+            prefill["EnergyCostsPerMonth"] = calc.get("EnergyCostsPerMonth")
     except Exception:
         pass
+    return prefill
+
+
+def _add_prefill(building: Dict[str, Any], building_id: str, version: str) -> Dict[str, Any]:
+    """Add facade_sqm_suggestion, RentPerUnit, EnergyCostsPerMonth from calculator (memoized per data version)."""
+    key = (version, building_id)
+    prefill = _prefill_cache.get(key)
+    if prefill is None:
+        with stage("buildings.prefill"):
+            prefill = _compute_prefill(building_id)
+        _prefill_cache.set(key, prefill)
+    building.update(prefill)
     return building
 
 
-@router.get("/search")
-def search_building(
+@router.get("/search", response_class=FastJSONResponse)
+async def search_building(
     postcode: str = Query(..., description="Postal code"),
     address: str = Query(..., description="Full address (street + number)"),
-) -> dict:
+) -> FastJSONResponse:
     """Find building by postal_code and address. Returns one building row."""
-    df = get_buildings()
+    return await run_in_pool(_search_building, postcode, address)
+
+
+def _search_building(postcode: str, address: str) -> FastJSONResponse:
+    snapshot = get_snapshot()
+    df = snapshot["buildings"]
     if "postal_code" not in df.columns or "address" not in df.columns:
         raise HTTPException(status_code=500, detail="Buildings data missing columns")
-    pc = str(postcode).strip()
-    addr = str(address).strip()
-    mask = (df["postal_code"].astype(str).str.strip() == pc) & (
-        df["address"].astype(str).str.strip() == addr
-    )
-    match = df[mask]
-    if match.empty:
+    indexes = snapshot["indexes"]
+    payload = indexes["building_payloads"].get(find_building_id(indexes["addresses"], postcode, address))
+    if payload is None:
         raise HTTPException(status_code=404, detail="Building not found")
-    row = match.iloc[0]
-    building = _row_to_building(row)
+    building = dict(payload)
     building_id = building.get("building_id")
     if building_id:
-        building = _add_prefill(building, str(building_id))
-    return building
+        building = _add_prefill(building, str(building_id), snapshot["version"])
+    return FastJSONResponse(building)
 
 
-@router.get("/{building_id}")
-def get_building(building_id: str) -> dict:
+@router.get("/{building_id}", response_class=FastJSONResponse)
+async def get_building(building_id: str) -> FastJSONResponse:
     """Get building by id with optional prefill (RentPerUnit, facade_sqm_suggestion)."""
-    df = get_buildings()
+    return await run_in_pool(_get_building, building_id)
+
+
+def _get_building(building_id: str) -> FastJSONResponse:
+    snapshot = get_snapshot()
+    df = snapshot["buildings"]
     if "building_id" not in df.columns:
         raise HTTPException(status_code=500, detail="Buildings data missing building_id")
-    match = df[df["building_id"].astype(str) == str(building_id)]
-    if match.empty:
+    payload = snapshot["indexes"]["building_payloads"].get(str(building_id))
+    if payload is None:
         raise HTTPException(status_code=404, detail="Building not found")
-    building = _row_to_building(match.iloc[0])
-    building = _add_prefill(building, str(building_id))
-    return building
+    building = _add_prefill(dict(payload), str(building_id), snapshot["version"])
+    return FastJSONResponse(building)
+
+
+@router.get("/{building_id}/energy", response_class=FastJSONResponse)
+async def get_building_energy(building_id: str) -> FastJSONResponse:
+    """Monthly energy cost and consumption rollups for one building (computed at load, O(1) lookup)."""
+    rollup = get_energy_rollup(building_id)
+    if rollup is None:
+        raise HTTPException(status_code=404, detail="No energy data for building")
+    return FastJSONResponse({"building_id": str(building_id), **rollup})
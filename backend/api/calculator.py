@@ -1,16 +1,41 @@
 """
 POST /calculator: run payback calculation with building_id, selected option, and overrides.
 Returns RetrofitCostTotal, RetrofitCostTotalAfterSubsidy, YearsUntilBreakeventRentIncrease, etc.
+POST /calculator/batch: same calculation for many buildings x options x override sets in one vectorized pass.
+GET /calculator/export: whole portfolio streamed as NDJSON or CSV, computed chunk by chunk.
+POST /calculator/sweep: one building over a grid of parameter values (what-if / break-even surfaces).
+GET /calculator/ranking: top buildings of a district/postcode by a payback or savings metric (POST with overrides).
+overrides.EnergyBasis picks the building's energy cost rollup: mean (default), median, last_12_months or seasonal.
 """
-from typing import Any, Dict, Optional
+import csv
+import io
+import math
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.services.calculator_service import run_calculator
+from backend.api.responses import FastJSONResponse, add_break_even_parts, check_energy_basis, dumps_json
+from backend.services.batch_calculator import RESULT_FIELDS
+from backend.services.excel_loader import get_indexes
+from backend.services.calculator_service import (
+    iter_calculator_chunks,
+    run_calculator,
+    run_calculator_batch,
+    run_calculator_ranking,
+    run_calculator_sweep,
+)
+from backend.services.worker_pool import run_in_pool
 
 router = APIRouter()
 
+WINDOW_SUB_TYPES = ["Window replacement - double glazing", "Window replacement - triple glazing"]
+MAX_BATCH_RESULTS = 200_000
+EXPORT_CHUNK_SIZE = 1000
+MAX_RANKING_LIMIT = 1000
+EXPORT_FIELDS = ["building_id", *RESULT_FIELDS, "years_until_break_even", "months_until_break_even", "error"]
+
 
 class CalculatorRequest(BaseModel):
     building_id: str
@@ -18,23 +43,224 @@ class CalculatorRequest(BaseModel):
     overrides: Optional[Dict[str, Any]] = None
 
 
-@router.post("")
-def post_calculator(body: CalculatorRequest) -> dict:
+class CalculatorBatchRequest(BaseModel):
+    building_ids: Optional[List[str]] = None
+    sub_types_of_retrofit: List[str] = WINDOW_SUB_TYPES
+    override_sets: Optional[List[Dict[str, Any]]] = None
+
+
+class CalculatorSweepRequest(BaseModel):
+    building_id: str
+    sub_type_of_retrofit: str
+    grid: Dict[str, Any]
+    overrides: Optional[Dict[str, Any]] = None
+    metrics: Optional[List[str]] = None
+
+
+class CalculatorRankingRequest(BaseModel):
+    sub_type_of_retrofit: str = WINDOW_SUB_TYPES[1]
+    metric: str = "YearsUntilBreakeventRentIncrease"
+    district: Optional[str] = None
+    postcode: Optional[str] = None
+    overrides: Optional[Dict[str, Any]] = None
+    limit: int = 50
+    offset: int = 0
+
+
+@router.post("", response_class=FastJSONResponse)
+async def post_calculator(body: CalculatorRequest) -> FastJSONResponse:
     """
     Run calculator for chosen retrofit option.
     sub_type_of_retrofit: "Window replacement - double glazing" or "Window replacement - triple glazing"
-    overrides: optional TotalSqm, NrUnits, RentPerUnit, EnergyCostsPerMonth, facade_sqm, WindowToFloorRatio, etc.
+    overrides: optional TotalSqm, NrUnits, RentPerUnit, EnergyCostsPerMonth, EnergyBasis, facade_sqm, WindowToFloorRatio, etc.
     """
-    result = run_calculator(
+    check_energy_basis(body.overrides)
+    result = await run_in_pool(
+        run_calculator,
         body.building_id,
         body.sub_type_of_retrofit,
         body.overrides or {},
     )
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
-    years = result.get("YearsUntilBreakeventRentIncrease", 0)
-    years_int = int(years)
-    months = round((years - years_int) * 12)
-    result["years_until_break_even"] = years_int
-    result["months_until_break_even"] = months
-    return result
+    # Rendered by FastJSONResponse, so serialization shows up as its own "serialize" stage
+    return FastJSONResponse(add_break_even_parts(result))
+
+
+@router.post("/batch")
+async def post_calculator_batch(body: CalculatorBatchRequest) -> dict:
+    """
+    Run calculator for building_ids (all buildings if omitted) x sub_types_of_retrofit x override_sets.
+    Each result equals POST /calculator for that combination, plus building_id and override_set (index);
+    unknown buildings get an "error" entry instead of failing the whole batch.
+    """
+    n_sets = len(body.override_sets) if body.override_sets else 1
+    if body.building_ids is not None:
+        n_buildings = len(body.building_ids)
+    else:
+        n_buildings = len(get_indexes()["calculator_columns"]["ids"])
+    n_results = n_buildings * len(body.sub_types_of_retrofit) * n_sets
+    if n_results > MAX_BATCH_RESULTS:
+        raise HTTPException(status_code=413, detail=f"Batch too large ({n_results} > {MAX_BATCH_RESULTS} results)")
+    results = await run_in_pool(
+        run_calculator_batch, body.building_ids, body.sub_types_of_retrofit, body.override_sets
+    )
+    for result in results:
+        years = result.get("YearsUntilBreakeventRentIncrease")
+        if years is not None and math.isfinite(years):
+            add_break_even_parts(result)
+    return {"count": len(results), "results": results}
+
+
+@router.post("/sweep", response_class=FastJSONResponse)
+async def post_calculator_sweep(body: CalculatorSweepRequest) -> FastJSONResponse:
+    """
+    Evaluate the calculator over the cartesian product of grid axes for one building.
+    grid: e.g. {"WindowSubsidyParameter": [0.5, 0.65, 0.8], "RentIncreasePct": {"start": 0.02, "stop": 0.08, "num": 7}}.
+    Sweepable: TotalSqm, NrUnits, EnergyCostsPerMonth, EnergyPriceFactor, RentPerUnit, WindowToFloorRatio,
+    WindowSubsidyParameter, RentIncreasePct, cost_per_m2, savings_pct.
+    outputs[metric] is a nested array with one dimension per grid parameter, in grid order.
+    """
+    check_energy_basis(body.overrides)
+    try:
+        result = await run_in_pool(
+            run_calculator_sweep, body.building_id, body.sub_type_of_retrofit, body.grid, body.overrides, body.metrics
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return FastJSONResponse(result)
+
+
+def _ranking(
+    sub_type: str,
+    metric: str,
+    district: Optional[str],
+    postcode: Optional[str],
+    overrides: Optional[Dict[str, Any]],
+    limit: int,
+    offset: int,
+) -> FastJSONResponse:
+    if not 1 <= limit <= MAX_RANKING_LIMIT or offset < 0:
+        raise HTTPException(status_code=422, detail=f"limit must be 1..{MAX_RANKING_LIMIT} and offset >= 0")
+    try:
+        result = run_calculator_ranking(sub_type, metric, district, postcode, overrides, limit, offset)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    for row in result["results"]:
+        years = row.get("YearsUntilBreakeventRentIncrease")
+        if years is not None and math.isfinite(years):
+            add_break_even_parts(row)
+    return FastJSONResponse(result)
+
+
+@router.get("/ranking", response_class=FastJSONResponse)
+async def get_calculator_ranking(
+    sub_type: str = Query(WINDOW_SUB_TYPES[1], description="Retrofit subtype"),
+    metric: str = Query("YearsUntilBreakeventRentIncrease", description="Calculator output to rank by"),
+    district: Optional[str] = Query(None),
+    postcode: Optional[str] = Query(None),
+    limit: int = Query(50),
+    offset: int = Query(0),
+) -> FastJSONResponse:
+    """
+    Top buildings by metric within district and/or postcode (whole portfolio if neither is given).
+    Payback metrics rank ascending and skip buildings that never pay back; savings metrics rank descending.
+    Pages are sliced from rankings built at load time.
+    """
+    return await run_in_pool(_ranking, sub_type, metric, district, postcode, None, limit, offset)
+
+
+@router.post("/ranking", response_class=FastJSONResponse)
+async def post_calculator_ranking(body: CalculatorRankingRequest) -> FastJSONResponse:
+    """Same as GET /calculator/ranking with overrides applied to every building (computed per request)."""
+    check_energy_basis(body.overrides)
+    return await run_in_pool(
+        _ranking,
+        body.sub_type_of_retrofit,
+        body.metric,
+        body.district,
+        body.postcode,
+        body.overrides,
+        body.limit,
+        body.offset,
+    )
+
+
+def _export_rows(sub_types: List[str]) -> Iterator[Dict[str, Any]]:
+    for chunk in iter_calculator_chunks(sub_types, chunk_size=EXPORT_CHUNK_SIZE):
+        for result in chunk:
+            result.pop("override_set", None)
+            years = result.get("YearsUntilBreakeventRentIncrease")
+            if years is not None and math.isfinite(years):
+                add_break_even_parts(result)
+            yield result
+
+
+def _ndjson_lines(sub_types: List[str]) -> Iterator[bytes]:
+    buf: List[bytes] = []
+    for result in _export_rows(sub_types):
+        buf.append(dumps_json(result))
+        if len(buf) >= EXPORT_CHUNK_SIZE:
+            yield b"\n".join(buf) + b"\n"
+            buf = []
+    if buf:
+        yield b"\n".join(buf) + b"\n"
+
+
+def _csv_lines(sub_types: List[str]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for n, result in enumerate(_export_rows(sub_types), start=1):
+        writer.writerow(result)
+        if n % EXPORT_CHUNK_SIZE == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+async def _pooled(lines: Iterator[Any]) -> AsyncIterator[Any]:
+    """Advance a chunk generator on the worker pool, one chunk per pool job."""
+    while True:
+        chunk = await run_in_pool(next, lines, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+async def _stream(lines: Iterator[Any]) -> AsyncIterator[Any]:
+    # The first chunk is computed before the response starts, so a full pool still gets its 503
+    first = await run_in_pool(next, lines, None)
+
+    async def _chunks() -> AsyncIterator[Any]:
+        if first is None:
+            return
+        yield first
+        async for chunk in _pooled(lines):
+            yield chunk
+
+    return _chunks()
+
+
+@router.get("/export")
+async def export_calculator(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    sub_type: Optional[List[str]] = Query(None, description="Retrofit subtype(s); default double and triple glazing"),
+) -> StreamingResponse:
+    """
+    Stream calculator results for every building (one row per building x subtype).
+    Rows are computed EXPORT_CHUNK_SIZE buildings at a time, so memory stays flat and the first rows arrive immediately.
+    """
+    sub_types = sub_type or WINDOW_SUB_TYPES
+    if format == "csv":
+        return StreamingResponse(
+            await _stream(_csv_lines(sub_types)),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="calculator_export.csv"'},
+        )
+    return StreamingResponse(await _stream(_ndjson_lines(sub_types)), media_type="application/x-ndjson")
@@ -1,36 +1,62 @@
 """
-GET /contractors?specialization=window: filter by specialization containing "window" (case-insensitive).
+GET /contractors?specialization=window: contractors whose specialization contains the given term(s) (case-insensitive).
+Served from an inverted token index built at load: multi-term AND/OR queries, district/postcode filters,
+relevance or rating order, limit/offset pagination.
 """
-from typing import Any, Dict, List
+from typing import Optional
 
 from fastapi import APIRouter, Query
 
-from backend.services.excel_loader import get_contractors
+from backend.api.responses import FastJSONResponse
+from backend.services.contractor_index import search_contractors
+from backend.services.excel_loader import get_snapshot
+from backend.services.worker_pool import run_in_pool
 
 router = APIRouter()
 
 
-@router.get("")
-def list_contractors(
-    specialization: str = Query("window", description="Filter by specialization (e.g. window)"),
-) -> dict:
-    """Return contractors whose specialization contains the given word (case-insensitive)."""
-    df = get_contractors()
-    if df is None or df.empty:
-        return {"contractors": []}
-    word = str(specialization).strip().lower()
-    if not word:
-        return {"contractors": []}
-    if "specialization" not in df.columns:
-        return {"contractors": []}
-    mask = df["specialization"].astype(str).str.lower().str.contains(word, na=False)
-    subset = df[mask]
-    contractors: List[Dict[str, Any]] = []
-    for _, row in subset.iterrows():
-        d = row.to_dict()
-        out = {}
-        for k, v in d.items():
-            if v is not None and (not hasattr(v, "__float__") or str(v) != "nan"):
-                out[str(k)] = v
-        contractors.append(out)
-    return {"contractors": contractors}
+@router.get("", response_class=FastJSONResponse)
+async def list_contractors(
+    specialization: str = Query("window", description="Search terms (e.g. window or 'window facade')"),
+    mode: str = Query("and", pattern="^(and|or)$", description="Match all terms (and) or any term (or)"),
+    district: Optional[str] = Query(None, description="Only contractors serving this district"),
+    postcode: Optional[str] = Query(None, description="Only contractors serving this postcode (or its districts)"),
+    sort: str = Query("relevance", pattern="^(relevance|rating)$", description="relevance or rating"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    offset: int = Query(0, ge=0, description="Page start"),
+) -> FastJSONResponse:
+    """Return contractors whose specialization contains the given word(s) (case-insensitive)."""
+    return await run_in_pool(_list_contractors, specialization, mode, district, postcode, sort, limit, offset)
+
+
+def _list_contractors(
+    specialization: str,
+    mode: str,
+    district: Optional[str],
+    postcode: Optional[str],
+    sort: str,
+    limit: Optional[int],
+    offset: int,
+) -> FastJSONResponse:
+    indexes = get_snapshot()["indexes"]
+    index = indexes["contractor_index"]
+    districts = [district] if district else None
+    pc = None
+    if postcode:
+        if index["postcodes"]:
+            pc = postcode
+        else:
+            # No postcode column: match contractors serving the districts this postcode lies in;
+            # with a district as well, both filters apply (no results if the postcode is not in it)
+            pc_districts = indexes["postcode_districts"].get(str(postcode).strip(), [])
+            if district:
+                wanted = district.strip().lower()
+                pc_districts = [d for d in pc_districts if str(d).strip().lower() == wanted]
+            districts = pc_districts
+    positions = search_contractors(index, specialization, mode, districts, pc, sort)
+    total = len(positions)
+    page = positions[offset : offset + limit] if limit is not None else positions[offset:]
+    payloads = indexes["contractors"]
+    return FastJSONResponse(
+        {"contractors": [payloads[i] for i in page], "total": total, "limit": limit, "offset": offset}
+    )
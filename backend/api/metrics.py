@@ -0,0 +1,80 @@
+"""
+GET /metrics: Prometheus text format.
+Route and stage latency histograms, cache hit ratios, worker pool queue/compute time and dataset sizes.
+"""
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.services.cache import get_cache_stats
+from backend.services.excel_loader import get_load_info
+from backend.services.metrics import gauge_lines, render_histograms
+from backend.services.worker_pool import get_worker_pool
+
+router = APIRouter()
+
+
+def _cache_lines() -> List[str]:
+    stats = get_cache_stats()
+    lines: List[str] = []
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        suffix = "_total" if kind == "counter" else ""
+        lines += gauge_lines(
+            f"heatmykiez_cache_{field}{suffix}",
+            f"Cache {field}",
+            (({"cache": name}, s[field]) for name, s in stats.items()),
+            kind,
+        )
+    lines += gauge_lines(
+        "heatmykiez_cache_hit_ratio",
+        "Cache hits / lookups",
+        (({"cache": name}, s["hits"] / max(s["hits"] + s["misses"], 1)) for name, s in stats.items()),
+    )
+    return lines
+
+
+def _pool_lines() -> List[str]:
+    s = get_worker_pool().stats()
+    return (
+        gauge_lines("heatmykiez_pool_in_flight", "Data calls running or queued", [({}, s["in_flight"])])
+        + gauge_lines("heatmykiez_pool_completed_total", "Data calls completed", [({}, s["completed"])], "counter")
+        + gauge_lines("heatmykiez_pool_rejected_total", "Data calls shed with 503", [({}, s["rejected"])], "counter")
+        + gauge_lines(
+            "heatmykiez_pool_queue_seconds_total", "Time data calls waited for a worker", [({}, s["queue_seconds_total"])], "counter"
+        )
+        + gauge_lines(
+            "heatmykiez_pool_compute_seconds_total", "Time data calls ran on a worker", [({}, s["compute_seconds_total"])], "counter"
+        )
+    )
+
+
+def _data_lines() -> List[str]:
+    info = get_load_info()
+    if not info:
+        return []
+    return (
+        gauge_lines(
+            "heatmykiez_data_info",
+            "Loaded data version and load path",
+            [({"version": info.get("version", ""), "source": info.get("source", "")}, 1)],
+        )
+        + gauge_lines("heatmykiez_data_load_seconds", "Duration of the last data load", [({}, info.get("seconds", 0.0))])
+        + gauge_lines("heatmykiez_dataset_rows", "Rows per sheet", (({"sheet": k}, v) for k, v in info.get("rows", {}).items()))
+        + gauge_lines(
+            "heatmykiez_dataset_memory_bytes",
+            "In-memory size per sheet",
+            (({"sheet": k}, v) for k, v in info.get("memory_bytes", {}).items()),
+        )
+        + gauge_lines(
+            "heatmykiez_dataset_raw_memory_bytes",
+            "In-memory size per sheet as read, before dtype normalization",
+            (({"sheet": k}, v) for k, v in info.get("memory_bytes_raw", {}).items()),
+        )
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    lines = render_histograms() + _cache_lines() + _pool_lines() + _data_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
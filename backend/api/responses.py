@@ -0,0 +1,62 @@
+"""
+JSON response class rendered with orjson when it is installed (falls back to the stdlib encoder).
+Routes that return precomputed payloads return it directly, which also skips FastAPI's response validation.
+Also the request/response helpers shared by the calculator and wizard routes.
+"""
+import json
+import math
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.services.energy_rollups import ENERGY_BASES
+from backend.services.metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _finite(value: Any) -> Any:
+    """Non-finite floats -> None, as orjson writes them (stdlib json would emit bare NaN/Infinity)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def dumps_json(content: Any) -> bytes:
+    """Strict JSON (NaN/Infinity -> null) for streamed payloads, with orjson when it is installed."""
+    if orjson is None:
+        return json.dumps(_finite(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            if orjson is None:
+                return super().render(content)
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def check_energy_basis(overrides: Optional[Dict[str, Any]]) -> None:
+    """422 for an overrides.EnergyBasis that is not one of ENERGY_BASES."""
+    basis = (overrides or {}).get("EnergyBasis")
+    if basis is not None and basis not in ENERGY_BASES:
+        raise HTTPException(status_code=422, detail=f"EnergyBasis must be one of {list(ENERGY_BASES)}")
+
+
+def add_break_even_parts(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Split YearsUntilBreakeventRentIncrease into years_until_break_even and months_until_break_even."""
+    years = result.get("YearsUntilBreakeventRentIncrease", 0)
+    years_int = int(years)
+    months = round((years - years_int) * 12)
+    result["years_until_break_even"] = years_int
+    result["months_until_break_even"] = months
+    return result
@@ -0,0 +1,38 @@
+"""
+GET /stats: pre-aggregated portfolio statistics with drill-down (see backend.services.stats_cube).
+?group_by=district -> one cell per district; add filters to drill down, e.g.
+?district=Mitte&group_by=postcode -> the postcodes of Mitte; ?district=Mitte&postcode=10115&group_by=building_type.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.api.responses import FastJSONResponse
+from backend.services.excel_loader import get_snapshot
+from backend.services.stats_cube import query_stats
+
+router = APIRouter()
+
+
+@router.get("", response_class=FastJSONResponse)
+async def get_stats(
+    group_by: Optional[List[str]] = Query(None, description="district, postcode and/or building_type"),
+    district: Optional[str] = Query(None),
+    postcode: Optional[str] = Query(None),
+    building_type: Optional[str] = Query(None),
+) -> FastJSONResponse:
+    """
+    total: buildings, units, sqm (total, mean, quartiles), window type mix, energy cost and consumption,
+    average rent and, per window retrofit, cost after subsidy, energy savings and break-even quartiles;
+    for the cell selected by the filters. groups: the same per group_by value. Served from the load-time cube.
+    """
+    snapshot = get_snapshot()
+    dims = [d.strip() for value in group_by or [] for d in value.split(",") if d.strip()]
+    filters = {"district": district, "postcode": postcode, "building_type": building_type}
+    try:
+        result = query_stats(snapshot["stats"], dims, filters)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return FastJSONResponse({"version": snapshot["version"], **result})
@@ -0,0 +1,56 @@
+"""
+Wizard bootstrap: building, prefill, applicable window options and their calculator results in one round-trip.
+GET /wizard/bootstrap?building_id=... (or postcode=...&address=...): no overrides, HTTP-cacheable.
+POST /wizard/bootstrap: same with overrides (as POST /calculator), e.g. after the user edited the step 1 form.
+"""
+import math
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from backend.api.responses import FastJSONResponse, add_break_even_parts, check_energy_basis
+from backend.services.wizard_service import bootstrap
+from backend.services.worker_pool import run_in_pool
+
+router = APIRouter()
+
+
+class BootstrapRequest(BaseModel):
+    building_id: Optional[str] = None
+    postcode: Optional[str] = None
+    address: Optional[str] = None
+    overrides: Optional[Dict[str, Any]] = None
+
+
+def _bootstrap(
+    building_id: Optional[str], postcode: Optional[str], address: Optional[str], overrides: Optional[Dict[str, Any]]
+) -> FastJSONResponse:
+    try:
+        data = bootstrap(building_id, postcode, address, overrides)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    for option in data["options"]:
+        years = option["result"].get("YearsUntilBreakeventRentIncrease")
+        if years is not None and math.isfinite(years):
+            add_break_even_parts(option["result"])
+    return FastJSONResponse(data)
+
+
+@router.get("/bootstrap", response_class=FastJSONResponse)
+async def get_bootstrap(
+    building_id: Optional[str] = Query(None, description="Building id"),
+    postcode: Optional[str] = Query(None, description="Postal code (with address, instead of building_id)"),
+    address: Optional[str] = Query(None, description="Full address (street + number)"),
+) -> FastJSONResponse:
+    """Building + prefill, window options for its window type and the calculator result per option."""
+    return await run_in_pool(_bootstrap, building_id, postcode, address, None)
+
+
+@router.post("/bootstrap", response_class=FastJSONResponse)
+async def post_bootstrap(body: BootstrapRequest) -> FastJSONResponse:
+    """As GET /wizard/bootstrap; option results use body.overrides (the prefill never does)."""
+    check_energy_basis(body.overrides)
+    return await run_in_pool(_bootstrap, body.building_id, body.postcode, body.address, body.overrides)
@@ -5,11 +5,17 @@ All code and API in English.
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from backend.api import addresses, buildings, calculator, contractors
-from backend.services.excel_loader import load_excel_data
+from backend.api import addresses, admin, buildings, calculator, contractors, metrics, stats, wizard
+from backend.services.cache import get_cache_stats
+from backend.services.excel_loader import get_load_info, load_excel_data, start_watcher
+from backend.services.http_cache import HTTPCacheMiddleware
+from backend.services.metrics import MetricsMiddleware
+from backend.services.warmup import readiness, start_warmup
+from backend.services.worker_pool import PoolSaturated, get_worker_pool, shutdown_worker_pool
 
 
 def _cors_origins() -> list[str]:
@@ -21,12 +27,25 @@ def _cors_origins() -> list[str]:
     return [o.strip() for o in env.split(",") if o.strip()]
 
 
+def _watch_interval() -> float:
+    """DATA_WATCH_INTERVAL (seconds) enables polling the workbook for changes; 0 or unset disables it."""
+    try:
+        return float(os.environ.get("DATA_WATCH_INTERVAL", "0") or 0)
+    except ValueError:
+        return 0.0
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load Excel data at startup."""
+    """Load Excel data at startup, warm up caches in the background and optionally watch the workbook for changes."""
     load_excel_data()
+    start_warmup()
+    interval = _watch_interval()
+    stop_watcher = start_watcher(interval) if interval > 0 else None
     yield
-    # cleanup if needed
+    if stop_watcher is not None:
+        stop_watcher.set()
+    shutdown_worker_pool()
 
 
 app = FastAPI(
@@ -34,6 +53,8 @@ app = FastAPI(
     description="Building retrofit payback calculator",
     lifespan=lifespan,
 )
+# Innermost, so 304s still get CORS headers and are counted in the metrics
+app.add_middleware(HTTPCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins(),
@@ -41,13 +62,42 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated) -> JSONResponse:
+    """Shed load fast when all data workers are busy and the queue is full."""
+    return JSONResponse(status_code=503, content={"detail": "Server busy, retry shortly"}, headers={"Retry-After": "1"})
+
 
 app.include_router(addresses.router, prefix="/addresses", tags=["addresses"])
 app.include_router(buildings.router, prefix="/buildings", tags=["buildings"])
 app.include_router(calculator.router, prefix="/calculator", tags=["calculator"])
 app.include_router(contractors.router, prefix="/contractors", tags=["contractors"])
+app.include_router(wizard.router, prefix="/wizard", tags=["wizard"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    status = readiness()
+    return {
+        "status": "ok",
+        "ready": status["ready"],
+        "warmup": status,
+        "data": get_load_info(),
+        "caches": get_cache_stats(),
+        "pool": get_worker_pool().stats(),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the data is loaded and warmed up, 503 until then."""
+    status = readiness()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status, headers={"Retry-After": "1"})
+    return status
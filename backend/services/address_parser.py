@@ -1,12 +1,19 @@
 """
 Parse buildings.address into street and number for cascading dropdowns.
 Address format in Excel: e.g. "Zehlendorfer Str. 43", "Landsberger Allee 36".
+The cascade (postcode -> street -> number) is served from an index built once per data load.
+normalize_street / normalize_number / canonical_address fold spelling variants ("Str." / "Straße",
+umlauts, "43 a" / "43A") so user input matches the sheet even when it is not typed exactly the same.
 """
 import re
-from typing import List, Tuple
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from backend.services.row_table import ValueTable
+
 
 def parse_address(address: str) -> Tuple[str, str]:
     """
@@ -18,8 +25,9 @@ def parse_address(address: str) -> Tuple[str, str]:
     s = address.strip()
     if not s:
         return ("", "")
-    # Match trailing house number (digits, optional letter: 43, 43a, 36)
-    m = re.match(r"^(.+?)\s+(\d+\s*[a-zA-Z]?)\s*$", s)
+    # Match trailing house number (digits, optional letter: 43, 43a, 43 a, 43-a), after a space,
+    # a comma or an abbreviation dot ("Hauptstr.43")
+    m = re.match(r"^(.+?)(?:\s+|,\s*|(?<=\.))(\d+\s*-?\s*[a-zA-Z]?)\s*$", s)
     if m:
         street = m.group(1).strip()
         number = m.group(2).strip()
@@ -27,42 +35,172 @@ def parse_address(address: str) -> Tuple[str, str]:
     return (s, "")
 
 
-def get_unique_streets_for_postcode(df_buildings, postal_code: str) -> List[str]:
-    """Return sorted list of unique street names for given postal_code."""
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+# Common street abbreviations -> full word (applied after lower-casing and umlaut folding)
+_ABBREVIATIONS = (
+    (re.compile(r"str(?:\.|\b)"), "strasse"),
+    (re.compile(r"\bpl(?:\.|\b)"), "platz"),
+    (re.compile(r"\bch(?:\.|\b)"), "chaussee"),
+    (re.compile(r"\bprom(?:\.|\b)"), "promenade"),
+)
+
+
+def fold_text(text: str) -> str:
+    """Lower-case, umlauts to ae/oe/ue/ss, other accents dropped ("Müllerstraße" -> "muellerstrasse")."""
+    s = str(text).lower().translate(_FOLD)
+    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+
+
+def normalize_street(street: str) -> str:
+    """
+    Street name key: folded, abbreviations expanded, spaces and punctuation removed, so
+    "Zehlendorfer Str.", "zehlendorfer straße" and "Zehlendorferstrasse" give the same key.
+    """
+    s = fold_text(street)
+    for pattern, full in _ABBREVIATIONS:
+        s = pattern.sub(full, s)
+    return re.sub(r"[^a-z0-9]", "", s)
+
+
+def normalize_number(number: str) -> str:
+    """House number key: "43 a", "43-A" and "43a" -> "43a"."""
+    return re.sub(r"[^a-z0-9]", "", fold_text(number))
+
+
+def canonical_address(address: str) -> str:
+    """Address key: normalized street + normalized number."""
+    street, number = parse_address(str(address))
+    return normalize_street(street) + normalize_number(number)
+
+
+def number_sort_key(x):
+    """Natural sort key for house numbers: 2 < 10 < 10a."""
+    m = re.match(r"\d+", str(x))
+    return (int(m.group()) if m else 0, str(x))
+
+
+def address_key(postal_code: str, address: str) -> str:
+    """Lookup key of the address -> building_id maps."""
+    return f"{postal_code}\x1f{address}"
+
+
+def build_address_index(df_buildings) -> Dict[str, Any]:
+    """
+    Build the address cascade index once per data load:
+    postcodes: sorted postcodes
+    streets: postcode -> sorted street names
+    street_keys: postcode -> sorted lower-cased street names (parallel to a case-insensitive sort, for prefix search)
+    numbers: postcode -> street -> naturally sorted house numbers
+    buildings: address_key(postcode, address) -> building_id (ValueTable)
+    canonical: address_key(postcode, canonical_address) -> building_id, for spelling variants of the address
+    """
+    index: Dict[str, Any] = {
+        "postcodes": [],
+        "streets": {},
+        "street_keys": {},
+        "numbers": {},
+        "buildings": ValueTable({}, dtype=str),
+        "canonical": ValueTable({}, dtype=str),
+    }
     col_postal = "postal_code"
     col_addr = "address"
     if col_postal not in df_buildings.columns or col_addr not in df_buildings.columns:
-        return []
-    subset = df_buildings[df_buildings[col_postal].astype(str).str.strip() == str(postal_code).strip()]
-    streets = set()
-    for _, row in subset.iterrows():
-        addr = row.get(col_addr)
+        return index
+    postcodes = df_buildings[col_postal].astype(str).str.strip().tolist()
+    addresses = df_buildings[col_addr].tolist()
+    if "building_id" in df_buildings.columns:
+        ids = df_buildings["building_id"].astype(str).tolist()
+    else:
+        ids = [None] * len(postcodes)
+    # Pre-split street/number columns (backend.services.schema) spare parsing every address here
+    if "street" in df_buildings.columns and "number" in df_buildings.columns:
+        parts = zip(df_buildings["street"].tolist(), df_buildings["number"].tolist())
+    else:
+        parts = (parse_address(str(a)) if not pd.isna(a) else ("", "") for a in addresses)
+    streets: Dict[str, set] = {}
+    numbers: Dict[str, Dict[str, set]] = {}
+    buildings: Dict[str, str] = {}
+    canonical: Dict[str, str] = {}
+    street_keys: Dict[str, str] = {}
+    for pc, addr, bid, (street, num) in zip(postcodes, addresses, ids, parts):
         if pd.isna(addr):
             continue
-        street, _ = parse_address(str(addr))
-        if street:
-            streets.add(street)
-    return sorted(streets)
+        addr = str(addr)
+        key = address_key(pc, addr.strip())
+        if key not in buildings and bid is not None:
+            buildings[key] = bid
+            if street:
+                street = str(street)
+                if street not in street_keys:
+                    street_keys[street] = normalize_street(street)
+                canonical.setdefault(address_key(pc, street_keys[street] + normalize_number(str(num or ""))), bid)
+        if not street:
+            continue
+        streets.setdefault(pc, set()).add(street)
+        if num:
+            numbers.setdefault(pc, {}).setdefault(street, set()).add(num)
+    index["buildings"] = ValueTable(buildings, dtype=str)
+    index["canonical"] = ValueTable(canonical, dtype=str)
+    index["postcodes"] = sorted(streets)
+    for pc, names in streets.items():
+        by_key = sorted(names, key=lambda n: (n.lower(), n))
+        index["streets"][pc] = sorted(names)
+        index["street_keys"][pc] = ([n.lower() for n in by_key], by_key)
+    for pc, by_street in numbers.items():
+        index["numbers"][pc] = {st: sorted(nums, key=number_sort_key) for st, nums in by_street.items()}
+    return index
+
+
+def _prefix_slice(keys: List[str], values: List[str], prefix: str) -> List[str]:
+    """Values whose key starts with prefix; keys must be sorted."""
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + "\uffff")
+    return values[lo:hi]
+
+
+def get_postcodes(index: Dict[str, Any], prefix: str = "") -> List[str]:
+    """Return sorted postcodes starting with prefix."""
+    pcs = index["postcodes"]
+    prefix = str(prefix).strip()
+    return _prefix_slice(pcs, pcs, prefix) if prefix else list(pcs)
+
+
+def get_streets(index: Dict[str, Any], postal_code: str, prefix: Optional[str] = None) -> List[str]:
+    """
+    Return sorted street names for postal_code.
+    With prefix (typeahead), postal_code is matched as a prefix too and streets are filtered
+    case-insensitively by their start.
+    """
+    pc = str(postal_code).strip()
+    if not prefix or not prefix.strip():
+        return list(index["streets"].get(pc, []))
+    p = prefix.strip().lower()
+    found = set()
+    for code in get_postcodes(index, pc):
+        keys, names = index["street_keys"][code]
+        found.update(_prefix_slice(keys, names, p))
+    return sorted(found)
 
 
-def get_unique_numbers_for_street(
-    df_buildings, postal_code: str, street: str
+def get_numbers(
+    index: Dict[str, Any], postal_code: str, street: str, prefix: Optional[str] = None
 ) -> List[str]:
-    """Return sorted list of unique house numbers for given postal_code and street."""
-    col_postal = "postal_code"
-    col_addr = "address"
-    if col_postal not in df_buildings.columns or col_addr not in df_buildings.columns:
-        return []
-    subset = df_buildings[df_buildings[col_postal].astype(str).str.strip() == str(postal_code).strip()]
-    numbers = set()
-    for _, row in subset.iterrows():
-        addr = row.get(col_addr)
-        if pd.isna(addr):
-            continue
-        s, num = parse_address(str(addr))
-        if s.strip() == street.strip() and num:
-            numbers.add(num)
-    def _num_key(x):
-        m = re.match(r"\d+", str(x))
-        return (int(m.group()) if m else 0, str(x))
-    return sorted(numbers, key=_num_key)
+    """Return naturally sorted house numbers for postal_code and street, optionally starting with prefix."""
+    by_street = index["numbers"].get(str(postal_code).strip(), {})
+    numbers = by_street.get(str(street).strip(), [])
+    if prefix and prefix.strip():
+        p = prefix.strip().lower()
+        return [n for n in numbers if n.lower().startswith(p)]
+    return list(numbers)
+
+
+def find_building_id(index: Dict[str, Any], postal_code: str, address: str) -> Optional[str]:
+    """
+    building_id for (postal_code, address), or None. Exact match first, then the canonical form,
+    so "Zehlendorfer Straße 43 a" finds "Zehlendorfer Str. 43a".
+    """
+    pc = str(postal_code).strip()
+    bid = index["buildings"].get(address_key(pc, str(address).strip()))
+    if bid is None:
+        bid = index["canonical"].get(address_key(pc, canonical_address(address)))
+    return bid
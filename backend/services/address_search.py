@@ -0,0 +1,236 @@
+"""
+Typo-tolerant address search ("landsberger alle 63 a", "Zehlendorfer Strasse 43A 14163"), indexed once per data load.
+
+Street names are reduced to keys with address_parser.normalize_street (umlauts folded, "Str." -> strasse,
+spaces and punctuation dropped) and indexed by trigram: trigram -> street key ids. A query is split
+into street text, house number and postcode; street candidates are scored by trigram overlap
+(Dice coefficient) with one bincount over the query's posting lists, streets the query is a prefix of
+are added for typeahead, and the buildings of the best streets are ranked by number and postcode match.
+Work per query is bounded: at most MAX_QUERY_GRAMS posting lists, MAX_STREETS candidate streets,
+and a time budget (ADDRESS_SEARCH_BUDGET_MS) after which the results found so far are returned.
+"""
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.address_parser import fold_text, normalize_number, normalize_street, number_sort_key
+from backend.services.schema import format_postcode
+
+MAX_QUERY_GRAMS = 32
+MAX_STREETS = 20
+MIN_SIMILARITY = 0.3
+DEFAULT_BUDGET_MS = 25.0
+# Score bonuses on top of the street similarity (0..1)
+NUMBER_EXACT = 0.5
+NUMBER_PREFIX = 0.2
+POSTCODE_MATCH = 0.3
+
+_POSTCODE = re.compile(r"^\d{5}$")
+_NUMBER = re.compile(r"^\d{1,4}[a-z]?$")
+
+
+def get_budget_ms() -> float:
+    """Per-query time budget (ADDRESS_SEARCH_BUDGET_MS, default 25 ms)."""
+    try:
+        return float(os.environ.get("ADDRESS_SEARCH_BUDGET_MS", DEFAULT_BUDGET_MS))
+    except ValueError:
+        return DEFAULT_BUDGET_MS
+
+
+def trigrams(key: str) -> List[str]:
+    """Distinct trigrams of a street key, padded at the start so prefixes weigh more ("$$l", "$la", ...)."""
+    padded = f"$${key}$"
+    return list(dict.fromkeys(padded[i : i + 3] for i in range(len(padded) - 2)))
+
+
+def build_search_index(df_buildings: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    keys: street keys; sorted_keys: (keys sorted, their key ids) for prefix lookups
+    grams: trigram -> int32 key ids; gram_counts: trigrams per key
+    rows: key id -> building rows (naturally sorted by number); number_keys, postcodes: per building row
+    ids, addresses, districts: per building row, for the results
+    """
+    index: Dict[str, Any] = {
+        "keys": [],
+        "sorted_keys": ([], []),
+        "grams": {},
+        "gram_counts": np.zeros(0, dtype=np.int32),
+        "rows": [],
+        "number_keys": np.zeros(0, dtype=object),
+        "ids": [],
+        "postcodes": np.zeros(0, dtype=object),
+        "addresses": [],
+        "districts": [],
+    }
+    df = df_buildings
+    if df is None or df.empty or "street" not in df.columns or "building_id" not in df.columns:
+        return index
+    street_codes, street_names = pd.factorize(df["street"], use_na_sentinel=True)
+    names_to_key = [normalize_street(str(name)) for name in street_names]
+    keys = list(dict.fromkeys(k for k in names_to_key if k))
+    key_id = {k: i for i, k in enumerate(keys)}
+    # Street category -> key id (-1 for empty keys); then key id per building row
+    remap = np.array([key_id.get(k, -1) for k in names_to_key] + [-1], dtype=np.int32)
+    row_keys = remap[street_codes]
+    if "number" in df.columns:
+        number_codes, number_names = pd.factorize(df["number"], use_na_sentinel=True)
+    else:
+        number_codes, number_names = np.full(len(df), -1, dtype=np.intp), []
+    number_names = [normalize_number(str(n)) for n in number_names] + [""]
+    # Natural order of the house numbers, as a rank per number category
+    number_rank = np.empty(len(number_names), dtype=np.int64)
+    number_rank[sorted(range(len(number_names)), key=lambda i: number_sort_key(number_names[i]))] = np.arange(
+        len(number_names)
+    )
+    number_keys = np.array(number_names, dtype=object)[number_codes]
+
+    # Rows grouped by street key, each group in house number order
+    order = np.lexsort((number_rank[number_codes], row_keys))
+    order = order[row_keys[order] >= 0]
+    bounds = np.searchsorted(row_keys[order], np.arange(len(keys) + 1))
+    rows = [order[bounds[k] : bounds[k + 1]].astype(np.int32) for k in range(len(keys))]
+
+    by_key = sorted(range(len(keys)), key=keys.__getitem__)
+    postings: Dict[str, List[int]] = {}
+    counts = np.zeros(len(keys), dtype=np.int32)
+    for k, key in enumerate(keys):
+        grams = trigrams(key)
+        counts[k] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(k)
+
+    def _column(name: str) -> List[Any]:
+        if name not in df.columns:
+            return [None] * len(df)
+        return [None if pd.isna(v) else str(v) for v in df[name].tolist()]
+
+    if "postal_code" in df.columns:
+        pc_codes, pc_names = pd.factorize(df["postal_code"], use_na_sentinel=True)
+        postcodes = np.array([format_postcode(v) for v in pc_names] + [None], dtype=object)[pc_codes]
+    else:
+        postcodes = np.full(len(df), None, dtype=object)
+
+    index.update(
+        {
+            "keys": keys,
+            "sorted_keys": ([keys[k] for k in by_key], by_key),
+            "grams": {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()},
+            "gram_counts": counts,
+            "rows": rows,
+            "number_keys": number_keys,
+            "postcodes": postcodes,
+            "ids": _column("building_id"),
+            "addresses": _column("address"),
+            "districts": _column("district"),
+        }
+    )
+    return index
+
+
+def parse_query(q: str) -> Tuple[str, str, Optional[str]]:
+    """
+    (street key, number key, postcode) from free text, e.g.
+    "Zehlendorfer Str 43 a 14163" -> ("zehlendorferstrasse", "43a", "14163").
+    The house number is the last number after the street; words after it (e.g. "Berlin") are ignored.
+    """
+    tokens = re.findall(r"[a-z0-9]+", fold_text(q))
+    postcode = next((t for t in tokens if _POSTCODE.match(t)), None)
+    if postcode is not None:
+        tokens.remove(postcode)
+    number = ""
+    street = tokens
+    for i in range(len(tokens) - 1, 0, -1):
+        if _NUMBER.match(tokens[i]):
+            number = tokens[i]
+            # "43 a": a single letter right after the number is its suffix
+            if number.isdigit() and i + 1 < len(tokens) and len(tokens[i + 1]) == 1 and tokens[i + 1].isalpha():
+                number += tokens[i + 1]
+            street = tokens[:i]
+            break
+    return normalize_street(" ".join(street)), normalize_number(number), postcode
+
+
+def _street_candidates(index: Dict[str, Any], key: str) -> List[Tuple[int, float]]:
+    """(key id, similarity) of the best matching streets, best first; streets starting with key rank as close matches."""
+    scores: Dict[int, float] = {}
+    sorted_keys, sorted_ids = index["sorted_keys"]
+    lo = bisect_left(sorted_keys, key)
+    for k in sorted_ids[lo : bisect_left(sorted_keys, key + "\uffff", lo)][:MAX_STREETS]:
+        # Typeahead: a typed prefix of the street is as good as a close match
+        scores[k] = 1.0 if index["keys"][k] == key else 0.8
+    grams = [g for g in trigrams(key) if g in index["grams"]][:MAX_QUERY_GRAMS]
+    if grams:
+        hits = np.bincount(np.concatenate([index["grams"][g] for g in grams]), minlength=len(index["keys"]))
+        candidates = np.flatnonzero(hits)
+        dice = 2.0 * hits[candidates] / (len(trigrams(key)) + index["gram_counts"][candidates])
+        keep = dice >= MIN_SIMILARITY
+        candidates, dice = candidates[keep], dice[keep]
+        if len(candidates) > MAX_STREETS:
+            top = np.argpartition(-dice, MAX_STREETS - 1)[:MAX_STREETS]
+            candidates, dice = candidates[top], dice[top]
+        for k, score in zip(candidates.tolist(), dice.tolist()):
+            scores[k] = max(scores.get(k, 0.0), score)
+    ranked = sorted(scores.items(), key=lambda ks: (-ks[1], index["keys"][ks[0]]))
+    return ranked[:MAX_STREETS]
+
+
+def search_addresses(
+    index: Dict[str, Any],
+    q: str,
+    postcode: Optional[str] = None,
+    limit: int = 10,
+    budget_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Ranked buildings for a free-text address query. postcode (if given) must match; a postcode inside
+    q only raises the score. Returns {"results": [...], "truncated": bool}, where truncated means the
+    time budget ran out before all candidate streets were ranked.
+    """
+    deadline = time.perf_counter() + (get_budget_ms() if budget_ms is None else budget_ms) / 1000.0
+    street_key, number_key, q_postcode = parse_query(q)
+    required = format_postcode(postcode.strip()) if postcode and postcode.strip() else None
+    preferred = required or q_postcode
+    if not street_key:
+        return {"results": [], "truncated": False}
+    postcodes = index["postcodes"]
+    number_keys = index["number_keys"]
+    scored: List[Tuple[float, int, int, int]] = []
+    truncated = False
+    for rank, (k, similarity) in enumerate(_street_candidates(index, street_key)):
+        if time.perf_counter() > deadline:
+            truncated = True
+            break
+        rows = index["rows"][k]
+        if required is not None:
+            rows = rows[postcodes[rows] == required]
+        if number_key:
+            # Exact number first, then numbers it is a prefix of ("43" -> "43a"), then the rest of the street
+            exact = number_keys[rows] == number_key
+            prefix = np.char.startswith(number_keys[rows].astype(str), number_key) & ~exact
+            bonus = np.where(exact, NUMBER_EXACT, np.where(prefix, NUMBER_PREFIX, 0.0))
+        else:
+            bonus = np.zeros(len(rows))
+        if preferred is not None:
+            bonus = bonus + np.where(postcodes[rows] == preferred, POSTCODE_MATCH, 0.0)
+        # Rows are in house number order; keep the best `limit` of this street
+        order = np.argsort(-bonus, kind="stable")[:limit]
+        for i in order.tolist():
+            scored.append((similarity + float(bonus[i]), rank, i, int(rows[i])))
+    scored.sort(key=lambda s: (-s[0], s[1], s[2]))
+    results = []
+    for score, _, _, r in scored[:limit]:
+        results.append(
+            {
+                "building_id": index["ids"][r],
+                "address": index["addresses"][r],
+                "postal_code": postcodes[r],
+                "district": index["districts"][r],
+                "score": round(score, 3),
+            }
+        )
+    return {"results": results, "truncated": truncated}
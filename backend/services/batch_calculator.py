@@ -0,0 +1,399 @@
+"""
+Vectorized form of calculator_service.run_calculator for many buildings at once.
+Building inputs are kept as NumPy columns (built once per data load); the payback formulas run
+as array operations in the same order as the scalar path, so results are bit-identical before rounding.
+The same formulas evaluate parameter sweeps: each grid axis is one array dimension.
+"""
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.calculator_model import CalculatorModel, normalize_window_type
+from backend.services.energy_rollups import DEFAULT_ENERGY_BASIS, basis_columns
+
+DEFAULT_RENT_PER_UNIT = 800.0
+# Retrofit subtypes evaluated for the whole portfolio at load (rankings, stats cube)
+WINDOW_SUB_TYPES = ("Window replacement - double glazing", "Window replacement - triple glazing")
+
+# Input chains as in run_calculator's _ov(): first key present in overrides or the building row wins.
+TOTAL_SQM_KEYS = ("total_area_m2", "TotalSqm")
+NR_UNITS_KEYS = ("num_units", "NrUnits")
+WINDOW_TYPE_KEYS = ("window_type", "WindowType")
+
+RESULT_FIELDS = (
+    "TotalSqm",
+    "NrUnits",
+    "WindowType",
+    "EnergyCostsPerMonth",
+    "RentPerUnit",
+    "SubTypeOfRetrofit",
+    "RetrofitCostTotal",
+    "RetrofitCostTotalAfterSubsidy",
+    "EnergySavingsPerMonth",
+    "YearUntilBreakeven",
+    "SavingsPerUnit",
+    "RentIncreasePerUnit",
+    "TenantSavingsPerUnit",
+    "YearlyExtraIncome",
+    "YearsUntilBreakeventRentIncrease",
+    "EnergySavingsPct",
+)
+
+
+def _float_or_zero(v: Any) -> float:
+    return float(v or 0)
+
+
+def _int_or_zero(v: Any) -> float:
+    return float(int(v or 0))
+
+
+def _strict_float(v: Any) -> float:
+    return float(v)
+
+
+# Conversion applied to each input key (mirrors run_calculator).
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "total_area_m2": _float_or_zero,
+    "TotalSqm": _float_or_zero,
+    "num_units": _int_or_zero,
+    "NrUnits": _int_or_zero,
+    "EnergyCostsPerMonth": _strict_float,
+    "RentPerUnit": _strict_float,
+}
+
+
+def _convert_column(values: List[Any], convert: Callable[[Any], Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert values one by one; rows where the scalar path would raise are marked invalid."""
+    out = np.zeros(len(values), dtype=np.float64)
+    valid = np.ones(len(values), dtype=bool)
+    for i, v in enumerate(values):
+        try:
+            out[i] = convert(v)
+        except (ValueError, TypeError, OverflowError):
+            valid[i] = False
+    return out, valid
+
+
+def build_calculator_columns(
+    buildings: Mapping[str, Dict[str, Any]],
+    financials: Mapping[str, Dict[str, Any]],
+    energy_cost: Mapping[str, float],
+    energy_rollups: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Column layout of the calculator inputs, one row per indexed building:
+    ids / pos: building_id list and building_id -> row position
+    fields: input key -> (float64 values, valid mask), only for keys present in the buildings sheet
+    window_type: input key -> normalized window type strings
+    energy_cost, rent_per_sqm: pre-aggregated per-building lookups
+    energy_basis: EnergyBasis -> monthly energy cost column (see energy_rollups.ENERGY_BASES)
+    """
+    ids = list(buildings.keys())
+    rows = list(buildings.values())
+    present = set(rows[0].keys()) if rows else set()
+    fields = {}
+    for key, convert in CONVERTERS.items():
+        if key in present:
+            fields[key] = _convert_column([r.get(key) for r in rows], convert)
+    window_type = {}
+    for key in WINDOW_TYPE_KEYS:
+        if key in present:
+            window_type[key] = np.array([normalize_window_type(r.get(key)) for r in rows], dtype=object)
+    rent_per_sqm = np.zeros(len(ids), dtype=np.float64)
+    for i, bid in enumerate(ids):
+        row = financials.get(bid)
+        if row is None:
+            continue
+        try:
+            v = row.get("avg_rent_eur_m2")
+            if pd.notna(v):
+                rent_per_sqm[i] = float(v)
+        except (ValueError, TypeError):
+            pass
+    energy = np.array([energy_cost.get(bid, 0.0) for bid in ids], dtype=np.float64)
+    return {
+        "ids": ids,
+        "pos": {bid: i for i, bid in enumerate(ids)},
+        "fields": fields,
+        "window_type": window_type,
+        "energy_cost": energy,
+        "energy_basis": basis_columns(energy_rollups, ids, energy) if energy_rollups else {DEFAULT_ENERGY_BASIS: energy},
+        "rent_per_sqm": rent_per_sqm,
+    }
+
+
+def _resolve(
+    columns: Dict[str, Any], overrides: Mapping[str, Any], keys: Tuple[str, ...], default: Any, rows: np.ndarray
+) -> Tuple[Any, Any]:
+    """(values, valid) for the first key found in overrides or the building columns; scalars broadcast."""
+    for key in keys:
+        if key in overrides:
+            try:
+                return CONVERTERS[key](overrides[key]), True
+            except (ValueError, TypeError, OverflowError):
+                return 0.0, False
+        if key in columns["fields"]:
+            values, valid = columns["fields"][key]
+            return values[rows], valid[rows]
+    return CONVERTERS[keys[0]](default), True
+
+
+def _resolve_window_type(columns: Dict[str, Any], overrides: Mapping[str, Any], rows: np.ndarray) -> Any:
+    for key in WINDOW_TYPE_KEYS:
+        if key in overrides:
+            return normalize_window_type(overrides[key])
+        if key in columns["window_type"]:
+            return columns["window_type"][key][rows]
+    return normalize_window_type(None)
+
+
+def _energy_basis_column(columns: Dict[str, Any], overrides: Mapping[str, Any]) -> Tuple[np.ndarray, bool]:
+    """(energy cost column for overrides["EnergyBasis"], known basis); unknown bases get the mean column."""
+    basis = overrides.get("EnergyBasis", DEFAULT_ENERGY_BASIS)
+    energy_basis = columns["energy_basis"].get(basis) if isinstance(basis, str) else None
+    if energy_basis is None:
+        return columns["energy_cost"], False
+    return energy_basis, True
+
+
+def resolve_inputs(columns: Dict[str, Any], overrides: Mapping[str, Any], rows: np.ndarray) -> Dict[str, Any]:
+    """
+    Building inputs for the given row positions after applying one override set:
+    TotalSqm, NrUnits, WindowType, EnergyCostsPerMonth, RentPerUnit (with financials and 800 EUR fallback), valid.
+    EnergyCostsPerMonth == 0 takes the building's energy cost for overrides["EnergyBasis"] (default mean).
+    """
+    n = len(rows)
+    total_sqm, ok_sqm = _resolve(columns, overrides, TOTAL_SQM_KEYS, 0, rows)
+    nr_units, ok_units = _resolve(columns, overrides, NR_UNITS_KEYS, 0, rows)
+    energy, ok_energy = _resolve(columns, overrides, ("EnergyCostsPerMonth",), 0, rows)
+    rent, ok_rent = _resolve(columns, overrides, ("RentPerUnit",), 0, rows)
+    total_sqm = np.broadcast_to(np.asarray(total_sqm, dtype=np.float64), (n,))
+    nr_units = np.broadcast_to(np.asarray(nr_units, dtype=np.float64), (n,))
+    energy = np.broadcast_to(np.asarray(energy, dtype=np.float64), (n,))
+    rent = np.broadcast_to(np.asarray(rent, dtype=np.float64), (n,))
+    energy_basis, ok_basis = _energy_basis_column(columns, overrides)
+    needs_basis = energy == 0
+    energy = np.where(needs_basis, energy_basis[rows], energy)
+    rent = resolve_rent_per_unit(rent, columns["rent_per_sqm"][rows], total_sqm, nr_units)
+    valid = np.ones(n, dtype=bool) & ok_sqm & ok_units & ok_energy & ok_rent & (ok_basis | ~needs_basis)
+    window_type = np.broadcast_to(np.asarray(_resolve_window_type(columns, overrides, rows), dtype=object), (n,))
+    return {
+        "TotalSqm": total_sqm,
+        "NrUnits": nr_units,
+        "WindowType": window_type,
+        "EnergyCostsPerMonth": energy,
+        "RentPerUnit": rent,
+        "valid": valid,
+    }
+
+
+def resolve_rent_per_unit(rent: Any, rent_per_sqm: Any, total_sqm: Any, nr_units: Any) -> np.ndarray:
+    """RentPerUnit <= 0 falls back to avg_rent_eur_m2 * TotalSqm / NrUnits, then to 800 EUR."""
+    rent, rent_per_sqm, total_sqm, nr_units = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (rent, rent_per_sqm, total_sqm, nr_units))
+    )
+    missing = rent <= 0
+    derivable = missing & (nr_units > 0) & (total_sqm > 0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        derived = rent_per_sqm * total_sqm / nr_units
+    rent = np.where(derivable, derived, rent)
+    return np.where(missing & (rent <= 0), DEFAULT_RENT_PER_UNIT, rent)
+
+
+def compute_payback(
+    TotalSqm: Any,
+    NrUnits: Any,
+    EnergyCostsPerMonth: Any,
+    RentPerUnit: Any,
+    WindowToFloorRatio: Any,
+    WindowSubsidyParameter: Any,
+    RentIncreasePct: Any,
+    cost_per_m2: Any,
+    savings_pct: Any,
+) -> Dict[str, np.ndarray]:
+    """Calculator formulas over broadcastable arrays (same operation order as run_calculator)."""
+    TotalSqm, NrUnits, EnergyCostsPerMonth, RentPerUnit = (
+        np.asarray(a, dtype=np.float64) for a in (TotalSqm, NrUnits, EnergyCostsPerMonth, RentPerUnit)
+    )
+    WindowToFloorRatio, WindowSubsidyParameter, RentIncreasePct, cost_per_m2, savings_pct = (
+        np.asarray(a, dtype=np.float64)
+        for a in (WindowToFloorRatio, WindowSubsidyParameter, RentIncreasePct, cost_per_m2, savings_pct)
+    )
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        RetrofitCostTotal = cost_per_m2 * TotalSqm * WindowToFloorRatio
+        RetrofitCostTotalAfterSubsidy = RetrofitCostTotal * WindowSubsidyParameter
+        EnergySavingsPerMonth = EnergyCostsPerMonth * (savings_pct / 100.0)
+        YearUntilBreakeven = np.where(
+            EnergySavingsPerMonth > 0, RetrofitCostTotalAfterSubsidy / (EnergySavingsPerMonth * 12), 0.0
+        )
+        SavingsPerUnit = np.where(NrUnits > 0, EnergySavingsPerMonth / NrUnits, 0.0)
+        RentIncreasePerUnit = RentIncreasePct * RentPerUnit
+        TenantSavingsPerUnit = SavingsPerUnit - RentIncreasePerUnit
+        YearlyExtraIncome = RentIncreasePerUnit * NrUnits * 12
+        YearsUntilBreakeventRentIncrease = np.where(
+            YearlyExtraIncome > 0, RetrofitCostTotalAfterSubsidy / YearlyExtraIncome, 0.0
+        )
+    return {
+        "RetrofitCostTotal": RetrofitCostTotal,
+        "RetrofitCostTotalAfterSubsidy": RetrofitCostTotalAfterSubsidy,
+        "EnergySavingsPerMonth": EnergySavingsPerMonth,
+        "YearUntilBreakeven": YearUntilBreakeven,
+        "SavingsPerUnit": SavingsPerUnit,
+        "RentIncreasePerUnit": RentIncreasePerUnit,
+        "TenantSavingsPerUnit": TenantSavingsPerUnit,
+        "YearlyExtraIncome": YearlyExtraIncome,
+        "YearsUntilBreakeventRentIncrease": YearsUntilBreakeventRentIncrease,
+    }
+
+
+def run_batch_columns(
+    columns: Dict[str, Any],
+    model: CalculatorModel,
+    rows: np.ndarray,
+    sub_type_of_retrofit: str,
+    overrides: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """Inputs and outputs as arrays for one retrofit subtype and one override set."""
+    overrides = overrides or {}
+    inputs = resolve_inputs(columns, overrides, rows)
+    params = model.parameters
+    window_to_floor = overrides.get("WindowToFloorRatio", params["WindowToFloorRatio"])
+    try:
+        window_to_floor = float(window_to_floor)
+    except (ValueError, TypeError):
+        inputs["valid"] = np.zeros(len(rows), dtype=bool)
+        window_to_floor = np.nan
+    cost_per_m2, savings_pct = model.retrofit(sub_type_of_retrofit)
+    outputs = compute_payback(
+        inputs["TotalSqm"],
+        inputs["NrUnits"],
+        inputs["EnergyCostsPerMonth"],
+        inputs["RentPerUnit"],
+        window_to_floor,
+        params["WindowSubsidyParameter"],
+        params["RentIncreasePct"],
+        cost_per_m2,
+        savings_pct,
+    )
+    outputs.update(inputs)
+    outputs["EnergySavingsPct"] = np.full(len(rows), savings_pct, dtype=np.float64)
+    return outputs
+
+
+def run_portfolio(
+    columns: Dict[str, Any], model: CalculatorModel, sub_types_of_retrofit: Tuple[str, ...] = WINDOW_SUB_TYPES
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """sub_type -> run_batch_columns outputs for every building without overrides (rows in calculator_columns order)."""
+    rows = np.arange(len(columns["ids"]), dtype=np.intp)
+    return {sub_type: run_batch_columns(columns, model, rows, sub_type) for sub_type in sub_types_of_retrofit}
+
+
+# Outputs that run_calculator sets to the int 0 (not 0.0) unless the guard input is > 0
+INT_ZERO_FALLBACKS = {
+    "YearUntilBreakeven": "EnergySavingsPerMonth",
+    "SavingsPerUnit": "NrUnits",
+    "YearsUntilBreakeventRentIncrease": "YearlyExtraIncome",
+}
+
+
+def rows_to_results(
+    arrays: Dict[str, np.ndarray], sub_type_of_retrofit: str, index: int
+) -> Dict[str, Any]:
+    """One result dict, rounded and typed like run_calculator (Python round() keeps results identical)."""
+    if not arrays["valid"][index]:
+        return {"error": "Invalid building or override values"}
+    out: Dict[str, Any] = {}
+    for field in RESULT_FIELDS:
+        guard = INT_ZERO_FALLBACKS.get(field)
+        if guard is not None and not arrays[guard][index] > 0:
+            out[field] = 0
+        elif field == "SubTypeOfRetrofit":
+            out[field] = sub_type_of_retrofit
+        elif field == "NrUnits":
+            out[field] = int(arrays[field][index])
+        elif field == "WindowType":
+            out[field] = arrays[field][index]
+        else:
+            out[field] = round(float(arrays[field][index]), 2)
+    return out
+
+
+# Sweepable inputs: building inputs, parameters sheet values, retrofit cost/savings, energy price factor
+SWEEP_PARAMETERS = (
+    "TotalSqm",
+    "NrUnits",
+    "EnergyCostsPerMonth",
+    "EnergyPriceFactor",
+    "RentPerUnit",
+    "WindowToFloorRatio",
+    "WindowSubsidyParameter",
+    "RentIncreasePct",
+    "cost_per_m2",
+    "savings_pct",
+)
+
+
+def sweep_payback(
+    columns: Dict[str, Any],
+    model: CalculatorModel,
+    row: int,
+    sub_type_of_retrofit: str,
+    overrides: Mapping[str, Any],
+    grid: Mapping[str, np.ndarray],
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Evaluate the calculator over the cartesian product of the grid axes for one building.
+    Axis i of every output array corresponds to the i-th grid parameter (in the order given).
+    Returns (base inputs without grid, outputs). RentPerUnit <= 0 and EnergyCostsPerMonth == 0
+    fall back exactly as in run_calculator.
+    """
+    rows = np.array([row], dtype=np.intp)
+    base = resolve_inputs(columns, overrides, rows)
+    if not base["valid"][0]:
+        raise ValueError("Invalid building or override values")
+    params = model.parameters
+    cost_per_m2, savings_pct = model.retrofit(sub_type_of_retrofit)
+    values: Dict[str, Any] = {
+        "TotalSqm": float(base["TotalSqm"][0]),
+        "NrUnits": float(base["NrUnits"][0]),
+        "EnergyCostsPerMonth": float(base["EnergyCostsPerMonth"][0]),
+        "EnergyPriceFactor": 1.0,
+        "RentPerUnit": float(_resolve(columns, overrides, ("RentPerUnit",), 0, rows)[0]),
+        "WindowToFloorRatio": float(overrides.get("WindowToFloorRatio", params["WindowToFloorRatio"])),
+        "WindowSubsidyParameter": params["WindowSubsidyParameter"],
+        "RentIncreasePct": params["RentIncreasePct"],
+        "cost_per_m2": cost_per_m2,
+        "savings_pct": savings_pct,
+    }
+    base_values = dict(values)
+    base_values["RentPerUnit"] = float(base["RentPerUnit"][0])
+    ndim = len(grid)
+    for axis, (name, axis_values) in enumerate(grid.items()):
+        shape = [1] * ndim
+        shape[axis] = len(axis_values)
+        values[name] = np.asarray(axis_values, dtype=np.float64).reshape(shape)
+    nr_units = np.trunc(values["NrUnits"])
+    energy_basis, ok_basis = _energy_basis_column(columns, overrides)
+    needs_basis = values["EnergyCostsPerMonth"] == 0
+    if not ok_basis and np.any(needs_basis):
+        raise ValueError("Invalid building or override values")
+    energy = np.where(needs_basis, energy_basis[row], values["EnergyCostsPerMonth"])
+    energy = energy * values["EnergyPriceFactor"]
+    rent = resolve_rent_per_unit(values["RentPerUnit"], columns["rent_per_sqm"][row], values["TotalSqm"], nr_units)
+    outputs = compute_payback(
+        values["TotalSqm"],
+        nr_units,
+        energy,
+        rent,
+        values["WindowToFloorRatio"],
+        values["WindowSubsidyParameter"],
+        values["RentIncreasePct"],
+        values["cost_per_m2"],
+        values["savings_pct"],
+    )
+    outputs["RentPerUnit"] = rent
+    outputs["EnergyCostsPerMonth"] = energy
+    full_shape = tuple(len(v) for v in grid.values())
+    return base_values, {k: np.broadcast_to(v, full_shape) for k, v in outputs.items()}
@@ -0,0 +1,89 @@
+"""
+Small thread-safe LRU cache with optional TTL and hit/miss/eviction counters.
+Used for results that are deterministic per data version (calculator results, building prefill);
+keys include the data version and caches are also cleared when the data reloads.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+# name -> cache, for stats reporting
+_registry: Dict[str, "LRUCache"] = {}
+
+
+class LRUCache:
+    def __init__(self, name: str, maxsize: int = 4096, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key, _MISSING)
+            if item is not _MISSING:
+                stored_at, value = item
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._items[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def cache_from_env(name: str, prefix: str, maxsize: int = 4096, ttl: float = 0) -> LRUCache:
+    """Cache sized by <prefix>_CACHE_SIZE and <prefix>_CACHE_TTL (seconds, 0 = no expiry) env vars."""
+    try:
+        maxsize = int(os.environ.get(f"{prefix}_CACHE_SIZE", maxsize))
+        ttl = float(os.environ.get(f"{prefix}_CACHE_TTL", ttl))
+    except ValueError:
+        pass
+    return LRUCache(name, maxsize, ttl)
+
+
+def normalize_overrides(overrides: Optional[Dict[str, Any]]) -> str:
+    """Stable, hashable form of an overrides dict for use in cache keys."""
+    if not overrides:
+        return ""
+    return json.dumps(overrides, sort_keys=True, default=str)
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
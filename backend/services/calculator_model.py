@@ -0,0 +1,98 @@
+"""
+Calculator inputs that only change when the workbook changes (parameters and retrofits sheets),
+compiled once per data load into an immutable CalculatorModel.
+run_calculator receives the current model instead of re-reading the sheets per request.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+import pandas as pd
+
+DEFAULT_PARAMETERS = {
+    "WindowToFloorRatio": 0.14,
+    "WindowSubsidyParameter": 0.65,
+    "RentIncreasePct": 0.04,
+}
+# (cost_per_m2, savings_pct) when the retrofits sheet has no matching measure
+DEFAULT_RETROFITS = {"double": (450.0, 12.0), "triple": (550.0, 15.0)}
+
+
+class CalculatorModel:
+    """Immutable, versioned view of the parameters and retrofits sheets."""
+
+    __slots__ = ("version", "parameters", "retrofits")
+
+    def __init__(self, version: str, parameters: Mapping[str, float], retrofits: Mapping[str, Tuple[float, float]]):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "parameters", MappingProxyType(dict(parameters)))
+        object.__setattr__(self, "retrofits", MappingProxyType(dict(retrofits)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CalculatorModel is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("CalculatorModel is immutable")
+
+    def __reduce__(self):
+        # Rebuild through __init__ (slots are read-only and mapping proxies cannot be pickled)
+        return (CalculatorModel, (self.version, dict(self.parameters), dict(self.retrofits)))
+
+    def __repr__(self) -> str:
+        return f"CalculatorModel(version={self.version!r})"
+
+    def retrofit(self, sub_type_of_retrofit: str) -> Tuple[float, float]:
+        """(cost_per_m2, savings_pct) for "Window replacement - double/triple glazing"."""
+        if "double" in sub_type_of_retrofit.lower():
+            return self.retrofits["double"]
+        return self.retrofits["triple"]
+
+
+def _compile_parameters(df: pd.DataFrame) -> Dict[str, float]:
+    p: Dict[str, float] = {}
+    if df is not None and not df.empty and "Variables" in df.columns and "Value" in df.columns:
+        for name, val in zip(df["Variables"].tolist(), df["Value"].tolist()):
+            if pd.notna(name) and pd.notna(val):
+                try:
+                    p[str(name).strip()] = float(val)
+                except (ValueError, TypeError):
+                    pass
+    for key, default in DEFAULT_PARAMETERS.items():
+        p.setdefault(key, default)
+    return p
+
+
+def _compile_retrofits(df: pd.DataFrame) -> Dict[str, Tuple[float, float]]:
+    """From retrofits sheet: double glazing and triple glazing cost per m2 and savings %."""
+    result = {kind: list(vals) for kind, vals in DEFAULT_RETROFITS.items()}
+    if df is not None and not df.empty:
+        for row in df.to_dict("records"):
+            name = str(row.get("measure_name", "")).lower()
+            for kind in ("double", "triple"):
+                if kind in name and "glaz" in name:
+                    default_cost, default_pct = DEFAULT_RETROFITS[kind]
+                    try:
+                        result[kind][0] = float(row.get("typical_cost_eur_m2", 0) or default_cost)
+                        result[kind][1] = float(row.get("expected_savings_pct", 0) or default_pct)
+                    except (ValueError, TypeError):
+                        pass
+    return {kind: (vals[0], vals[1]) for kind, vals in result.items()}
+
+
+def compile_calculator_model(parameters: pd.DataFrame, retrofits: pd.DataFrame, version: str) -> CalculatorModel:
+    return CalculatorModel(version, _compile_parameters(parameters), _compile_retrofits(retrofits))
+
+
+def normalize_window_type(wt: Any) -> str:
+    """Map window_type values to Single-pane / Double-pane / Triple-pane (missing -> Single-pane)."""
+    if pd.isna(wt):
+        return "Single-pane"
+    s = str(wt).strip()
+    if not s:
+        return "Single-pane"
+    if "single" in s.lower() or "Single" in s:
+        return "Single-pane"
+    if "double" in s.lower() or "Double" in s:
+        return "Double-pane"
+    if "triple" in s.lower() or "Triple" in s:
+        return "Triple-pane"
+    return s
@@ -1,21 +1,24 @@
 """
 Replicate Excel Calculator sheet logic for window retrofit payback.
-Uses buildings, financials, energy_consumption, retrofits, parameters.
+Uses buildings, financials, energy_consumption (via load-time indexes) and the compiled
+CalculatorModel (retrofits, parameters).
 Returns same field names as plan: RetrofitCostTotal, RetrofitCostTotalAfterSubsidy,
 YearsUntilBreakeventRentIncrease, etc.
 """
 import math
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
-from backend.services.excel_loader import (
-    get_buildings,
-    get_energy_consumption,
-    get_financials,
-    get_parameters,
-    get_retrofits,
-)
+from backend.services.batch_calculator import SWEEP_PARAMETERS, rows_to_results, run_batch_columns, sweep_payback
+from backend.services.cache import cache_from_env, normalize_overrides
+from backend.services.calculator_model import CalculatorModel
+from backend.services.calculator_model import normalize_window_type as _normalize_window_type
+from backend.services.energy_rollups import DEFAULT_ENERGY_BASIS, ENERGY_BASES, building_rollup
+from backend.services.excel_loader import add_reload_listener, get_indexes, get_snapshot
+from backend.services.metrics import stage
+from backend.services.ranking import DEFAULT_METRIC, METRIC_ASCENDING, rank
 
 # Floor height for facade suggestion: interior + 0.4 m slab (plan §3.2)
 INTERIOR_HEIGHT_BY_BUILDING_TYPE = {
@@ -29,128 +32,93 @@ INTERIOR_HEIGHT_BY_BUILDING_TYPE = {
 }
 INTER_FLOOR_SLAB_M = 0.4
 
+# run_calculator results keyed by (data version, model version, building_id, sub_type, overrides)
+_results_cache = cache_from_env("calculator", "CALCULATOR")
+add_reload_listener(_results_cache.clear)
+# run_calculator_ranking pages keyed by (data version, model version, query)
+_ranking_cache = cache_from_env("ranking", "RANKING", maxsize=1024)
+add_reload_listener(_ranking_cache.clear)
 
-def _get_building_row(building_id: str) -> Optional[Dict[str, Any]]:
-    df = get_buildings()
-    if "building_id" not in df.columns:
-        return None
-    row = df[df["building_id"].astype(str) == str(building_id)]
-    if row.empty:
-        return None
-    return row.iloc[0].to_dict()
 
+def _get_building_row(building_id: str, indexes: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Buildings row dict from the load-time index. Shared between requests: do not mutate."""
+    return (indexes or get_indexes())["buildings"].get(str(building_id))
 
-def _get_rent_per_sqm(building_id: str) -> float:
+
+def _get_rent_per_sqm(building_id: str, indexes: Optional[Dict[str, Any]] = None) -> float:
     """Rent per sqm from financials. RentPerUnit = avg_rent_eur_m2 * TotalSqm / NrUnits."""
     try:
-        fin = get_financials()
-        if fin is None or fin.empty:
-            return 0.0
-        if "building_id" in fin.columns and "avg_rent_eur_m2" in fin.columns:
-            r = fin[fin["building_id"].astype(str) == str(building_id)]
-            if not r.empty and pd.notna(r.iloc[0].get("avg_rent_eur_m2")):
-                return float(r.iloc[0]["avg_rent_eur_m2"])
+        row = (indexes or get_indexes())["financials"].get(str(building_id))
+        if row is not None and pd.notna(row.get("avg_rent_eur_m2")):
+            return float(row["avg_rent_eur_m2"])
     except Exception:
         pass
     return 0.0
 
 
-def _get_energy_cost_per_month(building_id: str) -> float:
-    """Average monthly energy cost from energy_consumption (Calculator B10). Uses total_cost_eur."""
-    try:
-        ec = get_energy_consumption()
-        if ec is None or ec.empty or "building_id" not in ec.columns:
-            return 0.0
-        subset = ec[ec["building_id"].astype(str) == str(building_id)]
-        if subset.empty:
-            return 0.0
-        if "total_cost_eur" in subset.columns:
-            return float(subset["total_cost_eur"].mean())
-        numeric_cols = subset.select_dtypes(include=["number"]).columns
-        if len(numeric_cols) == 0:
-            return 0.0
-        return float(subset[numeric_cols].mean().mean())
-    except Exception:
-        return 0.0
-
-
-def _get_parameters() -> Dict[str, float]:
-    p = {}
-    try:
-        df = get_parameters()
-        if df is not None and not df.empty and "Variables" in df.columns and "Value" in df.columns:
-            for _, row in df.iterrows():
-                name = row.get("Variables")
-                val = row.get("Value")
-                if pd.notna(name) and pd.notna(val):
-                    try:
-                        p[str(name).strip()] = float(val)
-                    except (ValueError, TypeError):
-                        pass
-    except Exception:
-        pass
-    if "WindowToFloorRatio" not in p:
-        p["WindowToFloorRatio"] = 0.14
-    if "WindowSubsidyParameter" not in p:
-        p["WindowSubsidyParameter"] = 0.65
-    if "RentIncreasePct" not in p:
-        p["RentIncreasePct"] = 0.04
-    return p
-
-
-def _get_retrofit_costs_and_savings() -> Dict[str, Dict[str, float]]:
-    """From retrofits sheet: double glazing and triple glazing cost per m2 and savings %."""
-    result = {"double": {"cost_per_m2": 450.0, "savings_pct": 12.0}, "triple": {"cost_per_m2": 550.0, "savings_pct": 15.0}}
-    try:
-        df = get_retrofits()
-        if df is None or df.empty:
-            return result
-        for _, row in df.iterrows():
-            name = str(row.get("measure_name", "")).lower()
-            if "double" in name and "glaz" in name:
-                try:
-                    result["double"]["cost_per_m2"] = float(row.get("typical_cost_eur_m2", 0) or 450)
-                    result["double"]["savings_pct"] = float(row.get("expected_savings_pct", 0) or 12)
-                except (ValueError, TypeError):
-                    pass
-            if "triple" in name and "glaz" in name:
-                try:
-                    result["triple"]["cost_per_m2"] = float(row.get("typical_cost_eur_m2", 0) or 550)
-                    result["triple"]["savings_pct"] = float(row.get("expected_savings_pct", 0) or 15)
-                except (ValueError, TypeError):
-                    pass
-    except Exception:
-        pass
-    return result
+def _get_energy_cost_per_month(
+    building_id: str, indexes: Optional[Dict[str, Any]] = None, basis: str = DEFAULT_ENERGY_BASIS
+) -> float:
+    """
+    Monthly energy cost from energy_consumption (Calculator B10), pre-aggregated at load.
+    basis: one of ENERGY_BASES; "mean" is the Calculator sheet's average. Other bases fall back to it
+    where the building has no value. Raises ValueError for an unknown basis.
+    """
+    indexes = indexes or get_indexes()
+    mean = indexes["energy_cost"].get(str(building_id), 0.0)
+    if basis == DEFAULT_ENERGY_BASIS:
+        return mean
+    if basis not in ENERGY_BASES:
+        raise ValueError(f"Unknown EnergyBasis {basis!r}; expected one of {list(ENERGY_BASES)}")
+    rollups = indexes["energy_rollups"]
+    i = rollups["pos"].get(str(building_id))
+    values = rollups["cost"].get(basis)
+    if i is None or values is None or np.isnan(values[i]):
+        return mean
+    return float(values[i])
 
 
-def _normalize_window_type(wt: Any) -> str:
-    if pd.isna(wt):
-        return "Single-pane"
-    s = str(wt).strip()
-    if not s:
-        return "Single-pane"
-    if "single" in s.lower() or "Single" in s:
-        return "Single-pane"
-    if "double" in s.lower() or "Double" in s:
-        return "Double-pane"
-    if "triple" in s.lower() or "Triple" in s:
-        return "Triple-pane"
-    return s
+def get_energy_rollup(building_id: str) -> Optional[Dict[str, Any]]:
+    """Energy rollups (mean, median, last 12 months, seasonal, monthly profile) for one building, or None."""
+    return building_rollup(get_indexes()["energy_rollups"], building_id)
 
 
 def run_calculator(
     building_id: str,
     sub_type_of_retrofit: str,
     overrides: Optional[Dict[str, Any]] = None,
+    model: Optional[CalculatorModel] = None,
 ) -> Dict[str, Any]:
     """
     Run calculator for given building and retrofit subtype.
     sub_type_of_retrofit: "Window replacement - double glazing" or "Window replacement - triple glazing"
     overrides: optional dict with TotalSqm, NrUnits, WindowType, EnergyCostsPerMonth, RentPerUnit, facade_sqm, etc.
+    EnergyBasis selects the energy cost used when EnergyCostsPerMonth is not given (mean, median, last_12_months, seasonal).
+    model: compiled parameters/retrofits; defaults to the one for the loaded data.
+    Results are memoized per data version; each call returns a fresh dict.
     """
     overrides = overrides or {}
-    building = _get_building_row(building_id)
+    snapshot = get_snapshot()
+    if model is None:
+        model = snapshot["calculator_model"]
+    key = (snapshot["version"], model.version, str(building_id), sub_type_of_retrofit, normalize_overrides(overrides))
+    result = _results_cache.get(key)
+    if result is None:
+        with stage("calculator.compute"):
+            result = _calculate(snapshot["indexes"], model, building_id, sub_type_of_retrofit, overrides)
+        _results_cache.set(key, result)
+    return dict(result)
+
+
+def _calculate(
+    indexes: Dict[str, Any],
+    model: CalculatorModel,
+    building_id: str,
+    sub_type_of_retrofit: str,
+    overrides: Dict[str, Any],
+) -> Dict[str, Any]:
+    with stage("calculator.building_lookup"):
+        building = _get_building_row(building_id, indexes)
     if not building:
         return {"error": "Building not found"}
 
@@ -160,24 +128,27 @@ def run_calculator(
     TotalSqm = float(_ov("total_area_m2", _ov("TotalSqm", 0)) or 0)
     NrUnits = int(_ov("num_units", _ov("NrUnits", 0)) or 0)
     WindowType = _normalize_window_type(_ov("window_type", _ov("WindowType")))
-    EnergyCostsPerMonth = float(_ov("EnergyCostsPerMonth", 0)) or _get_energy_cost_per_month(building_id)
+    EnergyCostsPerMonth = float(_ov("EnergyCostsPerMonth", 0))
+    if not EnergyCostsPerMonth:
+        with stage("calculator.energy_lookup"):
+            EnergyCostsPerMonth = _get_energy_cost_per_month(
+                building_id, indexes, overrides.get("EnergyBasis", DEFAULT_ENERGY_BASIS)
+            )
     RentPerUnit = float(_ov("RentPerUnit", 0)) or 0.0
     if RentPerUnit <= 0:
-        rent_per_sqm = _get_rent_per_sqm(building_id)
+        with stage("calculator.financials_lookup"):
+            rent_per_sqm = _get_rent_per_sqm(building_id, indexes)
         if NrUnits > 0 and TotalSqm > 0:
             RentPerUnit = rent_per_sqm * TotalSqm / NrUnits
         if RentPerUnit <= 0:
             RentPerUnit = 800.0
 
-    params = _get_parameters()
-    WindowToFloorRatio = float(overrides.get("WindowToFloorRatio", params.get("WindowToFloorRatio", 0.14)))
-    WindowSubsidyParameter = float(params.get("WindowSubsidyParameter", 0.65))
-    RentIncreasePct = float(params.get("RentIncreasePct", 0.04))
+    params = model.parameters
+    WindowToFloorRatio = float(overrides.get("WindowToFloorRatio", params["WindowToFloorRatio"]))
+    WindowSubsidyParameter = params["WindowSubsidyParameter"]
+    RentIncreasePct = params["RentIncreasePct"]
 
-    retro = _get_retrofit_costs_and_savings()
-    is_double = "double" in sub_type_of_retrofit.lower()
-    cost_per_m2 = retro["double"]["cost_per_m2"] if is_double else retro["triple"]["cost_per_m2"]
-    savings_pct = retro["double"]["savings_pct"] if is_double else retro["triple"]["savings_pct"]
+    cost_per_m2, savings_pct = model.retrofit(sub_type_of_retrofit)
 
     RetrofitCostTotal = cost_per_m2 * TotalSqm * WindowToFloorRatio
     RetrofitCostTotalAfterSubsidy = RetrofitCostTotal * WindowSubsidyParameter
@@ -215,9 +186,272 @@ def run_calculator(
     }
 
 
-def get_facade_sqm_suggestion(building_id: str) -> Optional[float]:
+def run_calculator_batch(
+    building_ids: Optional[Iterable[str]],
+    sub_types_of_retrofit: Sequence[str],
+    override_sets: Optional[Sequence[Dict[str, Any]]] = None,
+    model: Optional[CalculatorModel] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run the calculator for every building_id x retrofit subtype x override set as array operations.
+    building_ids: None means all buildings. Results are ordered by building, then subtype, then override set,
+    and each matches run_calculator(building_id, sub_type, overrides) plus building_id and override_set.
+    """
+    snapshot = get_snapshot()
+    if model is None:
+        model = snapshot["calculator_model"]
+    columns = snapshot["indexes"]["calculator_columns"]
+    ids = columns["ids"] if building_ids is None else [str(b) for b in building_ids]
+    with stage("calculator.batch"):
+        return run_batch(columns, model, ids, sub_types_of_retrofit, override_sets)
+
+
+def iter_calculator_chunks(
+    sub_types_of_retrofit: Sequence[str],
+    overrides: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield run_calculator_batch results for all buildings, chunk_size buildings at a time.
+    Columns and model are captured once, so a data reload mid-iteration does not mix versions.
+    """
+    snapshot = get_snapshot()
+    model = snapshot["calculator_model"]
+    columns = snapshot["indexes"]["calculator_columns"]
+    ids = columns["ids"]
+    override_sets = [overrides] if overrides else None
+    for start in range(0, len(ids), chunk_size):
+        yield run_batch(columns, model, ids[start : start + chunk_size], sub_types_of_retrofit, override_sets)
+
+
+def run_batch(
+    columns: Dict[str, Any],
+    model: CalculatorModel,
+    ids: List[str],
+    sub_types_of_retrofit: Sequence[str],
+    override_sets: Optional[Sequence[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    Results for ids x subtypes x override sets from given calculator columns and model, ordered by
+    building, then subtype, then override set; unknown buildings get {"error": "Building not found"}.
+    """
+    override_sets = list(override_sets) if override_sets else [{}]
+    positions = [columns["pos"].get(bid) for bid in ids]
+    rows = np.array([p for p in positions if p is not None], dtype=np.intp)
+    computed = {
+        (sub_type, i): run_batch_columns(columns, model, rows, sub_type, overrides)
+        for sub_type in sub_types_of_retrofit
+        for i, overrides in enumerate(override_sets)
+    }
+    results: List[Dict[str, Any]] = []
+    k = 0
+    for bid, p in zip(ids, positions):
+        for sub_type in sub_types_of_retrofit:
+            for i in range(len(override_sets)):
+                if p is None:
+                    result = {"error": "Building not found"}
+                else:
+                    result = rows_to_results(computed[(sub_type, i)], sub_type, k)
+                results.append({"building_id": bid, "override_set": i, **result})
+        if p is not None:
+            k += 1
+    return results
+
+
+def run_calculator_ranking(
+    sub_type_of_retrofit: str,
+    metric: str = DEFAULT_METRIC,
+    district: Optional[str] = None,
+    postcode: Optional[str] = None,
+    overrides: Optional[Dict[str, Any]] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    Buildings in a district and/or postcode ranked by a calculator metric (payback years ascending,
+    savings descending). Without overrides the page is sliced from the load-time rankings; with overrides
+    the scope is computed and partially sorted. Each result equals run_calculator for that building.
+    Pages are memoized per data version; each call returns fresh result dicts.
+    Raises ValueError for unknown subtypes/metrics and LookupError for unknown districts/postcodes.
+    """
+    snapshot = get_snapshot()
+    model = snapshot["calculator_model"]
+    key = (
+        snapshot["version"],
+        model.version,
+        sub_type_of_retrofit,
+        metric,
+        district,
+        postcode,
+        normalize_overrides(overrides),
+        limit,
+        offset,
+    )
+    page = _ranking_cache.get(key)
+    if page is None:
+        page = _rank_page(snapshot, model, sub_type_of_retrofit, metric, district, postcode, overrides, limit, offset)
+        _ranking_cache.set(key, page)
+    return {**page, "results": [dict(r) for r in page["results"]]}
+
+
+def _rank_page(
+    snapshot: Dict[str, Any],
+    model: CalculatorModel,
+    sub_type_of_retrofit: str,
+    metric: str,
+    district: Optional[str],
+    postcode: Optional[str],
+    overrides: Optional[Dict[str, Any]],
+    limit: int,
+    offset: int,
+) -> Dict[str, Any]:
+    indexes = snapshot["indexes"]
+    columns = indexes["calculator_columns"]
+    with stage("calculator.ranking"):
+        rows, total, precomputed = rank(
+            snapshot["ranking"],
+            columns,
+            model,
+            sub_type_of_retrofit,
+            metric,
+            district=district,
+            postcode=postcode,
+            overrides=overrides,
+            limit=limit,
+            offset=offset,
+        )
+        page = run_batch_columns(columns, model, rows, sub_type_of_retrofit, overrides)
+    results = []
+    for k, row in enumerate(rows):
+        bid = columns["ids"][row]
+        building = indexes["building_payloads"].get(bid, {})
+        results.append(
+            {
+                "rank": offset + k + 1,
+                "building_id": bid,
+                "district": building.get("district"),
+                "postal_code": building.get("postal_code"),
+                "address": building.get("address"),
+                **rows_to_results(page, sub_type_of_retrofit, k),
+            }
+        )
+    return {
+        "sub_type_of_retrofit": sub_type_of_retrofit,
+        "metric": metric,
+        "order": "asc" if METRIC_ASCENDING[metric] else "desc",
+        "district": district,
+        "postcode": postcode,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "precomputed": precomputed,
+        "results": results,
+    }
+
+
+MAX_SWEEP_POINTS = 1_000_000
+DEFAULT_SWEEP_METRICS = (
+    "YearsUntilBreakeventRentIncrease",
+    "YearUntilBreakeven",
+    "RetrofitCostTotalAfterSubsidy",
+    "TenantSavingsPerUnit",
+)
+
+
+def _grid_length(name: str, spec: Any) -> int:
+    """Number of values on an axis, worked out without building it."""
+    if isinstance(spec, dict):
+        try:
+            start, stop = float(spec["start"]), float(spec["stop"])
+            if "num" in spec:
+                length = float(spec["num"])
+            else:
+                step = float(spec["step"])
+                if step <= 0:
+                    raise ValueError
+                # Small tolerance so float ranges like 0.02..0.08 step 0.01 keep their stop value
+                length = math.floor((stop - start) / step + 1e-9) + 1
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ValueError(f"Grid '{name}': expected a list or {{start, stop, num|step}}")
+        if not math.isfinite(length) or length != int(length):
+            raise ValueError(f"Grid '{name}': expected a list or {{start, stop, num|step}}")
+        length = int(length)
+    else:
+        try:
+            length = len(spec)
+        except TypeError:
+            raise ValueError(f"Grid '{name}': expected a list of numbers")
+    if length <= 0:
+        raise ValueError(f"Grid '{name}' is empty")
+    if length > MAX_SWEEP_POINTS:
+        raise ValueError(f"Grid '{name}' too large ({length} > {MAX_SWEEP_POINTS} points)")
+    return length
+
+
+def _grid_values(name: str, spec: Any, length: int) -> np.ndarray:
+    """Axis values from a list of numbers or a {"start", "stop", "num"|"step"} range (stop inclusive)."""
+    if isinstance(spec, dict):
+        start, stop = float(spec["start"]), float(spec["stop"])
+        if "num" in spec:
+            return np.linspace(start, stop, length)
+        return start + float(spec["step"]) * np.arange(length)
+    try:
+        values = np.asarray(list(spec), dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Grid '{name}': expected a list of numbers")
+    if values.ndim != 1:
+        raise ValueError(f"Grid '{name}': expected a list of numbers")
+    return values
+
+
+def run_calculator_sweep(
+    building_id: str,
+    sub_type_of_retrofit: str,
+    grid: Dict[str, Any],
+    overrides: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate the calculator for one building over the cartesian product of grid axes in one vectorized pass.
+    grid: parameter -> list of values or {start, stop, num|step}; parameters in SWEEP_PARAMETERS.
+    Returns base inputs, axes, output shape and one nested array (axes in grid order) per metric.
+    Raises LookupError for unknown buildings and ValueError for unknown parameters/metrics or grids above
+    MAX_SWEEP_POINTS.
+    """
+    snapshot = get_snapshot()
+    columns = snapshot["indexes"]["calculator_columns"]
+    row = columns["pos"].get(str(building_id))
+    if row is None:
+        raise LookupError("Building not found")
+    unknown = [name for name in grid if name not in SWEEP_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters {unknown}; expected some of {list(SWEEP_PARAMETERS)}")
+    lengths = {name: _grid_length(name, spec) for name, spec in grid.items()}
+    points = math.prod(lengths.values())
+    if points > MAX_SWEEP_POINTS:
+        raise ValueError(f"Grid too large ({points} > {MAX_SWEEP_POINTS} points)")
+    axes = {name: _grid_values(name, spec, lengths[name]) for name, spec in grid.items()}
+    with stage("calculator.sweep"):
+        base, outputs = sweep_payback(
+            columns, snapshot["calculator_model"], row, sub_type_of_retrofit, overrides or {}, axes
+        )
+    metrics = list(metrics or DEFAULT_SWEEP_METRICS)
+    missing = [m for m in metrics if m not in outputs]
+    if missing:
+        raise ValueError(f"Unknown metrics {missing}; expected some of {sorted(outputs)}")
+    return {
+        "building_id": str(building_id),
+        "SubTypeOfRetrofit": sub_type_of_retrofit,
+        "base": {k: round(v, 4) for k, v in base.items()},
+        "axes": {name: np.round(v, 6).tolist() for name, v in axes.items()},
+        "shape": [len(v) for v in axes.values()],
+        "outputs": {m: np.round(outputs[m], 2).tolist() for m in metrics},
+    }
+
+
+def get_facade_sqm_suggestion(building_id: str, indexes: Optional[Dict[str, Any]] = None) -> Optional[float]:
     """Suggested facade sqm: 4 * sqrt(total_area_m2/num_floors) * floor_height_m * num_floors."""
-    building = _get_building_row(building_id)
+    building = _get_building_row(building_id, indexes)
     if not building:
         return None
     total_area_m2 = float(building.get("total_area_m2", 0) or 0)
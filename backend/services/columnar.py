@@ -0,0 +1,113 @@
+"""
+Columnar, pickle-free serialization of DataFrames for the load snapshot.
+
+Every column becomes plain NumPy arrays, written to one .npz archive together with a JSON manifest,
+and is read back with np.load(allow_pickle=False): loading a snapshot can never execute code.
+- numeric, bool and datetime columns: the array itself
+- categoricals: int codes + their categories (encoded as a column)
+- text: UTF-8 bytes of all values concatenated + int64 offsets + missing mask (Arrow-style)
+- other object columns of plain scalars (str/int/float/bool/None): JSON
+Columns holding anything else raise TypeError (the caller then skips the snapshot).
+"""
+import io
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+_MANIFEST = "__manifest__"
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_text(values: pd.Series) -> bool:
+    return all(isinstance(v, str) for v in values[values.notna()].tolist())
+
+
+def _encode_text(values: pd.Series, arrays: Dict[str, np.ndarray], key: str) -> None:
+    missing = values.isna().to_numpy()
+    encoded = [b"" if m else v.encode("utf-8") for v, m in zip(values.tolist(), missing.tolist())]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    arrays[f"{key}.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    arrays[f"{key}.offsets"] = offsets
+    arrays[f"{key}.missing"] = missing
+
+
+def _decode_text(arrays: Any, key: str) -> List[Any]:
+    data = arrays[f"{key}.data"].tobytes()
+    offsets = arrays[f"{key}.offsets"].tolist()
+    missing = arrays[f"{key}.missing"].tolist()
+    return [np.nan if m else data[offsets[i] : offsets[i + 1]].decode("utf-8") for i, m in enumerate(missing)]
+
+
+def _encode_column(values: pd.Series, arrays: Dict[str, np.ndarray], key: str) -> Dict[str, Any]:
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        arrays[f"{key}.codes"] = values.cat.codes.to_numpy()
+        categories = _encode_column(pd.Series(dtype.categories), arrays, f"{key}.categories")
+        return {"kind": "category", "ordered": bool(dtype.ordered), "categories": categories}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufM":
+        arrays[key] = values.to_numpy()
+        return {"kind": "array"}
+    if pd.api.types.is_string_dtype(dtype) and _is_text(values):
+        _encode_text(values, arrays, key)
+        return {"kind": "text", "dtype": str(dtype)}
+    items = values.tolist()
+    if dtype == object and all(isinstance(v, _JSON_SCALARS) for v in items):
+        # NaN is kept apart from None: JSON has no NaN
+        nan = [isinstance(v, float) and math.isnan(v) for v in items]
+        text = json.dumps([None if n else v for v, n in zip(items, nan)])
+        arrays[f"{key}.json"] = np.frombuffer(text.encode(), dtype=np.uint8)
+        arrays[f"{key}.nan"] = np.array(nan, dtype=bool)
+        return {"kind": "json"}
+    raise TypeError(f"Cannot store column of dtype {dtype} in a columnar snapshot")
+
+
+def _decode_column(arrays: Any, key: str, spec: Dict[str, Any]) -> Any:
+    kind = spec["kind"]
+    if kind == "array":
+        return arrays[key]
+    if kind == "category":
+        categories = _decode_column(arrays, f"{key}.categories", spec["categories"])
+        return pd.Categorical.from_codes(
+            arrays[f"{key}.codes"], categories=pd.Index(categories), ordered=spec["ordered"]
+        )
+    if kind == "text":
+        return pd.array(_decode_text(arrays, key), dtype=spec["dtype"])
+    if kind == "json":
+        items = json.loads(arrays[f"{key}.json"].tobytes())
+        nan = arrays[f"{key}.nan"].tolist()
+        return np.array([np.nan if n else v for v, n in zip(items, nan)], dtype=object)
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+def write_frames(path: Path, frames: Dict[str, pd.DataFrame], meta: Dict[str, Any]) -> None:
+    """Write frames (RangeIndex, string column names) and a JSON-serializable meta dict to one .npz file."""
+    arrays: Dict[str, np.ndarray] = {}
+    manifest: Dict[str, Any] = {"meta": meta, "frames": {}}
+    for name, df in frames.items():
+        columns = []
+        for i, col in enumerate(df.columns):
+            key = f"{name}/{i}"
+            columns.append([str(col), _encode_column(df.iloc[:, i], arrays, key)])
+        manifest["frames"][name] = {"rows": len(df), "columns": columns}
+    arrays[_MANIFEST] = np.frombuffer(json.dumps(manifest).encode(), dtype=np.uint8)
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    path.write_bytes(buf.getvalue())
+
+
+def read_frames(path: Path) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """(frames, meta) from a file written by write_frames. Never unpickles."""
+    with np.load(path, allow_pickle=False) as arrays:
+        manifest = json.loads(arrays[_MANIFEST].tobytes())
+        frames = {}
+        for name, spec in manifest["frames"].items():
+            data = {i: _decode_column(arrays, f"{name}/{i}", c) for i, (_, c) in enumerate(spec["columns"])}
+            df = pd.DataFrame(data, index=pd.RangeIndex(spec["rows"]))
+            df.columns = [col for col, _ in spec["columns"]]
+            frames[name] = df
+    return frames, manifest["meta"]
@@ -0,0 +1,122 @@
+"""
+Inverted index over contractors' specialization tokens, built once per data load.
+Queries match terms against the (small) token vocabulary instead of rescanning the sheet:
+a term matches every token that contains it, so "window" still finds "Windows & Doors".
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+_TOKEN_RE = re.compile(r"\w+")
+_SPLIT_RE = re.compile(r"\s*[,;/|]\s*")
+
+DISTRICT_COLUMNS = ("district_served", "district")
+POSTCODE_COLUMNS = ("postal_code", "postcode", "postcodes_served")
+
+
+def tokenize(text: Any) -> List[str]:
+    if text is None or (isinstance(text, float) and text != text):
+        return []
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def _split_values(value: Any) -> List[str]:
+    """Multi-valued cells ("Mitte, Pankow") -> normalized values."""
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    return [v.strip().lower() for v in _SPLIT_RE.split(str(value)) if v.strip()]
+
+
+def _column(df: pd.DataFrame, names: Iterable[str]) -> Optional[str]:
+    return next((c for c in names if c in df.columns), None)
+
+
+def _sort_key(row: Dict[str, Any]) -> Tuple[float, float]:
+    """Higher avg_rating, then more num_reviews, first."""
+    def num(key: str) -> float:
+        v = row.get(key)
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            return 0.0
+        return v if v == v else 0.0
+
+    return (-num("avg_rating"), -num("num_reviews"))
+
+
+def build_contractor_index(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    tokens: specialization token -> row positions
+    vocab: sorted tokens
+    districts / postcodes: normalized value -> row positions (if the sheet has such columns)
+    rating_rank: row position -> rank by avg_rating/num_reviews (0 = best)
+    """
+    index: Dict[str, Any] = {"tokens": {}, "vocab": [], "districts": {}, "postcodes": {}, "rating_rank": []}
+    if df is None or df.empty:
+        return index
+    records = df.to_dict("records")
+    tokens: Dict[str, Set[int]] = {}
+    if "specialization" in df.columns:
+        for i, row in enumerate(records):
+            for tok in tokenize(row.get("specialization")):
+                tokens.setdefault(tok, set()).add(i)
+    index["tokens"] = {tok: frozenset(pos) for tok, pos in tokens.items()}
+    index["vocab"] = sorted(tokens)
+    for key, names in (("districts", DISTRICT_COLUMNS), ("postcodes", POSTCODE_COLUMNS)):
+        col = _column(df, names)
+        if col is None:
+            continue
+        values: Dict[str, Set[int]] = {}
+        for i, row in enumerate(records):
+            for v in _split_values(row.get(col)):
+                values.setdefault(v, set()).add(i)
+        index[key] = {v: frozenset(pos) for v, pos in values.items()}
+    order = sorted(range(len(records)), key=lambda i: _sort_key(records[i]))
+    rank = [0] * len(records)
+    for r, i in enumerate(order):
+        rank[i] = r
+    index["rating_rank"] = rank
+    return index
+
+
+def _term_positions(index: Dict[str, Any], term: str) -> Set[int]:
+    out: Set[int] = set()
+    for tok in index["vocab"]:
+        if term in tok:
+            out.update(index["tokens"][tok])
+    return out
+
+
+def search_contractors(
+    index: Dict[str, Any],
+    query: str,
+    mode: str = "and",
+    districts: Optional[Iterable[str]] = None,
+    postcode: Optional[str] = None,
+    sort: str = "relevance",
+) -> List[int]:
+    """
+    Row positions of contractors matching the query terms (all terms for mode="and", any for "or"),
+    optionally restricted to districts and/or a postcode.
+    sort="relevance": most matched terms first, then sheet order; sort="rating": best rated first.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    per_term = [_term_positions(index, t) for t in terms]
+    if mode == "or":
+        candidates = set().union(*per_term)
+    else:
+        candidates = set.intersection(*per_term)
+    if districts is not None:
+        allowed: Set[int] = set()
+        for d in districts:
+            allowed.update(index["districts"].get(str(d).strip().lower(), ()))
+        candidates &= allowed
+    if postcode:
+        candidates &= index["postcodes"].get(str(postcode).strip().lower(), frozenset())
+    if sort == "rating":
+        return sorted(candidates, key=lambda i: index["rating_rank"][i])
+    score = {i: sum(1 for pos in per_term if i in pos) for i in candidates}
+    return sorted(candidates, key=lambda i: (-score[i], i))
@@ -0,0 +1,129 @@
+"""
+Per-building energy rollups, computed once per data load from the energy_consumption sheet.
+For monthly cost (total_cost_eur) and consumption (consumption_kwh):
+- mean: mean over all monthly rows
+- median: median monthly value
+- last_12_months: mean of the 12 most recent (year, month) rows
+- seasonal: mean of the calendar-month profile, so months covered twice (e.g. two winters) do not
+  outweigh months covered once
+- profile: mean per calendar month (January..December), NaN where a month has no data
+Stored as NumPy arrays aligned with `ids`; look up a building with `pos[building_id]`.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ENERGY_BASES = ("mean", "median", "last_12_months", "seasonal")
+DEFAULT_ENERGY_BASIS = "mean"
+ROLLUP_COLUMNS = {"cost": "total_cost_eur", "consumption": "consumption_kwh"}
+MONTHS = 12
+
+
+def _empty() -> Dict[str, Any]:
+    return {"ids": [], "pos": {}, "cost": {}, "consumption": {}, "cost_profile": None, "consumption_profile": None}
+
+
+def build_energy_rollups(ec: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    ids / pos: building_ids with energy rows and building_id -> position
+    cost, consumption: basis -> float64 array (missing column -> basis absent)
+    cost_profile, consumption_profile: (len(ids), 12) float64 arrays, or None
+    """
+    if ec is None or ec.empty or "building_id" not in ec.columns:
+        return _empty()
+    keys = ec["building_id"]
+    if not isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.astype(str).astype("category")
+    codes = keys.cat.codes.to_numpy()
+    keep = codes >= 0
+    df = pd.DataFrame({"key": codes[keep]})
+    for name, col in ROLLUP_COLUMNS.items():
+        if col in ec.columns:
+            df[name] = pd.to_numeric(ec[col], errors="coerce").to_numpy(dtype=np.float64)[keep]
+    has_month = "month" in ec.columns
+    if has_month:
+        month = pd.to_numeric(ec["month"], errors="coerce").to_numpy(dtype=np.float64)[keep]
+        df["month"] = np.where((month >= 1) & (month <= MONTHS), month, np.nan)
+        if "year" in ec.columns:
+            year = pd.to_numeric(ec["year"], errors="coerce").to_numpy(dtype=np.float64)[keep]
+            df["period"] = year * MONTHS + df["month"]
+    if "period" not in df.columns:
+        df["period"] = np.arange(len(df), dtype=np.float64)
+
+    by_key = df.groupby("key", sort=True)
+    present = np.unique(df["key"].to_numpy())
+    categories = keys.cat.categories
+    ids = [str(categories[c]) for c in present]
+    # Undated readings (NaN period) are not "recent": buildings with only those fall back to the mean
+    dated = df[df["period"].notna()]
+    recent = dated.sort_values(["key", "period"], kind="stable").groupby("key", sort=True).tail(MONTHS)
+    out: Dict[str, Any] = {"ids": ids, "pos": {bid: i for i, bid in enumerate(ids)}}
+    for name in ROLLUP_COLUMNS:
+        out[name] = {}
+        out[f"{name}_profile"] = None
+        if name not in df.columns:
+            continue
+        values = by_key[name]
+        out[name]["mean"] = values.mean().to_numpy(dtype=np.float64)
+        out[name]["median"] = values.median().to_numpy(dtype=np.float64)
+        out[name]["last_12_months"] = (
+            recent.groupby("key", sort=True)[name].mean().reindex(present).to_numpy(dtype=np.float64)
+        )
+        if has_month:
+            profile = (
+                df.groupby(["key", "month"], sort=True)[name]
+                .mean()
+                .unstack("month")
+                .reindex(index=present, columns=np.arange(1, MONTHS + 1, dtype=np.float64))
+                .to_numpy(dtype=np.float64)
+            )
+            out[f"{name}_profile"] = profile
+            covered = (~np.isnan(profile)).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                seasonal = np.nansum(profile, axis=1) / covered
+            out[name]["seasonal"] = np.where(covered > 0, seasonal, out[name]["mean"])
+        else:
+            out[name]["seasonal"] = out[name]["mean"]
+    return out
+
+
+def basis_columns(rollups: Dict[str, Any], ids: Sequence[str], fallback: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    basis -> monthly energy cost aligned with `ids` (the calculator's building order).
+    NaN and buildings without energy rows take `fallback` (the load-time mean used by default).
+    """
+    out = {DEFAULT_ENERGY_BASIS: fallback}
+    pos = rollups["pos"]
+    rows = np.array([pos.get(bid, -1) for bid in ids], dtype=np.intp)
+    found = rows >= 0
+    for basis in ENERGY_BASES:
+        if basis == DEFAULT_ENERGY_BASIS or basis not in rollups["cost"]:
+            out.setdefault(basis, fallback)
+            continue
+        values = fallback.copy()
+        picked = rollups["cost"][basis][rows[found]]
+        values[found] = np.where(np.isnan(picked), fallback[found], picked)
+        out[basis] = values
+    return out
+
+
+def _round(v: float) -> Optional[float]:
+    return None if v is None or v != v else round(float(v), 2)
+
+
+def building_rollup(rollups: Dict[str, Any], building_id: str) -> Optional[Dict[str, Any]]:
+    """JSON-ready rollups for one building (None if it has no energy rows)."""
+    i = rollups["pos"].get(str(building_id))
+    if i is None:
+        return None
+    out: Dict[str, Any] = {}
+    for name in ROLLUP_COLUMNS:
+        if not rollups[name]:
+            continue
+        entry = {basis: _round(values[i]) for basis, values in rollups[name].items()}
+        profile = rollups[f"{name}_profile"]
+        if profile is not None:
+            entry["profile"] = [_round(v) for v in profile[i]]
+        out[name] = entry
+    return out
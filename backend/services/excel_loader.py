@@ -1,67 +1,556 @@
 """
 Load and cache Excel data from data/mock_data_combo.xlsx.
 Uses same sheet and column names as plan (buildings, financials, energy_consumption, retrofits, parameters, contractors).
+
+Sheets are streamed in chunks (see backend.services.ingest) with no row limit; DATA_PATH may also
+point to a directory of per-sheet CSV/Parquet files. Parsing is still slow, so the parsed sheets are also written to a
+columnar snapshot (backend.services.columnar: NumPy arrays + JSON, dtypes preserved, never unpickled) keyed by the
+workbook's content hash.
+Later starts load the snapshot and only fall back to the xlsx when the workbook changed.
+Reloads build a complete new snapshot off the request path and swap it in atomically.
+Loads are single-flight: callers that arrive while a load is running wait for it and share its result
+(or its error) instead of parsing the workbook again. Reloads never join a load that started before they
+were requested (it may have read the old workbook): they wait for it to finish and then load again.
 """
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, wait
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
-# In-memory cache
-_data = {}
+from backend.services.batch_calculator import run_portfolio
+from backend.services.calculator_model import CalculatorModel, compile_calculator_model
+from backend.services.indexes import build_indexes
+from backend.services.metrics import stage
+from backend.services.ranking import build_ranking_index
+from backend.services.schema import normalize_frames
+from backend.services.stats_cube import build_stats_cube
+from backend.services import columnar, ingest, shared_data
+
+logger = logging.getLogger(__name__)
+
+SHEETS = ("buildings", "financials", "energy_consumption", "retrofits", "parameters", "contractors")
+
+# Bump when the loaded frames change shape/dtypes so old snapshots are ignored.
+SNAPSHOT_FORMAT = 5
+
+# In-memory cache: one complete snapshot, replaced as a whole on reload (see _publish)
+_data: Dict[str, Any] = {}
+# The load in progress as (flight number, Future, reads the workbook), shared by callers that may join it
+# (see _load_once). Only one flight runs at a time, so a reload and a lazy load never parse the workbook together.
+_inflight: Optional[Tuple[int, Future, bool]] = None
+_inflight_lock = threading.Lock()
+# Flights started so far; a reload only joins a flight numbered higher than this was when it was requested
+_flights = 0
+# A start_reload() thread is waiting for its flight; further requests are covered by it
+_reload_queued = False
+# shared_data.file_id of the plane the current data was attached from (None if not from the plane),
+# and when get_snapshot last checked it for a republish (see _check_plane)
+_plane_id: Optional[Tuple[int, int, int]] = None
+_plane_checked = 0.0
+# (time.monotonic(), error) of the last failed load; lazy loads do not retry within get_retry_seconds()
+_last_failure: Optional[Tuple[float, BaseException]] = None
+# Called after each swap (e.g. to clear caches derived from the previous data)
+_reload_listeners: List[Callable[[], None]] = []
 
 
 def get_data_path() -> Path:
+    """Workbook path (or directory of per-sheet CSV/Parquet files): DATA_PATH if set, else data/mock_data_combo.xlsx."""
+    env = os.environ.get("DATA_PATH", "").strip()
+    if env:
+        return Path(env)
     base = Path(__file__).resolve().parent.parent.parent
     return base / "data" / "mock_data_combo.xlsx"
 
 
-def load_excel_data() -> None:
-    path = get_data_path()
+def get_snapshot_dir() -> Optional[Path]:
+    """Snapshot directory (DATA_SNAPSHOT_DIR, default data/.cache). None if DATA_SNAPSHOT=off."""
+    if os.environ.get("DATA_SNAPSHOT", "").strip().lower() in ("0", "off", "false", "no"):
+        return None
+    env = os.environ.get("DATA_SNAPSHOT_DIR", "").strip()
+    if env:
+        return Path(env)
+    return get_data_path().parent / ".cache"
+
+
+def get_chunk_rows() -> int:
+    """Rows per ingestion chunk (DATA_CHUNK_ROWS, default 50000)."""
+    try:
+        return max(1, int(os.environ.get("DATA_CHUNK_ROWS", ingest.DEFAULT_CHUNK_ROWS)))
+    except ValueError:
+        return ingest.DEFAULT_CHUNK_ROWS
+
+
+def _file_sha256(path: Path) -> str:
+    """Content hash of the workbook, or of all per-sheet files (in SHEETS order) for a directory."""
+    h = hashlib.sha256()
+    for file in ingest.source_files(path, SHEETS):
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_stat(path: Path) -> Tuple[int, int]:
+    """(total size, newest mtime_ns) of the files backing the data."""
+    stats = [f.stat() for f in ingest.source_files(path, SHEETS)]
+    return sum(st.st_size for st in stats), max(st.st_mtime_ns for st in stats)
+
+
+def _workbook_fingerprint(path: Path, snapshot_dir: Optional[Path]) -> Tuple[str, int]:
+    """
+    Return (content sha256, mtime_ns) of the workbook.
+    If size and mtime match the last recorded fingerprint, the stored hash is reused without re-reading the file.
+    """
+    size, mtime_ns = _source_stat(path)
+    meta_path = snapshot_dir / "fingerprint.json" if snapshot_dir else None
+    if meta_path is not None and meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text())
+            if (
+                meta.get("path") == str(path)
+                and meta.get("size") == size
+                and meta.get("mtime_ns") == mtime_ns
+            ):
+                return meta["sha256"], mtime_ns
+        except (OSError, ValueError, KeyError):
+            pass
+    sha = _file_sha256(path)
+    if meta_path is not None:
+        try:
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            meta = {"path": str(path), "size": size, "mtime_ns": mtime_ns, "sha256": sha}
+            meta_path.write_text(json.dumps(meta))
+        except OSError as e:
+            logger.warning("Could not write workbook fingerprint: %s", e)
+    return sha, mtime_ns
+
+
+def _snapshot_path(snapshot_dir: Path, path: Path, sha: str) -> Path:
+    return snapshot_dir / f"{path.stem}-{sha[:16]}-v{SNAPSHOT_FORMAT}.npz"
+
+
+def _is_snapshot_of(name: str, stem: str) -> bool:
+    """True for snapshot files of this workbook stem only ("data-2024" snapshots are not "data"'s); .pkl = old format."""
+    return re.fullmatch(re.escape(stem) + r"-[0-9a-f]{16}-v\d+\.(npz|pkl)", name) is not None
+
+
+def _read_snapshot(snap_path: Path, sha: str) -> Optional[Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, int]]]]:
+    """(frames, memory report) from the snapshot, or None if missing, stale or unreadable."""
+    if not snap_path.exists():
+        return None
+    try:
+        frames, meta = columnar.read_frames(snap_path)
+        if meta.get("sha256") != sha or meta.get("format") != SNAPSHOT_FORMAT:
+            return None
+        if not all(name in frames for name in SHEETS):
+            return None
+        return frames, meta["memory"]
+    except Exception as e:
+        logger.warning("Ignoring unreadable snapshot %s: %s", snap_path, e)
+        return None
+
+
+def _write_snapshot(
+    snap_path: Path, sha: str, mtime_ns: int, frames: Dict[str, pd.DataFrame], memory: Dict[str, Dict[str, int]]
+) -> None:
+    """Write snapshot atomically (tmp file + rename) and drop snapshots of older versions of the same workbook."""
+    tmp = snap_path.with_suffix(f".tmp{os.getpid()}")
+    try:
+        snap_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"format": SNAPSHOT_FORMAT, "sha256": sha, "mtime_ns": mtime_ns, "memory": memory}
+        columnar.write_frames(tmp, frames, meta)
+        os.replace(tmp, snap_path)
+        stem = snap_path.name.split(f"-{sha[:16]}-")[0]
+        for old in snap_path.parent.iterdir():
+            if old != snap_path and _is_snapshot_of(old.name, stem):
+                old.unlink(missing_ok=True)
+    except (OSError, TypeError) as e:
+        tmp.unlink(missing_ok=True)
+        logger.warning("Could not write snapshot %s: %s", snap_path, e)
+
+
+def _read_workbook(path: Path) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, int]]]:
+    """Stream all sheets and normalize them to the compact layout of backend.services.schema."""
+    frames = ingest.read_frames(path, SHEETS, get_chunk_rows())
+    with stage("load.normalize"):
+        return normalize_frames(frames, SHEETS)
+
+
+def _build_data(path: Path) -> Dict[str, Any]:
+    """Read frames (snapshot or xlsx) and build all derived structures into a new, complete snapshot dict."""
     if not path.exists():
         raise FileNotFoundError(f"Excel file not found: {path}")
+    start = time.perf_counter()
     try:
-        with pd.ExcelFile(path, engine="openpyxl") as xl:
-            _data["buildings"] = pd.read_excel(xl, sheet_name="buildings", nrows=12000)
-            _data["financials"] = pd.read_excel(xl, sheet_name="financials", nrows=12000)
-            _data["energy_consumption"] = pd.read_excel(xl, sheet_name="energy_consumption", nrows=20000)
-            _data["retrofits"] = pd.read_excel(xl, sheet_name="retrofits")
-            _data["parameters"] = pd.read_excel(xl, sheet_name="parameters")
-            _data["contractors"] = pd.read_excel(xl, sheet_name="contractors")
+        snapshot_dir = get_snapshot_dir()
+        sha, mtime_ns = _workbook_fingerprint(path, snapshot_dir)
+        snap_path = _snapshot_path(snapshot_dir, path, sha) if snapshot_dir else None
+        with stage("load.snapshot_read"):
+            cached = _read_snapshot(snap_path, sha) if snap_path else None
+        source = "snapshot"
+        if cached is None:
+            with stage("load.xlsx_parse"):
+                cached = _read_workbook(path)
+            source = "files" if path.is_dir() else "xlsx"
+            if snap_path:
+                with stage("load.snapshot_write"):
+                    _write_snapshot(snap_path, sha, mtime_ns, *cached)
     except Exception as e:
         raise RuntimeError(f"Failed to load Excel: {e}") from e
+    frames, memory = cached
+    return _derive(frames, memory, sha, mtime_ns, source, start)
+
+
+def _derive(
+    frames: Dict[str, pd.DataFrame],
+    memory: Dict[str, Dict[str, int]],
+    sha: str,
+    mtime_ns: int,
+    source: str,
+    start: float,
+) -> Dict[str, Any]:
+    """
+    Snapshot dict from loaded (normalized) frames: frames + indexes + calculator model + rankings + stats cube
+    + version + load info.
+    memory: per-sheet {"before", "after"} bytes of the normalization step.
+    """
+    version = sha[:12]
+    data: Dict[str, Any] = dict(frames)
+    with stage("load.build_indexes"):
+        data["indexes"] = build_indexes(frames)
+    with stage("load.compile_model"):
+        data["calculator_model"] = compile_calculator_model(frames["parameters"], frames["retrofits"], version)
+    with stage("load.portfolio"):
+        portfolio = run_portfolio(data["indexes"]["calculator_columns"], data["calculator_model"])
+    with stage("load.ranking"):
+        data["ranking"] = build_ranking_index(portfolio, data["indexes"]["buildings"])
+    with stage("load.stats"):
+        data["stats"] = build_stats_cube(data["indexes"], portfolio, previous=_data.get("stats"))
+    data["version"] = version
+    seconds = time.perf_counter() - start
+    data["load_info"] = {
+        "source": source,
+        "seconds": round(seconds, 3),
+        "sha256": sha,
+        "mtime_ns": mtime_ns,
+        "loaded_at": time.time(),
+        "version": version,
+        "rows": {name: int(len(frames[name])) for name in SHEETS},
+        "memory_bytes": {name: int(frames[name].memory_usage(deep=True).sum()) for name in SHEETS},
+        "memory_bytes_raw": {name: memory[name]["before"] for name in SHEETS if name in memory},
+        "stats_refresh": data["stats"]["refresh"],
+    }
+    before = sum(data["load_info"]["memory_bytes_raw"].values())
+    after = sum(data["load_info"]["memory_bytes"].values())
+    logger.info("Frames use %.1f MiB (%.1f MiB before dtype normalization)", after / 2**20, before / 2**20)
+    return data
+
+
+def get_data_plane_path() -> Optional[Path]:
+    """
+    Shared data plane file when DATA_PLANE=shared (see backend.services.shared_data), else None.
+    DATA_PLANE_PATH overrides the location (default /dev/shm if present, else the snapshot directory).
+    """
+    if os.environ.get("DATA_PLANE", "").strip().lower() != "shared":
+        return None
+    env = os.environ.get("DATA_PLANE_PATH", "").strip()
+    if env:
+        return Path(env)
+    name = f"heatmykiez-{get_data_path().stem}.plane"
+    shm = Path("/dev/shm")
+    if shm.is_dir():
+        return shm / name
+    return (get_snapshot_dir() or get_data_path().parent / ".cache") / name
+
+
+def _load_shared(path: Path, plane_path: Path) -> Tuple[Dict[str, Any], Optional[Tuple[int, int, int]]]:
+    """
+    Attach to the shared data plane, building and publishing it first if it is missing or stale.
+    The cross-process lock makes exactly one worker do the build; the others wait and attach.
+    Returns the data and the file_id of the attached plane.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Excel file not found: {path}")
+    start = time.perf_counter()
+    sha, _ = _workbook_fingerprint(path, get_snapshot_dir())
+    version = sha[:12]
+    with shared_data.exclusive_lock(plane_path):
+        published = False
+        if shared_data.read_version(plane_path) != version:
+            shared_data.publish(_build_data(path), plane_path)
+            published = True
+        data = shared_data.attach(plane_path)
+        plane_id = shared_data.file_id(plane_path)
+    info = dict(data["load_info"])
+    info.update({"source": "shared", "published": published, "seconds": round(time.perf_counter() - start, 3)})
+    data["load_info"] = info
+    return data, plane_id
+
+
+def publish_data_plane() -> Path:
+    """Build the snapshot and publish it to the shared data plane (for a loader process before workers start)."""
+    plane_path = get_data_plane_path()
+    if plane_path is None:
+        raise RuntimeError("Set DATA_PLANE=shared to publish the shared data plane")
+    with shared_data.exclusive_lock(plane_path):
+        shared_data.publish(_build_data(get_data_path()), plane_path)
+    return plane_path
+
+
+def _publish(data: Dict[str, Any]) -> None:
+    """Swap in a fully built snapshot. Rebinding one global is atomic: readers see the old or the new data, never a mix."""
+    global _data
+    previous = _data.get("version")
+    _data = data
+    for listener in _reload_listeners:
+        try:
+            listener()
+        except Exception:
+            logger.exception("Reload listener %r failed", listener)
+    info = data["load_info"]
+    logger.info(
+        "Data version %s -> %s: loaded from %s in %.3fs",
+        previous,
+        data["version"],
+        info["source"],
+        info["seconds"],
+    )
+
+
+def add_reload_listener(listener: Callable[[], None]) -> None:
+    """Register a callback to run after new data is swapped in."""
+    _reload_listeners.append(listener)
+
+
+def get_retry_seconds() -> float:
+    """Seconds a failed load is reported to lazy callers before they try again (DATA_RETRY_SECONDS, default 5)."""
+    try:
+        return max(0.0, float(os.environ.get("DATA_RETRY_SECONDS", "5")))
+    except ValueError:
+        return 5.0
+
+
+def _load_once(fresh: bool = False, build: Optional[Callable[[], Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Build and publish a snapshot, single-flight: the first caller loads, callers arriving meanwhile
+    wait on the same Future and get its snapshot or its exception.
+    fresh: only join a workbook load that started after this call (reloads); an older one is waited out.
+    build: publish build() instead of loading the workbook; such a flight is never joined by another build.
+    """
+    global _inflight, _flights, _last_failure, _reload_queued, _plane_id
+    with _inflight_lock:
+        requested = _flights
+    while True:
+        with _inflight_lock:
+            if _inflight is None:
+                _flights += 1
+                future: Future = Future()
+                _inflight = (_flights, future, build is None)
+                if fresh:
+                    _reload_queued = False
+                break
+            number, current, reads_workbook = _inflight
+            joinable = build is None and (not fresh or (reads_workbook and number > requested))
+            if joinable and fresh:
+                _reload_queued = False
+        if joinable:
+            return current.result()
+        wait([current])
+    try:
+        plane_path = get_data_plane_path()
+        plane_id = None
+        if build is not None:
+            data = build()
+        elif plane_path is not None:
+            data, plane_id = _load_shared(get_data_path(), plane_path)
+        else:
+            data = _build_data(get_data_path())
+        _publish(data)
+        _plane_id = plane_id
+        if build is None:
+            _last_failure = None
+        future.set_result(data)
+        return data
+    except BaseException as e:
+        if build is None:
+            _last_failure = (time.monotonic(), e)
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight = None
+
+
+def load_excel_data() -> None:
+    """Load the data and publish it; joins a load that is already running."""
+    _load_once()
+
+
+def load_frames(frames: Dict[str, pd.DataFrame], version: str = "frames") -> None:
+    """
+    Publish already-built frames (all SHEETS) instead of reading the workbook, e.g. synthetic
+    datasets for benchmarks. Indexes and the calculator model are built as for a normal load,
+    in its own flight (a load already running finishes first and cannot overwrite these frames).
+    """
+    start = time.perf_counter()
+    missing = [name for name in SHEETS if name not in frames]
+    if missing:
+        raise ValueError(f"Missing sheets: {missing}")
+
+    def _build() -> Dict[str, Any]:
+        with stage("load.normalize"):
+            normalized, memory = normalize_frames(frames, SHEETS)
+        return _derive(normalized, memory, version, 0, "frames", start)
+
+    _load_once(build=_build)
+
+
+def reload_data() -> Dict[str, Any]:
+    """Rebuild frames and indexes from the workbook as it is now, then swap them in. Returns the new load info."""
+    _load_once(fresh=True)
+    return get_load_info()
+
+
+def start_reload() -> bool:
+    """Reload in a background thread. Returns False if a reload requested earlier has not started yet."""
+    global _reload_queued
+    with _inflight_lock:
+        if _reload_queued:
+            return False
+        _reload_queued = True
+
+    def _run() -> None:
+        try:
+            reload_data()
+        except Exception:
+            logger.exception("Data reload failed; keeping version %s", _data.get("version"))
+
+    threading.Thread(target=_run, name="data-reload", daemon=True).start()
+    return True
+
+
+def get_plane_check_seconds() -> float:
+    """Seconds between checks for a republished shared data plane (DATA_PLANE_CHECK_SECONDS, default 1)."""
+    try:
+        return max(0.0, float(os.environ.get("DATA_PLANE_CHECK_SECONDS", "1")))
+    except ValueError:
+        return 1.0
+
+
+def _check_plane() -> None:
+    """
+    Re-attach in the background when another process republished the shared data plane (e.g. its
+    reload picked up a new workbook). Requests keep using the current mapping until then.
+    """
+    global _plane_checked
+    now = time.monotonic()
+    if now - _plane_checked < get_plane_check_seconds():
+        return
+    _plane_checked = now
+    plane_path = get_data_plane_path()
+    current = shared_data.file_id(plane_path) if plane_path is not None else None
+    if current is not None and current != _plane_id and _inflight is None:
+        logger.info("Data plane %s was republished, re-attaching", plane_path)
+        start_reload()
+
+
+def _workbook_stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        return _source_stat(path)
+    except OSError:
+        return None
+
+
+def start_watcher(interval: float) -> threading.Event:
+    """
+    Poll the workbook every `interval` seconds and reload when its size or mtime changes.
+    Returns an Event; set it to stop the watcher.
+    """
+    stop = threading.Event()
+    path = get_data_path()
+
+    def _watch() -> None:
+        last = _workbook_stat(path)
+        while not stop.wait(interval):
+            current = _workbook_stat(path)
+            if current is not None and current != last:
+                last = current
+                logger.info("%s changed on disk, reloading", path.name)
+                try:
+                    reload_data()
+                except Exception:
+                    logger.exception("Data reload failed; keeping version %s", _data.get("version"))
+
+    threading.Thread(target=_watch, name="data-watcher", daemon=True).start()
+    return stop
+
+
+def get_snapshot() -> Dict[str, Any]:
+    """
+    Current data snapshot (frames, indexes, calculator_model, ranking, stats, version, load_info).
+    Read it once per request when several parts are needed, so they come from the same data version.
+    """
+    data = _data
+    if not data:
+        failure = _last_failure
+        if failure is not None and time.monotonic() - failure[0] < get_retry_seconds():
+            raise RuntimeError(f"Data is not loaded: {failure[1]}") from failure[1]
+        data = _load_once()
+    elif _plane_id is not None:
+        _check_plane()
+    return data
+
+
+def is_loaded() -> bool:
+    return bool(_data)
+
+
+def get_data_version() -> str:
+    return get_snapshot()["version"]
+
+
+def get_load_info() -> Dict[str, Any]:
+    """Source ("snapshot", "xlsx" or "shared"), duration and workbook hash of the last load."""
+    return dict(_data.get("load_info", {}))
 
 
 def get_buildings():
-    if "buildings" not in _data:
-        load_excel_data()
-    return _data["buildings"]
+    return get_snapshot()["buildings"]
 
 
 def get_financials():
-    if "financials" not in _data:
-        load_excel_data()
-    return _data["financials"]
+    return get_snapshot()["financials"]
 
 
 def get_energy_consumption():
-    if "energy_consumption" not in _data:
-        load_excel_data()
-    return _data["energy_consumption"]
+    return get_snapshot()["energy_consumption"]
 
 
 def get_retrofits():
-    if "retrofits" not in _data:
-        load_excel_data()
-    return _data["retrofits"]
+    return get_snapshot()["retrofits"]
 
 
 def get_parameters():
-    if "parameters" not in _data:
-        load_excel_data()
-    return _data["parameters"]
+    return get_snapshot()["parameters"]
 
 
 def get_contractors():
-    if "contractors" not in _data:
-        load_excel_data()
-    return _data["contractors"]
+    return get_snapshot()["contractors"]
+
+
+def get_indexes() -> Dict[str, Any]:
+    """building_id lookup indexes (see backend.services.indexes.build_indexes)."""
+    return get_snapshot()["indexes"]
+
+
+def get_calculator_model() -> CalculatorModel:
+    """Calculator parameters/retrofits compiled for the loaded data version."""
+    return get_snapshot()["calculator_model"]
@@ -0,0 +1,127 @@
+"""
+HTTP caching for read endpoints whose responses only change when the data changes.
+ETag = data version + hash of path and query, so it is known before the route runs: a matching
+If-None-Match (or If-Modified-Since) gets a 304 straight from the middleware, without touching
+indexes or frames. Successful responses carry ETag, Last-Modified and Cache-Control.
+
+HTTP_CACHE=off disables it; HTTP_CACHE_CONTROL sets the Cache-Control value (default "public, max-age=60",
+e.g. "public, max-age=300, stale-while-revalidate=3600" to let a CDN or reverse proxy absorb the address cascade).
+"""
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from backend.services.excel_loader import get_load_info
+
+# GET endpoints that are pure functions of (data version, path, query)
+CACHEABLE_PREFIXES = ("/addresses/", "/buildings/", "/contractors", "/wizard/", "/calculator/ranking", "/stats")
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE", "").strip().lower() not in ("0", "off", "false", "no")
+
+
+def get_cache_control() -> str:
+    return os.environ.get("HTTP_CACHE_CONTROL", "").strip() or DEFAULT_CACHE_CONTROL
+
+
+def is_cacheable(method: str, path: str) -> bool:
+    return method in ("GET", "HEAD") and path.startswith(CACHEABLE_PREFIXES)
+
+
+def make_etag(version: str, path: str, query_string: bytes) -> str:
+    """Weak ETag from data version and request; query parameter order does not matter."""
+    query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+    digest = hashlib.blake2b(f"{path}?{query}".encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def last_modified(info: Dict[str, Any]) -> Optional[str]:
+    """Workbook mtime (same for every worker and restart), else the time the data was loaded."""
+    mtime_ns = info.get("mtime_ns") or 0
+    ts = mtime_ns / 1e9 if mtime_ns else info.get("loaded_at")
+    return formatdate(int(ts), usegmt=True) if ts else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored. "*" is left to the route (see the middleware)."""
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, modified: Optional[str]) -> bool:
+    if not modified:
+        return False
+    try:
+        return parsedate_to_datetime(modified) <= parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(headers: Dict[bytes, bytes], etag: str, modified: Optional[str]) -> bool:
+    """RFC 9110: If-None-Match wins; If-Modified-Since is only checked without it."""
+    if b"if-none-match" in headers:
+        return _etag_matches(headers[b"if-none-match"].decode("latin-1"), etag)
+    if b"if-modified-since" in headers:
+        return _not_modified_since(headers[b"if-modified-since"].decode("latin-1"), modified)
+    return False
+
+
+class HTTPCacheMiddleware:
+    """
+    ASGI middleware: conditional GETs on CACHEABLE_PREFIXES answered with 304 before routing.
+    "If-None-Match: *" runs the route and turns its 200 into a 304, so missing resources still get their 404.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if not HTTP_CACHE_ENABLED or scope["type"] != "http" or not is_cacheable(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        info = get_load_info()
+        version = info.get("version")
+        if not version:
+            await self.app(scope, receive, send)
+            return
+        etag = make_etag(version, scope["path"], scope.get("query_string", b""))
+        modified = last_modified(info)
+        cache_headers: List[Tuple[bytes, bytes]] = [
+            (b"etag", etag.encode()),
+            (b"cache-control", get_cache_control().encode()),
+        ]
+        if modified:
+            cache_headers.append((b"last-modified", modified.encode()))
+        headers = dict(scope.get("headers", []))
+        # "If-None-Match: *" only matches if the resource exists, which only the route knows
+        any_etag = headers.get(b"if-none-match", b"").strip() == b"*"
+        if not any_etag and is_not_modified(headers, etag, modified):
+            scope["route_label"] = "http_cache.not_modified"
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        not_modified = False
+
+        async def _send(message: Dict[str, Any]) -> None:
+            nonlocal not_modified
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                if any_etag:
+                    not_modified = True
+                    message = {"type": "http.response.start", "status": 304, "headers": cache_headers}
+                else:
+                    message = {**message, "headers": list(message.get("headers", [])) + cache_headers}
+            elif message["type"] == "http.response.body" and not_modified:
+                if message.get("more_body", False):
+                    return
+                message = {"type": "http.response.body", "body": b""}
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,127 @@
+"""
+Lookup indexes built once per data load, so per-request lookups by building_id are index reads
+instead of `df["building_id"].astype(str) == ...` scans. The per-building row lookups are
+row_table Mappings over NumPy columns (shared zero-copy through the data plane, see shared_data).
+Returned structures are shared between requests: callers must not mutate them.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backend.services.address_parser import build_address_index
+from backend.services.address_search import build_search_index
+from backend.services.batch_calculator import build_calculator_columns
+from backend.services.contractor_index import build_contractor_index
+from backend.services.energy_rollups import build_energy_rollups
+from backend.services.row_table import RowTable, ValueTable
+from backend.services.serializers import building_payloads, contractor_payloads
+
+
+def _rows_by_id(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """building_id (as str) -> row dict. First row wins, like `df[mask].iloc[0]`."""
+    if df is None or df.empty or "building_id" not in df.columns:
+        return {}
+    out: Dict[str, Dict[str, Any]] = {}
+    keys = df["building_id"].astype(str).tolist()
+    for key, row in zip(keys, df.to_dict("records")):
+        if key not in out:
+            out[key] = row
+    return out
+
+
+def _nanmean_rows(matrix: np.ndarray) -> np.ndarray:
+    """Row means skipping NaN, reduced like Series.mean (NaN -> 0, pairwise sum, / count); NaN for empty rows."""
+    missing = np.isnan(matrix)
+    sums = np.where(missing, 0.0, matrix).sum(axis=1)
+    counts = (~missing).sum(axis=1).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _group_means(values: np.ndarray, keys: pd.Series) -> pd.Series:
+    """
+    key -> mean of its values in sheet order, bit-identical to the per-building `subset.mean()`
+    (groupby().mean() sums in another order and moves about 3% of the costs by a cent).
+    Groups of equal size are reduced together as rows of one matrix.
+    """
+    codes, uniques = pd.factorize(keys, use_na_sentinel=True)
+    keep = codes >= 0
+    codes, values = codes[keep], np.asarray(values, dtype=np.float64)[keep]
+    order = np.argsort(codes, kind="stable")
+    codes, values = codes[order], values[order]
+    bounds = np.searchsorted(codes, np.arange(len(uniques) + 1))
+    starts, lengths = bounds[:-1], np.diff(bounds)
+    means = np.full(len(uniques), np.nan)
+    for length in np.unique(lengths[lengths > 0]).tolist():
+        groups = np.flatnonzero(lengths == length)
+        means[groups] = _nanmean_rows(values[starts[groups][:, None] + np.arange(length)])
+    present = lengths > 0
+    return pd.Series(means[present], index=pd.Index(np.asarray(uniques, dtype=object)[present], dtype=object))
+
+
+def _energy_cost_by_id(ec: pd.DataFrame) -> Dict[str, float]:
+    """building_id -> average monthly energy cost (mean of total_cost_eur, else mean of numeric column means)."""
+    if ec is None or ec.empty or "building_id" not in ec.columns:
+        return {}
+    keys = ec["building_id"]
+    if not isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.astype(str)
+    if "total_cost_eur" in ec.columns:
+        means = _group_means(pd.to_numeric(ec["total_cost_eur"], errors="coerce").to_numpy(np.float64), keys)
+    else:
+        numeric_cols = ec.select_dtypes(include=["number"]).columns
+        if len(numeric_cols) == 0:
+            return {}
+        column_means = [_group_means(ec[c].to_numpy(np.float64, na_value=np.nan), keys) for c in numeric_cols]
+        matrix = np.ascontiguousarray(np.column_stack([m.to_numpy() for m in column_means]))
+        means = pd.Series(_nanmean_rows(matrix), index=column_means[0].index)
+    return {str(k): float(v) for k, v in means.items()}
+
+
+def _postcode_districts(df: pd.DataFrame) -> Dict[str, List[str]]:
+    if df is None or "postal_code" not in df.columns or "district" not in df.columns:
+        return {}
+    pairs = pd.DataFrame(
+        {"pc": df["postal_code"].astype(str).str.strip(), "district": df["district"]}
+    ).dropna().drop_duplicates()
+    out: Dict[str, List[str]] = {}
+    for pc, district in zip(pairs["pc"], pairs["district"]):
+        out.setdefault(pc, []).append(str(district))
+    return out
+
+
+def build_indexes(frames: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """
+    buildings: building_id -> buildings row dict (RowTable)
+    financials: building_id -> financials row dict (RowTable)
+    energy_cost: building_id -> pre-aggregated monthly energy cost (ValueTable)
+    energy_rollups: per-building mean/median/last-12-months/seasonal cost and consumption (see energy_rollups)
+    addresses: postcode -> street -> number cascade (see address_parser.build_address_index)
+    address_search: trigram index for fuzzy address search (see address_search.build_search_index)
+    calculator_columns: calculator inputs as NumPy columns (see batch_calculator.build_calculator_columns)
+    building_payloads: building_id -> serialized building (see serializers.building_payloads)
+    contractors: serialized contractors rows, in sheet order
+    contractor_index: specialization token / district / postcode -> contractor positions
+    postcode_districts: postcode -> districts of the buildings in it
+    """
+    energy_cost = _energy_cost_by_id(frames.get("energy_consumption"))
+    energy_rollups = build_energy_rollups(frames.get("energy_consumption"))
+    # Row dicts only while the calculator columns are built; the index keeps the columnar tables
+    calculator_columns = build_calculator_columns(
+        _rows_by_id(frames.get("buildings")), _rows_by_id(frames.get("financials")), energy_cost, energy_rollups
+    )
+    buildings = RowTable.from_frame(frames.get("buildings"))
+    return {
+        "buildings": buildings,
+        "financials": RowTable.from_frame(frames.get("financials")),
+        "energy_cost": ValueTable(energy_cost),
+        "energy_rollups": energy_rollups,
+        "addresses": build_address_index(frames.get("buildings")),
+        "address_search": build_search_index(frames.get("buildings")),
+        "calculator_columns": calculator_columns,
+        "building_payloads": building_payloads(buildings),
+        "contractors": contractor_payloads(frames.get("contractors")),
+        "contractor_index": build_contractor_index(frames.get("contractors")),
+        "postcode_districts": _postcode_districts(frames.get("buildings")),
+    }
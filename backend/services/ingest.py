@@ -0,0 +1,204 @@
+"""
+Streaming ingestion of the data sheets, chunk by chunk, without row limits.
+
+Sources:
+- an .xlsx workbook, read with openpyxl in read-only mode (rows are streamed from the zip, not
+  materialized as a worksheet), or
+- a directory with one file per sheet: <sheet>.csv or <sheet>.parquet (Parquet needs pyarrow).
+
+Each chunk is turned into columns right away; the category columns of backend.services.schema are
+dictionary-encoded as they arrive, so peak memory stays close to the size of the final frames
+instead of several times the raw sheet.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.services.schema import category_columns
+
+DEFAULT_CHUNK_ROWS = 50_000
+SHEET_FILE_SUFFIXES = (".parquet", ".csv")
+# pandas' default na_values: text cells read_excel/read_csv turn into NaN
+NA_STRINGS = frozenset(
+    [
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    ]
+)
+
+
+def source_files(path: Path, sheets: Sequence[str]) -> List[Path]:
+    """Files backing the data: the workbook itself, or one file per sheet in a directory."""
+    if not path.is_dir():
+        return [path]
+    files = []
+    for name in sheets:
+        for suffix in SHEET_FILE_SUFFIXES:
+            candidate = path / f"{name}{suffix}"
+            if candidate.exists():
+                files.append(candidate)
+                break
+        else:
+            raise FileNotFoundError(f"No {name}.csv or {name}.parquet in {path}")
+    return files
+
+
+def header_columns(header: Sequence[Any]) -> List[str]:
+    """
+    Column names as read_excel builds them: empty cells -> "Unnamed: i", repeated names -> a, a.1, a.2
+    (skipping names that are already in the header; named columns are numbered before unnamed ones).
+    """
+    columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+    unnamed = [i for i, c in enumerate(header) if c is None]
+    order = [i for i in range(len(columns)) if header[i] is not None] + unnamed
+    taken = set(columns)
+    counts: Dict[str, int] = {}
+    for i in order:
+        col = original = columns[i]
+        count = counts.get(col, 0)
+        while count > 0:
+            counts[original] = count + 1
+            col = f"{original}.{count}"
+            count = count + 1 if col in taken else counts.get(col, 0)
+        columns[i] = col
+        counts[col] = count + 1
+    return columns
+
+
+def _xlsx_frame(records: List[tuple], columns: List[str]) -> pd.DataFrame:
+    """Chunk of rows as a frame, with pandas' default NA strings ("NA", "null", ...) turned into NaN."""
+    df = pd.DataFrame.from_records(records, columns=columns)
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            missing = col.isin(NA_STRINGS)
+            if missing.any():
+                df.isetitem(i, col.astype(object).mask(missing).infer_objects())
+    return df
+
+
+def _xlsx_chunks(workbook, sheet: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    ws = workbook[sheet]
+    rows = ws.iter_rows(values_only=True)
+    header = list(next(rows, ()))
+    while header and header[-1] is None:
+        header.pop()
+    columns = header_columns(header)
+    width = len(columns)
+    chunk: List[tuple] = []
+    blank = 0
+    yielded = False
+    for row in rows:
+        row = tuple(row[:width])
+        if all(v is None for v in row):
+            # Only keep blank rows that are followed by data (pandas drops trailing ones)
+            blank += 1
+            continue
+        if blank:
+            chunk.extend([(None,) * width] * blank)
+            blank = 0
+        if len(row) < width:
+            row = row + (None,) * (width - len(row))
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield _xlsx_frame(chunk, columns)
+            yielded = True
+            chunk = []
+    if chunk or not yielded:
+        yield _xlsx_frame(chunk, columns)
+
+
+def _parquet_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(f"Reading {path.name} requires pyarrow (pip install pyarrow)") from e
+    pf = pq.ParquetFile(path)
+    empty = True
+    for batch in pf.iter_batches(batch_size=chunk_rows):
+        empty = False
+        yield batch.to_pandas()
+    if empty:
+        yield pf.schema_arrow.empty_table().to_pandas()
+
+
+def _file_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if path.suffix == ".parquet":
+        return _parquet_chunks(path, chunk_rows)
+    return iter(pd.read_csv(path, chunksize=chunk_rows))
+
+
+class _CategoryEncoder:
+    """Dictionary-encodes one column chunk by chunk: values -> int codes into a growing category list."""
+
+    def __init__(self):
+        self.positions: Dict[Any, int] = {}
+        self.categories: List[Any] = []
+        self.codes: List[np.ndarray] = []
+
+    def add(self, values: pd.Series) -> None:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        remap = np.empty(len(uniques) + 1, dtype=np.int32)
+        remap[-1] = -1
+        for i, value in enumerate(uniques):
+            pos = self.positions.get(value)
+            if pos is None:
+                pos = self.positions[value] = len(self.categories)
+                self.categories.append(value)
+            remap[i] = pos
+        self.codes.append(remap[codes])
+
+    def finish(self) -> pd.Categorical:
+        codes = np.concatenate(self.codes) if self.codes else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.categories))
+
+
+def _assemble(chunks: Iterable[pd.DataFrame], categories: Sequence[str]) -> pd.DataFrame:
+    """Concatenate chunks column by column, encoding `categories` columns on the fly."""
+    columns: Dict[str, Any] = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            if col not in columns:
+                columns[col] = _CategoryEncoder() if col in categories else []
+            part = columns[col]
+            if isinstance(part, _CategoryEncoder):
+                part.add(chunk[col])
+            else:
+                part.append(chunk[col].reset_index(drop=True))
+    out = {}
+    for col, part in columns.items():
+        if isinstance(part, _CategoryEncoder):
+            out[col] = part.finish()
+            continue
+        series = pd.concat(part, ignore_index=True) if len(part) > 1 else part[0]
+        if series.dtype == object:
+            # Chunks that were all empty come back as object; re-infer the column as a whole
+            series = series.infer_objects()
+            if series.dtype == object and len(series) and series.isna().all():
+                # No values at all: read_excel gives float64 NaN
+                series = series.astype(np.float64)
+        out[col] = series
+    return pd.DataFrame(out)
+
+
+def read_frames(path: Path, sheets: Sequence[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, pd.DataFrame]:
+    """Read every sheet from a workbook or a directory of per-sheet files, in chunks of `chunk_rows`."""
+    chunk_rows = max(1, int(chunk_rows))
+    frames: Dict[str, pd.DataFrame] = {}
+    if path.is_dir():
+        for name, file in zip(sheets, source_files(path, sheets)):
+            frames[name] = _assemble(_file_chunks(file, chunk_rows), category_columns(name))
+        return frames
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for name in sheets:
+            if name not in workbook.sheetnames:
+                raise ValueError(f"Worksheet named '{name}' not found")
+            frames[name] = _assemble(_xlsx_chunks(workbook, name, chunk_rows), category_columns(name))
+    finally:
+        workbook.close()
+    return frames
@@ -0,0 +1,171 @@
+"""
+Lightweight in-process metrics: latency histograms for routes and named stages, rendered in the
+Prometheus text format. Recording is a perf_counter() pair plus a locked bucket increment, cheap
+enough to stay on in production. With SERVER_TIMING=1, stage timings of a request are also sent
+back in a Server-Timing response header.
+"""
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds (+Inf implied)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Per-request list of (stage, seconds) when Server-Timing is enabled
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+class Histogram:
+    """Histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        # series layout: [count per bucket..., +Inf count, sum]
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.snapshot().items()):
+            base = _labels(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(zip(self.label_names, labels), le=_fmt(bound))} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{_labels(zip(self.label_names, labels), le="+Inf")} {cumulative}')
+            lines.append(f"{self.name}_sum{base} {_fmt(series[-1])}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, Any]], **extra: str) -> str:
+    items = list(pairs) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUEST_DURATION = Histogram(
+    "heatmykiez_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+STAGE_DURATION = Histogram("heatmykiez_stage_duration_seconds", "Time spent in named processing stages", ("stage",))
+
+
+class stage:
+    """Context manager timing a named stage: `with stage("calculator.compute"): ...`."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        record_stage(self.name, time.perf_counter() - self.start)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_DURATION.observe((name,), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def gauge_lines(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, Any], float]], kind: str = "gauge") -> List[str]:
+    """Render a gauge/counter family from (labels, value) samples."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.items())} {_fmt(value)}")
+    return lines
+
+
+def render_histograms() -> List[str]:
+    return REQUEST_DURATION.render() + STAGE_DURATION.render()
+
+
+def _server_timing_header(timings: List[Tuple[str, float]], total: float) -> bytes:
+    parts = [f"{name.replace(' ', '_')};dur={seconds * 1000:.3f}" for name, seconds in timings]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """
+    Matched route as a template ("/buildings/{building_id}"), keeping label cardinality bounded.
+    Middleware answering before routing can set scope["route_label"] instead.
+    """
+    if scope.get("route") is None:
+        return scope.get("route_label", "unmatched")
+    path = scope.get("path", "")
+    params = scope.get("path_params") or {}
+    if not params:
+        return path
+    names = {str(v): k for k, v in params.items()}
+    return "/".join("{" + names[seg] + "}" if seg in names else seg for seg in path.split("/"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency (route template, not raw path) and optional Server-Timing."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = {"code": 500}
+        timings: Optional[List[Tuple[str, float]]] = [] if SERVER_TIMING_ENABLED else None
+        token = _request_timings.set(timings)
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if timings is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing_header(timings, time.perf_counter() - start)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _request_timings.reset(token)
+            route = _route_template(scope)
+            REQUEST_DURATION.observe((scope.get("method", ""), route, str(status["code"])), time.perf_counter() - start)
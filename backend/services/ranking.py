@@ -0,0 +1,184 @@
+"""
+Top-N rankings of calculator outputs ("which 50 buildings in district X pay back fastest?").
+
+Built once per data load from the whole-portfolio calculator outputs (batch_calculator.run_portfolio):
+for each window retrofit subtype and precomputed metric the building positions are sorted once
+and stored grouped by district and by postcode, each group in metric order. A ranking page is then a
+slice of a precomputed array.
+Queries with overrides, or on metrics that are not precomputed, compute the rows in scope on the fly
+and pick the top rows with np.argpartition instead of sorting the whole scope.
+Ties keep calculator_columns (buildings sheet) order in both paths, so both return the same page.
+"""
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.batch_calculator import WINDOW_SUB_TYPES, run_batch_columns
+from backend.services.calculator_model import CalculatorModel
+from backend.services.row_table import RowTable
+from backend.services.schema import format_postcode
+
+RANKED_SUB_TYPES = WINDOW_SUB_TYPES
+# Rankable metric -> True when smaller is better
+METRIC_ASCENDING = {
+    "YearsUntilBreakeventRentIncrease": True,
+    "YearUntilBreakeven": True,
+    "RetrofitCostTotalAfterSubsidy": True,
+    "EnergySavingsPerMonth": False,
+    "TenantSavingsPerUnit": False,
+    "YearlyExtraIncome": False,
+}
+DEFAULT_METRIC = "YearsUntilBreakeventRentIncrease"
+PRECOMPUTED_METRICS = ("YearsUntilBreakeventRentIncrease", "YearUntilBreakeven")
+# 0 years means "never pays back" in run_calculator: those buildings are left out, not ranked first
+PAYBACK_METRICS = ("YearsUntilBreakeventRentIncrease", "YearUntilBreakeven")
+# Query parameter -> buildings column
+SCOPES = {"district": "district", "postcode": "postal_code"}
+
+
+def _group_codes(buildings: RowTable, column: str) -> Dict[str, Any]:
+    """{"codes": int32 group code per calculator row (-1 = missing), "keys": value -> code}."""
+    values = buildings.column(column)
+    if column == "postal_code":
+        values = [format_postcode(v) for v in values]
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return {"codes": codes.astype(np.int32), "keys": {str(v): i for i, v in enumerate(uniques)}}
+
+
+def _eligible(outputs: Dict[str, np.ndarray], metric: str) -> np.ndarray:
+    values = outputs[metric]
+    mask = outputs["valid"] & np.isfinite(values)
+    if metric in PAYBACK_METRICS:
+        mask &= values > 0
+    return mask
+
+
+def _sort_key(values: np.ndarray, metric: str) -> np.ndarray:
+    return values if METRIC_ASCENDING[metric] else -values
+
+
+def _grouped(order: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, Dict[int, Tuple[int, int]]]:
+    """Stable regroup of a sorted position array by group code: (positions, code -> (start, end))."""
+    group = codes[order]
+    keep = group >= 0
+    order, group = order[keep], group[keep]
+    by_group = np.argsort(group, kind="stable")
+    positions, group = order[by_group], group[by_group]
+    present, starts = np.unique(group, return_index=True)
+    ends = np.append(starts[1:], len(group))
+    return positions, {int(c): (int(s), int(e)) for c, s, e in zip(present, starts, ends)}
+
+
+def build_ranking_index(
+    portfolio: Mapping[str, Dict[str, np.ndarray]], buildings: RowTable
+) -> Dict[str, Any]:
+    """
+    portfolio: sub_type -> outputs for every building (batch_calculator.run_portfolio)
+    groups: scope -> {"codes", "keys"} (see _group_codes), rows aligned with calculator_columns
+    orders: (sub_type, metric) -> {"all": int32 positions in metric order, scope: (positions, code -> (start, end))}
+    """
+    groups = {scope: _group_codes(buildings, column) for scope, column in SCOPES.items()}
+    orders: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for sub_type in RANKED_SUB_TYPES:
+        outputs = portfolio[sub_type]
+        for metric in PRECOMPUTED_METRICS:
+            eligible = np.flatnonzero(_eligible(outputs, metric))
+            order = eligible[np.argsort(_sort_key(outputs[metric][eligible], metric), kind="stable")]
+            order = order.astype(np.int32)
+            entry: Dict[str, Any] = {"all": order}
+            for scope, group in groups.items():
+                entry[scope] = _grouped(order, group["codes"])
+            orders[(sub_type, metric)] = entry
+    return {"groups": groups, "orders": orders}
+
+
+def _scope_codes(index: Dict[str, Any], filters: Mapping[str, Optional[str]]) -> Dict[str, int]:
+    """Query filters -> group codes; raises LookupError for values no building has."""
+    out = {}
+    for scope, value in filters.items():
+        if value is None or value == "":
+            continue
+        key = format_postcode(value) if scope == "postcode" else str(value)
+        code = index["groups"][scope]["keys"].get(key)
+        if code is None:
+            raise LookupError(f"No buildings with {scope} {value!r}")
+        out[scope] = code
+    return out
+
+
+def _precomputed(index: Dict[str, Any], entry: Dict[str, Any], codes: Dict[str, int]) -> np.ndarray:
+    """Positions in scope, in metric order, from the precomputed arrays."""
+    if not codes:
+        return entry["all"]
+    # Slice the narrower grouping (postcode) and filter the rest of the scope inside the slice
+    scope = "postcode" if "postcode" in codes else "district"
+    positions, bounds = entry[scope]
+    start, end = bounds.get(codes[scope], (0, 0))
+    ranked = positions[start:end]
+    for other, code in codes.items():
+        if other != scope:
+            ranked = ranked[index["groups"][other]["codes"][ranked] == code]
+    return ranked
+
+
+def _select(
+    index: Dict[str, Any],
+    columns: Dict[str, Any],
+    model: CalculatorModel,
+    sub_type: str,
+    metric: str,
+    codes: Dict[str, int],
+    overrides: Mapping[str, Any],
+    k: int,
+) -> Tuple[np.ndarray, int]:
+    """(first k positions in metric order, number of ranked buildings) by partial selection."""
+    mask = np.ones(len(columns["ids"]), dtype=bool)
+    for scope, code in codes.items():
+        mask &= index["groups"][scope]["codes"] == code
+    rows = np.flatnonzero(mask)
+    outputs = run_batch_columns(columns, model, rows, sub_type, overrides)
+    eligible = _eligible(outputs, metric)
+    rows = rows[eligible]
+    key = _sort_key(outputs[metric][eligible], metric)
+    total = len(rows)
+    k = min(k, total)
+    if k == 0:
+        return rows[:0], total
+    if k < total:
+        # Everything up to the k-th smallest key, including all ties with it, then order those
+        cut = key[np.argpartition(key, k - 1)[:k]].max()
+        candidates = np.flatnonzero(key <= cut)
+    else:
+        candidates = np.arange(total)
+    candidates = candidates[np.lexsort((candidates, key[candidates]))]
+    return rows[candidates[:k]], total
+
+
+def rank(
+    index: Dict[str, Any],
+    columns: Dict[str, Any],
+    model: CalculatorModel,
+    sub_type: str,
+    metric: str = DEFAULT_METRIC,
+    district: Optional[str] = None,
+    postcode: Optional[str] = None,
+    overrides: Optional[Mapping[str, Any]] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> Tuple[np.ndarray, int, bool]:
+    """
+    (calculator row positions of the page, number of ranked buildings in scope, served from precomputed arrays).
+    Raises ValueError for unknown subtypes/metrics and LookupError for unknown districts/postcodes.
+    """
+    if sub_type not in RANKED_SUB_TYPES:
+        raise ValueError(f"Unknown sub_type {sub_type!r}; expected one of {list(RANKED_SUB_TYPES)}")
+    if metric not in METRIC_ASCENDING:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {list(METRIC_ASCENDING)}")
+    codes = _scope_codes(index, {"district": district, "postcode": postcode})
+    entry = index["orders"].get((sub_type, metric))
+    if entry is not None and not overrides:
+        ranked = _precomputed(index, entry, codes)
+        return ranked[offset : offset + limit].astype(np.intp), len(ranked), True
+    top, total = _select(index, columns, model, sub_type, metric, codes, overrides or {}, offset + limit)
+    return top[offset:], total, False
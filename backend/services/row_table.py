@@ -0,0 +1,191 @@
+"""
+building_id lookups stored as NumPy columns instead of one Python dict per building.
+
+The buildings/financials row indexes, the building payloads, the energy cost lookup and the
+address -> building_id maps hold no per-row Python objects: keys and text are fixed-width string
+arrays (binary search for key lookups), categoricals are codes + categories. With DATA_PLANE=shared
+these arrays are mapped from the plane file like the frame blocks instead of being rebuilt in every worker.
+Rows are materialized on lookup with the values DataFrame.to_dict("records") gives; the returned
+dicts are fresh copies.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class _Keys:
+    """String keys in row order, looked up by binary search over a sorted copy."""
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = np.array(list(keys), dtype=str)
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted = self.keys[self.order]
+
+    def position(self, key: Any) -> int:
+        """Row of key, or -1."""
+        if not isinstance(key, str):
+            return -1
+        i = int(self.sorted.searchsorted(key))
+        if i < len(self.sorted) and self.sorted.item(i) == key:
+            return self.order.item(i)
+        return -1
+
+
+def _is_text(values: pd.Series) -> bool:
+    return all(isinstance(v, str) for v in values[values.notna()].tolist())
+
+
+def _encode(values: pd.Series) -> Tuple[Any, ...]:
+    """(kind, *arrays) for one column; object columns that are not text stay object arrays."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return ("category", values.cat.codes.to_numpy(), _encode(pd.Series(dtype.categories)))
+    if isinstance(dtype, np.dtype) and dtype.kind in "mM":
+        return ("datetime", values.to_numpy())
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return ("array", values.to_numpy())
+    if pd.api.types.is_string_dtype(dtype) and _is_text(values):
+        missing = values.isna().to_numpy()
+        text = ["" if m else v for v, m in zip(values.tolist(), missing.tolist())]
+        # Fixed-width arrays drop trailing NULs: keep such (unlikely) values as objects
+        if not any(v.endswith("\x00") for v in text):
+            return ("text", np.array(text, dtype=str), missing)
+    return ("object", np.array(values.tolist() + [None], dtype=object)[:-1])
+
+
+def _value(column: Tuple[Any, ...], i: int, categories: Dict[int, List[Any]]) -> Any:
+    """Value at row i, boxed like DataFrame.to_dict("records"); categories caches decoded category lists by id."""
+    kind = column[0]
+    if kind == "array":
+        return column[1].item(i)
+    if kind == "category":
+        code = column[1].item(i)
+        if code < 0:
+            return np.nan
+        decoded = categories.get(id(column))
+        if decoded is None:
+            decoded = categories[id(column)] = _values(column[2])
+        return decoded[code]
+    if kind == "text":
+        return np.nan if column[2].item(i) else column[1].item(i)
+    if kind == "datetime":
+        return pd.Timestamp(column[1][i]) if column[1].dtype.kind == "M" else pd.Timedelta(column[1][i])
+    return column[1][i]
+
+
+def _values(column: Tuple[Any, ...]) -> List[Any]:
+    """Whole column, boxed like _value."""
+    kind = column[0]
+    if kind in ("array", "object"):
+        return column[1].tolist()
+    if kind == "category":
+        categories = _values(column[2])
+        return [np.nan if c < 0 else categories[c] for c in column[1].tolist()]
+    if kind == "text":
+        return [np.nan if m else v for v, m in zip(column[1].tolist(), column[2].tolist())]
+    return [_value(column, i, {}) for i in range(len(column[1]))]
+
+
+class RowTable(Mapping):
+    """key -> row dict (read-only Mapping) over NumPy columns; first row per key wins, like `df[mask].iloc[0]`."""
+
+    def __init__(self, keys: Sequence[str], names: List[str], columns: List[Tuple[Any, ...]]):
+        self._keys = _Keys(keys)
+        self._names = names
+        self._columns = columns
+        self._categories: Dict[int, List[Any]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Decoded categories are a per-process cache
+        return {**self.__dict__, "_categories": {}}
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame], key: str = "building_id") -> "RowTable":
+        if df is None or df.empty or key not in df.columns:
+            return cls([], [], [])
+        keys = df[key].astype(str)
+        keep = ~keys.duplicated().to_numpy()
+        first = df[keep]
+        columns = [_encode(first.iloc[:, i]) for i in range(first.shape[1])]
+        return cls(keys[keep].tolist(), [str(c) for c in first.columns], columns)
+
+    def __getitem__(self, key: Any) -> Dict[str, Any]:
+        i = self._keys.position(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._row(i)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        i = self._keys.position(key)
+        return default if i < 0 else self._row(i)
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        categories = self._categories
+        return {name: _value(column, i, categories) for name, column in zip(self._names, self._columns)}
+
+    def __contains__(self, key: Any) -> bool:
+        return self._keys.position(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys.keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._keys.keys)
+
+    def column(self, name: str) -> List[Any]:
+        """Values of one column in key order, as `[row.get(name) for row in table.values()]` without the rows."""
+        if name not in self._names:
+            return [None] * len(self)
+        return _values(self._columns[self._names.index(name)])
+
+
+class MappedRows(Mapping):
+    """key -> fn(row) over a RowTable, computed on lookup (e.g. the building payloads)."""
+
+    def __init__(self, rows: RowTable, fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        self._rows = rows
+        self._fn = fn
+
+    def __getitem__(self, key: Any) -> Dict[str, Any]:
+        return self._fn(self._rows[key])
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        row = self._rows.get(key)
+        return default if row is None else self._fn(row)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class ValueTable(Mapping):
+    """key -> scalar (read-only Mapping) over one NumPy array: float64 by default, dtype=str for strings."""
+
+    def __init__(self, values: Mapping[str, Any], dtype: Any = np.float64):
+        self._keys = _Keys(values.keys())
+        self._values = np.array(list(values.values()), dtype=dtype)
+
+    def __getitem__(self, key: Any) -> Any:
+        i = self._keys.position(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._values.item(i)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        i = self._keys.position(key)
+        return default if i < 0 else self._values.item(i)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._keys.position(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys.keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._keys.keys)
@@ -0,0 +1,137 @@
+"""
+Column layout of the loaded sheets and the normalization step that applies it once per load:
+- "category": repeated values stored as pandas categoricals (int codes + one copy of each value)
+- "postcode": category of fixed-width strings ("10115"), whatever the source stored (int, float, text)
+- "int": integers downcast to the smallest width that holds every value
+- "float": kept as float64 (float32 would change calculator results)
+- "str": free text, left as loaded
+Buildings also get pre-split "street" and "number" columns from "address", so the address index
+and the serializers never parse addresses per request.
+Columns not listed keep the dtype they were loaded with.
+"""
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.address_parser import parse_address
+
+POSTCODE_WIDTH = 5
+
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "buildings": {
+        "building_id": "str",
+        "district": "category",
+        "postal_code": "postcode",
+        "address": "str",
+        "total_area_m2": "float",
+        "num_units": "int",
+        "window_type": "category",
+        "heating_system": "category",
+        "num_floors": "int",
+        "building_type": "category",
+    },
+    "financials": {"building_id": "str", "avg_rent_eur_m2": "float"},
+    "energy_consumption": {
+        "building_id": "category",
+        "year": "int",
+        "month": "int",
+        "consumption_kwh": "float",
+        "total_cost_eur": "float",
+    },
+    "contractors": {
+        "contractor_id": "str",
+        "district_served": "category",
+        "avg_rating": "float",
+        "num_reviews": "int",
+    },
+}
+
+
+def category_columns(sheet: str) -> Tuple[str, ...]:
+    """Columns of `sheet` that are stored as categoricals (dictionary-encoded while reading)."""
+    return tuple(c for c, kind in SCHEMA.get(sheet, {}).items() if kind in ("category", "postcode"))
+
+
+def format_postcode(value: Any) -> Any:
+    """10115, 10115.0, " 10115" -> "10115"; 1067 -> "01067". Missing stays missing; other text is only stripped."""
+    if value is None or (isinstance(value, float) and value != value):
+        return value
+    if isinstance(value, (int, np.integer)) or (isinstance(value, (float, np.floating)) and float(value).is_integer()):
+        return str(int(value)).zfill(POSTCODE_WIDTH)
+    s = str(value).strip()
+    if s.endswith(".0") and s[:-2].isdigit():
+        s = s[:-2]
+    return s.zfill(POSTCODE_WIDTH) if s.isdigit() else s
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype("category")
+
+
+def _to_postcode(series: pd.Series) -> pd.Series:
+    """Map categories (not rows) through format_postcode, merging categories that format the same."""
+    cat = _to_category(series).cat
+    formatted = [format_postcode(c) for c in cat.categories]
+    categories = list(dict.fromkeys(formatted))
+    position = {c: i for i, c in enumerate(categories)}
+    remap = np.array([position[c] for c in formatted] + [-1], dtype=np.int32)
+    codes = remap[cat.codes.to_numpy()]
+    values = pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _to_int(series: pd.Series) -> pd.Series:
+    """Smallest signed int width holding all values; columns with missing or fractional values are left alone."""
+    if not pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_extension_array_dtype(series.dtype):
+        return series
+    return pd.to_numeric(series, downcast="signed")
+
+
+def _split_address(addresses: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """street and number categoricals parsed once per distinct address (missing address -> missing parts)."""
+    codes, uniques = pd.factorize(addresses, use_na_sentinel=True)
+    parts = [parse_address(str(a)) for a in uniques]
+    streets = np.array([p[0] for p in parts] + [None], dtype=object)
+    numbers = np.array([p[1] for p in parts] + [None], dtype=object)
+    street = pd.Series(streets[codes], index=addresses.index, dtype=object).astype("category")
+    number = pd.Series(numbers[codes], index=addresses.index, dtype=object).astype("category")
+    return street, number
+
+
+CONVERTERS = {"category": _to_category, "postcode": _to_postcode, "int": _to_int}
+
+
+def normalize_frame(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Apply SCHEMA[name] to df (returns a new frame; already normalized frames pass through unchanged)."""
+    layout: Mapping[str, str] = SCHEMA.get(name, {})
+    out = df.copy(deep=False)
+    for col, kind in layout.items():
+        convert = CONVERTERS.get(kind)
+        if convert is not None and col in out.columns:
+            out[col] = convert(out[col])
+    if name == "buildings" and "address" in out.columns and "street" not in out.columns:
+        street, number = _split_address(out["address"])
+        pos = out.columns.get_loc("address") + 1
+        out.insert(pos, "number", number)
+        out.insert(pos, "street", street)
+    return out
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def normalize_frames(
+    frames: Mapping[str, pd.DataFrame], sheets: Sequence[str]
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, int]]]:
+    """Normalized copies of `sheets` plus a per-sheet {"before", "after"} memory report in bytes."""
+    out: Dict[str, pd.DataFrame] = dict(frames)
+    report: Dict[str, Dict[str, int]] = {}
+    for name in sheets:
+        before = memory_bytes(frames[name])
+        out[name] = normalize_frame(name, frames[name])
+        report[name] = {"before": before, "after": memory_bytes(out[name])}
+    return out, report
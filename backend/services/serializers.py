@@ -0,0 +1,53 @@
+"""
+JSON-ready payloads for building and contractor rows: contractors precomputed once per data load,
+buildings serialized on lookup from the columnar buildings index.
+Values are native Python types with None/NaN removed, so responses need no per-request cleanup.
+"""
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from backend.services.address_parser import parse_address
+from backend.services.row_table import MappedRows, RowTable
+
+
+def row_to_building(row) -> Dict[str, Any]:
+    """Building payload: row without None/NaN/inf values, plus street and number (parsed if not pre-split) and city."""
+    d = row.to_dict() if hasattr(row, "to_dict") else dict(row)
+    out = {}
+    for k, v in d.items():
+        if v is None:
+            continue
+        if hasattr(v, "item"):
+            v = v.item()
+        if isinstance(v, float) and (v != v or v == float("inf")):
+            continue
+        out[str(k)] = v
+    if "address" in out and "street" not in out:
+        street, number = parse_address(str(out["address"]))
+        out["street"] = street
+        out["number"] = number
+    if "city" not in out and "district" in out:
+        out["city"] = "Berlin"
+    return out
+
+
+def building_payloads(rows: RowTable) -> MappedRows:
+    """building_id -> building payload, for every indexed buildings row (serialized on lookup)."""
+    return MappedRows(rows, row_to_building)
+
+
+def contractor_payloads(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Contractors rows (vectorized to_dict) without None/NaN values, in sheet order."""
+    if df is None or df.empty:
+        return []
+    out = []
+    for row in df.to_dict("records"):
+        out.append(
+            {
+                str(k): v
+                for k, v in row.items()
+                if v is not None and (not hasattr(v, "__float__") or str(v) != "nan")
+            }
+        )
+    return out
@@ -0,0 +1,129 @@
+"""
+Read-only data plane shared by all worker processes through one memory-mapped file.
+
+One process builds the data snapshot and publishes it: the snapshot is pickled with protocol 5 and
+every NumPy buffer (DataFrame numeric blocks, calculator columns) is written out-of-band into the file.
+Workers map the file read-only and unpickle with those buffers pointing into the mapping, so NumPy
+data is shared zero-copy between processes: numeric frame blocks, calculator columns, rankings and
+the per-building lookups (buildings/financials rows, building payloads, energy cost, address ->
+building_id; see backend.services.row_table). Still materialized per worker: text columns of the
+frames, the address search index, the street/number cascade, energy rollup and calculator id maps
+and the stats cube (about as large again as the mapped plane for 100k buildings).
+Workers re-attach when the plane file is republished (see excel_loader._check_plane).
+"""
+import contextlib
+import json
+import mmap
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+MAGIC = b"HMKPLANE"
+FORMAT = 1
+ALIGN = 64
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def publish(data: Dict[str, Any], path: Path) -> None:
+    """Write the snapshot to path atomically (tmp file + rename; existing mappings stay valid)."""
+    buffers: list = []
+    main = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+    layout = []
+    offset = 0
+    for raw in raws:
+        layout.append([offset, raw.nbytes])
+        offset = _aligned(offset + raw.nbytes)
+    header = json.dumps(
+        {"format": FORMAT, "version": data.get("version"), "buffers": layout, "pickle_len": len(main)}
+    ).encode()
+    # MAGIC | header length | header | pickle | buffers (each ALIGN-aligned, relative to data_start)
+    preamble = len(MAGIC) + 8 + len(header)
+    data_start = _aligned(preamble + len(main))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(main)
+        for raw, (off, _) in zip(raws, layout):
+            f.seek(data_start + off)
+            f.write(raw)
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def read_version(path: Path) -> Optional[str]:
+    """Data version stored in the plane file header, or None if missing/unreadable."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+    except (OSError, ValueError):
+        return None
+    if header.get("format") != FORMAT:
+        return None
+    return header.get("version")
+
+
+def file_id(path: Path) -> Optional[Tuple[int, int, int]]:
+    """(device, inode, mtime_ns) of the plane file, or None if missing; publish() always creates a new file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns
+
+
+def attach(path: Path) -> Dict[str, Any]:
+    """Map the plane file read-only and return the snapshot; NumPy buffers point into the mapping."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"Not a data plane file: {path}")
+    size = int.from_bytes(view[len(MAGIC) : len(MAGIC) + 8], "little")
+    start = len(MAGIC) + 8
+    header = json.loads(bytes(view[start : start + size]))
+    if header.get("format") != FORMAT:
+        raise ValueError(f"Unsupported data plane format in {path}")
+    pickle_start = start + size
+    pickle_end = pickle_start + header["pickle_len"]
+    data_start = _aligned(pickle_end)
+    buffers = [view[data_start + off : data_start + off + n] for off, n in header["buffers"]]
+    return pickle.loads(view[pickle_start:pickle_end], buffers=buffers)
+
+
+@contextlib.contextmanager
+def exclusive_lock(path: Path) -> Iterator[None]:
+    """Cross-process lock (flock on path + '.lock'), so only one process builds and publishes."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+if __name__ == "__main__":
+    # Publish once before starting workers:  DATA_PLANE=shared python -m backend.services.shared_data
+    from backend.services.excel_loader import publish_data_plane
+
+    print(f"Published data plane to {publish_data_plane()}")
@@ -0,0 +1,252 @@
+"""
+Pre-aggregated statistics for dashboards, built once per data load.
+
+One row per building (buildings, financials, energy rollups and the calculator outputs for double and
+triple glazing without overrides) is grouped by every combination of the dimensions district, postcode
+and building_type: 8 cuboids, from the whole portfolio down to district x postcode x building_type.
+Each cell holds counts, totals and quartiles, and a drill-down index maps a cell to its children in
+finer cuboids, so a dashboard query is a few dict lookups.
+
+Reloads refresh incrementally: each cell carries a digest of its buildings' rows (sum of row hashes)
+and cells whose digest matches the previous cube are reused; only changed cells are aggregated again.
+"""
+import time
+from itertools import combinations
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.schema import format_postcode
+
+DIMENSIONS = ("district", "postcode", "building_type")
+# Every subset of DIMENSIONS (in DIMENSIONS order), coarsest first
+CUBOIDS: Tuple[Tuple[str, ...], ...] = tuple(
+    dims for size in range(len(DIMENSIONS) + 1) for dims in combinations(DIMENSIONS, size)
+)
+# Bump when cells change shape so a reload does not reuse cells of the old layout
+CUBE_FORMAT = 1
+QUARTILES = (0.25, 0.5, 0.75)
+
+_ALL = "_all"
+BUILDING_COLUMNS = ("total_area_m2", "num_units", "energy_cost", "consumption_kwh", "rent_eur_m2")
+
+
+def portfolio_frame(indexes: Dict[str, Any], portfolio: Mapping[str, Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """
+    One row per building in calculator_columns order: dimensions, window_type, inputs and, per subtype,
+    cost after subsidy, break-even years (NaN when the building never pays back) and energy savings.
+    """
+    columns = indexes["calculator_columns"]
+    buildings = indexes["buildings"]
+    rollups = indexes["energy_rollups"]
+    df = pd.DataFrame(
+        {
+            "building_id": columns["ids"],
+            "district": buildings.column("district"),
+            "postcode": [format_postcode(v) for v in buildings.column("postal_code")],
+            "building_type": buildings.column("building_type"),
+        },
+        dtype=object,
+    )
+    df = df.where(df.notna(), None)
+    first = next(iter(portfolio.values()), None)
+    if first is not None:
+        valid = first["valid"]
+        df["window_type"] = first["WindowType"]
+        df["total_area_m2"] = np.where(valid, first["TotalSqm"], np.nan)
+        df["num_units"] = np.where(valid, first["NrUnits"], np.nan)
+    df["energy_cost"] = columns["energy_cost"]
+    consumption = rollups["consumption"].get("mean")
+    if consumption is not None:
+        pos = rollups["pos"]
+        rows_in = np.array([pos.get(bid, -1) for bid in columns["ids"]], dtype=np.intp)
+        df["consumption_kwh"] = np.where(rows_in >= 0, consumption[rows_in], np.nan)
+    df["rent_eur_m2"] = np.where(columns["rent_per_sqm"] > 0, columns["rent_per_sqm"], np.nan)
+    for sub_type, out in portfolio.items():
+        valid = out["valid"]
+        payback = out["YearsUntilBreakeventRentIncrease"]
+        df[f"cost|{sub_type}"] = np.where(valid, out["RetrofitCostTotalAfterSubsidy"], np.nan)
+        df[f"payback|{sub_type}"] = np.where(valid & (payback > 0), payback, np.nan)
+        df[f"savings|{sub_type}"] = np.where(valid, out["EnergySavingsPerMonth"], np.nan)
+    return df
+
+
+def _round(v: Any) -> Optional[float]:
+    return None if v is None or v != v else round(float(v), 2)
+
+
+def _key(values: Any, dims: Tuple[str, ...]) -> Tuple[Any, ...]:
+    """groupby key -> cell key tuple (missing dimension values as None)."""
+    if not dims:
+        return ()
+    values = values if isinstance(values, tuple) else (values,)
+    return tuple(None if v is None or (isinstance(v, float) and v != v) else str(v) for v in values)
+
+
+def _group(df: pd.DataFrame, dims: Tuple[str, ...]):
+    by = list(dims) if dims else [pd.Series(_ALL, index=df.index)]
+    return df.groupby(by, dropna=False, sort=True)
+
+
+def _aggregate(
+    df: pd.DataFrame, dims: Tuple[str, ...], sub_types: Sequence[str]
+) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+    """Cells of one cuboid for the rows in df (all rows of each cell must be in df)."""
+    g = _group(df, dims)
+    value_columns = [c for c in BUILDING_COLUMNS if c in df.columns]
+    sums = g[value_columns].sum().to_dict("index")
+    means = g[value_columns].mean().to_dict("index")
+    sizes = g.size().to_dict()
+    quartile_columns = [c for c in ("total_area_m2",) if c in df.columns] + [f"payback|{s}" for s in sub_types]
+    quartiles = g[quartile_columns].quantile(list(QUARTILES)).to_dict("index")
+    paying = g[[f"payback|{s}" for s in sub_types]].count().to_dict("index")
+    retrofit_sums = g[[f"{m}|{s}" for s in sub_types for m in ("cost", "savings")]].sum().to_dict("index")
+    window_mix: Dict[Any, Dict[str, int]] = {}
+    if "window_type" in df.columns:
+        counts = g["window_type"].value_counts()
+        for idx, n in counts.items():
+            *group_key, window_type = idx if isinstance(idx, tuple) else (idx,)
+            group_key = tuple(group_key) if len(group_key) > 1 else group_key[0]
+            window_mix.setdefault(group_key, {})[str(window_type)] = int(n)
+
+    def _quartiles(gk: Any, column: str) -> Dict[str, Optional[float]]:
+        qk = gk if isinstance(gk, tuple) else (gk,)
+        return {name: _round(quartiles[qk + (q,)][column]) for name, q in zip(("p25", "median", "p75"), QUARTILES)}
+
+    cells = {}
+    for gk, n in sizes.items():
+        cell: Dict[str, Any] = {"buildings": int(n)}
+        if "num_units" in sums[gk]:
+            cell["units"] = int(sums[gk]["num_units"])
+        if "total_area_m2" in sums[gk]:
+            cell["sqm"] = {"total": _round(sums[gk]["total_area_m2"]), "mean": _round(means[gk]["total_area_m2"])}
+            cell["sqm"].update(_quartiles(gk, "total_area_m2"))
+        cell["window_types"] = dict(sorted(window_mix.get(gk, {}).items()))
+        cell["energy_cost_per_month"] = {
+            "total": _round(sums[gk]["energy_cost"]),
+            "mean": _round(means[gk]["energy_cost"]),
+        }
+        if "consumption_kwh" in sums[gk]:
+            cell["consumption_kwh_per_month"] = {
+                "total": _round(sums[gk]["consumption_kwh"]),
+                "mean": _round(means[gk]["consumption_kwh"]),
+            }
+        cell["avg_rent_eur_m2"] = _round(means[gk]["rent_eur_m2"])
+        cell["retrofits"] = {
+            s: {
+                "cost_after_subsidy_total": _round(retrofit_sums[gk][f"cost|{s}"]),
+                "energy_savings_per_month_total": _round(retrofit_sums[gk][f"savings|{s}"]),
+                "paying_back": int(paying[gk][f"payback|{s}"]),
+                "break_even_years": _quartiles(gk, f"payback|{s}"),
+            }
+            for s in sub_types
+        }
+        cells[_key(gk, dims)] = cell
+    return cells
+
+
+def _digests(
+    df: pd.DataFrame, hashes: np.ndarray, dims: Tuple[str, ...]
+) -> Tuple[List[Tuple[Any, ...]], np.ndarray, np.ndarray]:
+    """(cell keys, digest per cell = sum of its row hashes mod 2**64, cell number per row)."""
+    g = _group(df, dims)
+    cell_of_row = g.ngroup().to_numpy()
+    keys = [_key(k, dims) for k in g.size().index]
+    digests = np.zeros(len(keys), dtype=np.uint64)
+    np.add.at(digests, cell_of_row, hashes)
+    return keys, digests, cell_of_row
+
+
+def _children(cuboids: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], Any]]) -> Dict[Tuple[Any, ...], Dict]:
+    """(cuboid, filter dims) -> filter key -> keys of the cuboid's cells under it, for every filter subset."""
+    out: Dict[Tuple[Any, ...], Dict] = {}
+    for dims, cells in cuboids.items():
+        for size in range(len(dims) + 1):
+            for filter_dims in combinations(dims, size):
+                at = [dims.index(d) for d in filter_dims]
+                index: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]] = {}
+                for key in cells:
+                    index.setdefault(tuple(key[i] for i in at), []).append(key)
+                out[(dims, filter_dims)] = index
+    return out
+
+
+def build_stats_cube(
+    indexes: Dict[str, Any],
+    portfolio: Mapping[str, Dict[str, np.ndarray]],
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    cuboids: dims -> cell key -> cell; digests: dims -> cell key -> digest
+    children: drill-down index (see _children); refresh: cells reused from `previous` vs recomputed
+    """
+    start = time.perf_counter()
+    sub_types = list(portfolio)
+    df = portfolio_frame(indexes, portfolio)
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    if previous is None or previous.get("format") != CUBE_FORMAT or previous.get("sub_types") != sub_types:
+        previous = None
+    cuboids: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], Dict[str, Any]]] = {}
+    digests: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], int]] = {}
+    reused = recomputed = 0
+    for dims in CUBOIDS:
+        keys, cell_digests, cell_of_row = _digests(df, hashes, dims)
+        digests[dims] = {k: int(d) for k, d in zip(keys, cell_digests)}
+        old_cells = previous["cuboids"][dims] if previous else {}
+        old_digests = previous["digests"][dims] if previous else {}
+        cells = {k: old_cells[k] for k, d in digests[dims].items() if old_digests.get(k) == d}
+        dirty = [i for i, k in enumerate(keys) if k not in cells]
+        if dirty:
+            rows = df if len(dirty) == len(keys) else df[np.isin(cell_of_row, dirty)]
+            cells.update(_aggregate(rows, dims, sub_types))
+        reused += len(keys) - len(dirty)
+        recomputed += len(dirty)
+        cuboids[dims] = {k: cells[k] for k in keys}
+    return {
+        "format": CUBE_FORMAT,
+        "sub_types": sub_types,
+        "cuboids": cuboids,
+        "digests": digests,
+        "children": _children(cuboids),
+        "refresh": {
+            "cells": reused + recomputed,
+            "reused": reused,
+            "recomputed": recomputed,
+            "seconds": round(time.perf_counter() - start, 3),
+        },
+    }
+
+
+def query_stats(
+    cube: Dict[str, Any], group_by: Sequence[str] = (), filters: Optional[Mapping[str, Optional[str]]] = None
+) -> Dict[str, Any]:
+    """
+    total: the cell selected by filters (whole portfolio without filters)
+    groups: its children broken down by group_by, each with its "key"
+    drill_down: dimensions that can still be added to group_by or filters
+    Raises ValueError for unknown dimensions and LookupError when no building matches the filters.
+    """
+    unknown = [d for d in list(group_by) + list(filters or {}) if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimensions {unknown}; expected some of {list(DIMENSIONS)}")
+    filters = {
+        d: (format_postcode(v) if d == "postcode" else str(v))
+        for d, v in (filters or {}).items()
+        if v is not None and v != ""
+    }
+    filter_dims = tuple(d for d in DIMENSIONS if d in filters)
+    filter_key = tuple(filters[d] for d in filter_dims)
+    total = cube["cuboids"][filter_dims].get(filter_key)
+    if total is None:
+        raise LookupError(f"No buildings with {filters}")
+    dims = tuple(d for d in DIMENSIONS if d in filters or d in group_by)
+    cells = cube["cuboids"][dims]
+    keys = cube["children"][(dims, filter_dims)].get(filter_key, []) if group_by else []
+    return {
+        "group_by": [d for d in DIMENSIONS if d in group_by],
+        "filters": filters,
+        "total": total,
+        "groups": [{"key": dict(zip(dims, key)), **cells[key]} for key in keys],
+        "drill_down": [d for d in DIMENSIONS if d not in dims],
+    }
@@ -0,0 +1,156 @@
+"""
+Startup warm-up and readiness.
+
+After the data is loaded, warm_up() touches every derived structure once and primes the first
+calls of each hot path (calculator, batch, ranking, stats, address search, wizard bootstrap), so the
+first real request does not pay for lazy imports, cold caches or first-touch page faults.
+GET /ready reports 503 until the warm-up has finished; GET /health keeps answering meanwhile.
+
+DATA_WARMUP=off skips the warm-up: the service is ready as soon as the data is loaded.
+DATA_WARMUP_BUILDINGS sets how many buildings the calculator is primed with (default 8).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from backend.services.address_search import search_addresses
+from backend.services.batch_calculator import WINDOW_SUB_TYPES
+from backend.services.calculator_service import run_calculator, run_calculator_batch, run_calculator_ranking
+from backend.services.excel_loader import add_reload_listener, get_snapshot, is_loaded
+from backend.services.metrics import stage
+from backend.services.stats_cube import query_stats
+from backend.services.wizard_service import bootstrap
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP_BUILDINGS = 8
+
+# ready: warm-up done (or disabled); steps: name -> seconds; error: last failure, if any
+_status: Dict[str, Any] = {"ready": False, "running": False, "steps": {}, "seconds": None, "error": None}
+_status_lock = threading.Lock()
+
+
+def warmup_enabled() -> bool:
+    return os.environ.get("DATA_WARMUP", "").strip().lower() not in ("0", "off", "false", "no")
+
+
+def _warmup_buildings() -> int:
+    try:
+        return max(int(os.environ.get("DATA_WARMUP_BUILDINGS", DEFAULT_WARMUP_BUILDINGS)), 1)
+    except ValueError:
+        return DEFAULT_WARMUP_BUILDINGS
+
+
+def _steps() -> List[Tuple[str, Callable[[], Any]]]:
+    snapshot = get_snapshot()
+    indexes = snapshot["indexes"]
+    ids = list(indexes["calculator_columns"]["ids"][: _warmup_buildings()])
+    first = indexes["buildings"].get(ids[0], {}) if ids else {}
+
+    def _calculator() -> None:
+        for building_id in ids:
+            for sub_type in WINDOW_SUB_TYPES:
+                run_calculator(building_id, sub_type)
+
+    def _address_search() -> None:
+        address = first.get("address")
+        if address:
+            search_addresses(indexes["address_search"], str(address))
+
+    def _wizard() -> None:
+        if ids:
+            bootstrap(building_id=ids[0])
+
+    return [
+        ("calculator", _calculator),
+        ("batch", lambda: run_calculator_batch(ids, WINDOW_SUB_TYPES)),
+        ("ranking", lambda: run_calculator_ranking(WINDOW_SUB_TYPES[0])),
+        ("stats", lambda: query_stats(snapshot["stats"], ["district"])),
+        ("address_search", _address_search),
+        ("wizard", _wizard),
+    ]
+
+
+def warm_up() -> Dict[str, float]:
+    """Load the data if needed and run every warm-up step. Returns step name -> seconds."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    with stage("warmup.data"):
+        get_snapshot()
+    timings["data"] = time.perf_counter() - start
+    for name, step in _steps():
+        t0 = time.perf_counter()
+        with stage(f"warmup.{name}"):
+            step()
+        timings[name] = time.perf_counter() - t0
+    return timings
+
+
+def _run() -> None:
+    start = time.perf_counter()
+    try:
+        steps = warm_up()
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        with _status_lock:
+            _status.update(running=False, error=f"{type(e).__name__}: {e}")
+            # Serve anyway once the data is there; only the cache priming failed
+            _status["ready"] = _status["ready"] or is_loaded()
+        return
+    with _status_lock:
+        _status.update(
+            ready=True,
+            running=False,
+            steps={k: round(v, 4) for k, v in steps.items()},
+            seconds=round(time.perf_counter() - start, 4),
+            error=None,
+        )
+    logger.info("Warm-up done in %.2fs", _status["seconds"])
+
+
+def start_warmup(background: bool = True) -> bool:
+    """
+    Run the warm-up (in a background thread by default). Without DATA_WARMUP the service is marked
+    ready straight away. Returns False if a warm-up is already running.
+    """
+    if not warmup_enabled():
+        mark_ready()
+        return True
+    with _status_lock:
+        if _status["running"]:
+            return False
+        _status["running"] = True
+    if background:
+        threading.Thread(target=_run, name="data-warmup", daemon=True).start()
+    else:
+        _run()
+    return True
+
+
+def mark_ready() -> None:
+    with _status_lock:
+        _status["ready"] = is_loaded()
+
+
+def is_ready() -> bool:
+    return bool(_status["ready"]) and is_loaded()
+
+
+def readiness() -> Dict[str, Any]:
+    """Warm-up status for /ready and /health."""
+    with _status_lock:
+        status = dict(_status)
+    status["ready"] = status["ready"] and is_loaded()
+    return status
+
+
+def _rewarm() -> None:
+    # Registered after calculator_service's listener (imported above), so this runs once its caches are cleared.
+    # A reload replaced the caches: prime them again, but stay ready (requests use the new data already)
+    if _status["ready"] and warmup_enabled():
+        start_warmup()
+
+
+add_reload_listener(_rewarm)
@@ -0,0 +1,92 @@
+"""
+Everything the wizard needs for one building in one call: building payload, prefill, the window
+retrofit options that apply to its window type, and the calculator result for each option.
+All parts are computed from one snapshot: one building lookup and one vectorized calculator pass
+(batch_calculator) for all options, instead of a search, a prefill calculation and one POST /calculator per option.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services.address_parser import find_building_id
+from backend.services.calculator_service import get_facade_sqm_suggestion, run_batch
+from backend.services.excel_loader import get_snapshot
+from backend.services.metrics import stage
+
+DOUBLE_GLAZING = "Window replacement - double glazing"
+TRIPLE_GLAZING = "Window replacement - triple glazing"
+
+# Normalized window type -> (retrofit subtype, label) upgrades, as offered in step 2 of the wizard
+WINDOW_OPTIONS: Dict[str, List[Tuple[str, str]]] = {
+    "Single-pane": [(DOUBLE_GLAZING, "Double Pane"), (TRIPLE_GLAZING, "Triple Pane")],
+    "Double-pane": [(TRIPLE_GLAZING, "Triple Pane")],
+    "Triple-pane": [],
+}
+# The /buildings prefill (RentPerUnit, EnergyCostsPerMonth) comes from this subtype without overrides
+PREFILL_SUB_TYPE = TRIPLE_GLAZING
+
+
+def window_options(window_type: str) -> List[Tuple[str, str]]:
+    """(subtype, label) upgrades for a normalized window type; unknown types get none."""
+    return list(WINDOW_OPTIONS.get(window_type, []))
+
+
+def resolve_building_id(
+    snapshot: Dict[str, Any], building_id: Optional[str], postcode: Optional[str], address: Optional[str]
+) -> Optional[str]:
+    indexes = snapshot["indexes"]
+    if building_id:
+        return str(building_id) if str(building_id) in indexes["building_payloads"] else None
+    if postcode and address:
+        return find_building_id(indexes["addresses"], postcode, address)
+    return None
+
+
+def bootstrap(
+    building_id: Optional[str] = None,
+    postcode: Optional[str] = None,
+    address: Optional[str] = None,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    building: payload + prefill (same as GET /buildings/{id})
+    window_type: normalized window type after overrides (decides the options)
+    options: [{sub_type_of_retrofit, label, result}], result as POST /calculator with the same overrides
+    Raises LookupError if the building is not found, ValueError without building_id or postcode+address
+    or for invalid overrides.
+    """
+    if not building_id and not (postcode and address):
+        raise ValueError("Give building_id or postcode and address")
+    snapshot = get_snapshot()
+    bid = resolve_building_id(snapshot, building_id, postcode, address)
+    if bid is None:
+        raise LookupError("Building not found")
+    indexes = snapshot["indexes"]
+    model = snapshot["calculator_model"]
+    overrides = overrides or {}
+    sub_types = [DOUBLE_GLAZING, TRIPLE_GLAZING]
+    override_sets = [{}, overrides] if overrides else [{}]
+    with stage("wizard.bootstrap"):
+        results = run_batch(indexes["calculator_columns"], model, [bid], sub_types, override_sets)
+    # run_batch orders results by subtype, then override set
+    by_key: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for result, sub_type in zip(results, [s for s in sub_types for _ in override_sets]):
+        result.pop("building_id", None)
+        by_key[(result.pop("override_set"), sub_type)] = result
+
+    building = dict(indexes["building_payloads"][bid])
+    prefill_calc = by_key[(0, PREFILL_SUB_TYPE)]
+    suggestion = get_facade_sqm_suggestion(bid, indexes)
+    if suggestion is not None:
+        building["facade_sqm_suggestion"] = suggestion
+    if "error" not in prefill_calc:
+        building["RentPerUnit"] = prefill_calc.get("RentPerUnit")
+        building["EnergyCostsPerMonth"] = prefill_calc.get("EnergyCostsPerMonth")
+
+    chosen = len(override_sets) - 1
+    if "error" in by_key[(chosen, TRIPLE_GLAZING)]:
+        raise ValueError("Invalid override values")
+    window_type = by_key[(chosen, TRIPLE_GLAZING)]["WindowType"]
+    options = [
+        {"sub_type_of_retrofit": sub_type, "label": label, "result": by_key[(chosen, sub_type)]}
+        for sub_type, label in window_options(window_type)
+    ]
+    return {"version": snapshot["version"], "building": building, "window_type": window_type, "options": options}
@@ -0,0 +1,122 @@
+"""
+Bounded worker pool for data-service calls (pandas/NumPy work) made from async route handlers.
+At most DATA_WORKERS calls run at once and at most DATA_QUEUE_DEPTH more wait; beyond that,
+calls fail fast with PoolSaturated (mapped to 503) instead of piling up behind a burst.
+Queue time and compute time are recorded separately.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolSaturated(Exception):
+    """Raised when all workers are busy and the queue is full."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), 0)
+    except ValueError:
+        return default
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="data-worker")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.max_queue_seconds = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on a worker thread; raise PoolSaturated if workers and queue are full."""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated()
+            self._in_flight += 1
+        enqueued = time.perf_counter()
+
+        def _job() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                self._record(started - enqueued, finished - started)
+
+        def _release(_: Optional[Future]) -> None:
+            with self._lock:
+                self._in_flight -= 1
+
+        # Copy the context so per-request state (e.g. Server-Timing stages) follows the call
+        ctx = contextvars.copy_context()
+        try:
+            future = self._executor.submit(ctx.run, _job)
+        except BaseException:
+            _release(None)
+            raise
+        # The slot is freed when the job finishes (or is cancelled before it starts), not when the
+        # awaiting request goes away: a cancelled request must not let more work pile up on the threads
+        future.add_done_callback(_release)
+        return await asyncio.wrap_future(future)
+
+    def _record(self, queued: float, computed: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.queue_seconds += queued
+            self.compute_seconds += computed
+            self.max_queue_seconds = max(self.max_queue_seconds, queued)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_seconds_total": round(self.queue_seconds, 6),
+                "compute_seconds_total": round(self.compute_seconds, 6),
+                "max_queue_seconds": round(self.max_queue_seconds, 6),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Process-wide pool sized by DATA_WORKERS (default 4) and DATA_QUEUE_DEPTH (default 64)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(_env_int("DATA_WORKERS", 4), _env_int("DATA_QUEUE_DEPTH", 64))
+    return _pool
+
+
+async def run_in_pool(fn: Callable[..., T], *args: Any) -> T:
+    return await get_worker_pool().run(fn, *args)
+
+
+def shutdown_worker_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,154 @@
+"""
+Synthetic datasets in the workbook schema (buildings, financials, energy_consumption, retrofits,
+parameters, contractors) at any scale, deterministic for a given seed.
+
+    python -m benchmarks.generate --buildings 120000 --out /tmp/hmk_120k.xlsx
+
+Excel sheets hold at most 1,048,576 rows, so large scales are meant to be used in-process
+(generate_frames + excel_loader.load_frames), which is what benchmarks.run does.
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+SCALES = {"12k": 12_000, "120k": 120_000, "1.2m": 1_200_000}
+
+DISTRICTS = [
+    "Mitte", "Friedrichshain-Kreuzberg", "Pankow", "Charlottenburg-Wilmersdorf", "Spandau",
+    "Steglitz-Zehlendorf", "Tempelhof-Schöneberg", "Neukölln", "Treptow-Köpenick",
+    "Marzahn-Hellersdorf", "Lichtenberg", "Reinickendorf",
+]
+STREET_BASES = [
+    "Zehlendorfer", "Landsberger", "Karl-Marx", "Frankfurter", "Sonnen", "Linden", "Berliner",
+    "Potsdamer", "Kastanien", "Schönhauser", "Greifswalder", "Prenzlauer", "Warschauer", "Hermann",
+    "Kant", "Goethe", "Schiller", "Bismarck", "Wilhelm", "Torstraße", "Müller", "Seestraße",
+]
+STREET_SUFFIXES = ["Str.", "straße", "Allee", "Weg", "Platz", "Damm", "Ufer", "Ring"]
+BUILDING_TYPES = ["Altbau", "Gründerzeit", "Modern", "1970s block", "1980s block", "Post-war", "Plattenbau"]
+WINDOW_TYPES = ["Single-pane", "Double-pane", "Triple-pane"]
+HEATING = ["Gas", "Oil", "District heating", "Heat pump"]
+SPECIALIZATIONS = [
+    "Windows & Doors", "Window replacement, facade", "Roof insulation", "Heating systems",
+    "Facade insulation", "Windows, roof", "Basement insulation",
+]
+
+
+def _streets(n: int) -> np.ndarray:
+    names = [f"{base} {suffix}" for base in STREET_BASES for suffix in STREET_SUFFIXES]
+    i = 2
+    while len(names) < n:
+        names.extend(f"{base} {suffix} {i}" for base in STREET_BASES for suffix in STREET_SUFFIXES)
+        i += 1
+    return np.array(names[:n], dtype=object)
+
+
+def generate_frames(buildings: int, seed: int = 42, energy_months: int = 12) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    n = int(buildings)
+    n_postcodes = min(190, max(5, n // 60))
+    postcodes = np.array([str(10115 + 23 * i) for i in range(n_postcodes)], dtype=object)
+    pc_district = np.array([DISTRICTS[i % len(DISTRICTS)] for i in range(n_postcodes)], dtype=object)
+    streets = _streets(max(20, min(10_000, n // 20)))
+
+    pc_idx = rng.integers(0, n_postcodes, n)
+    numbers = rng.integers(1, 200, n).astype(str).astype(object)
+    suffix = rng.choice(np.array(["", "", "", "", "a", "b"], dtype=object), n)
+    addresses = streets[rng.integers(0, len(streets), n)] + " " + numbers + suffix
+    ids = np.char.add("B", np.char.zfill(np.arange(n).astype(str), 7)).astype(object)
+    floors = rng.integers(1, 9, n)
+    b = pd.DataFrame(
+        {
+            "building_id": ids,
+            "district": pc_district[pc_idx],
+            "postal_code": postcodes[pc_idx].astype(np.int64),
+            "address": addresses,
+            "total_area_m2": np.round(rng.uniform(150, 6000, n), 1),
+            "num_units": rng.integers(1, 80, n),
+            "window_type": rng.choice(np.array(WINDOW_TYPES, dtype=object), n, p=[0.4, 0.45, 0.15]),
+            "heating_system": rng.choice(np.array(HEATING, dtype=object), n),
+            "num_floors": floors,
+            "building_type": rng.choice(np.array(BUILDING_TYPES, dtype=object), n),
+        }
+    )
+    fin_mask = rng.random(n) > 0.05
+    fin = pd.DataFrame({"building_id": ids[fin_mask], "avg_rent_eur_m2": np.round(rng.uniform(6, 22, fin_mask.sum()), 2)})
+
+    months = max(1, int(energy_months))
+    ec_ids = np.repeat(ids, months)
+    month_idx = np.tile(np.arange(months), n)
+    ec = pd.DataFrame(
+        {
+            "building_id": ec_ids,
+            "year": 2023 + month_idx // 12,
+            "month": month_idx % 12 + 1,
+            "consumption_kwh": np.round(rng.uniform(500, 12000, n * months), 1),
+            "total_cost_eur": np.round(rng.uniform(150, 4000, n * months), 2),
+        }
+    )
+    retro = pd.DataFrame(
+        {
+            "measure_name": [
+                "Window replacement - double glazing",
+                "Window replacement - triple glazing",
+                "Roof insulation",
+                "Facade insulation",
+            ],
+            "typical_cost_eur_m2": [450, 550, 120, 180],
+            "expected_savings_pct": [12, 15, 10, 20],
+        }
+    )
+    params = pd.DataFrame(
+        {
+            "Variables": ["WindowToFloorRatio", "WindowSubsidyParameter", "RentIncreasePct"],
+            "Value": [0.14, 0.65, 0.04],
+        }
+    )
+    n_con = max(50, n // 200)
+    con = pd.DataFrame(
+        {
+            "contractor_id": [f"C{i:05d}" for i in range(n_con)],
+            "company_name": [f"Handwerk {i}" for i in range(n_con)],
+            "specialization": rng.choice(np.array(SPECIALIZATIONS, dtype=object), n_con),
+            "district_served": rng.choice(np.array(DISTRICTS, dtype=object), n_con),
+            "avg_rating": np.round(rng.uniform(2.5, 5.0, n_con), 1),
+            "num_reviews": rng.integers(0, 400, n_con),
+        }
+    )
+    return {
+        "buildings": b,
+        "financials": fin,
+        "energy_consumption": ec,
+        "retrofits": retro,
+        "parameters": params,
+        "contractors": con,
+    }
+
+
+def write_workbook(frames: Dict[str, pd.DataFrame], out: Path) -> None:
+    for name, df in frames.items():
+        if len(df) >= 1_048_576:
+            raise ValueError(f"Sheet {name} has {len(df)} rows, more than Excel allows")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", default="12k", help="Number of buildings or one of 12k, 120k, 1.2m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--energy-months", type=int, default=12)
+    parser.add_argument("--out", type=Path, required=True, help="Output .xlsx path")
+    args = parser.parse_args()
+    n = SCALES.get(str(args.buildings).lower()) or int(args.buildings)
+    frames = generate_frames(n, args.seed, args.energy_months)
+    write_workbook(frames, args.out)
+    print(f"Wrote {args.out} ({n} buildings)")
+
+
+if __name__ == "__main__":
+    main()
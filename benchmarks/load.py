@@ -0,0 +1,132 @@
+"""
+In-process load test: drives the FastAPI app directly over ASGI (no sockets, no HTTP client),
+with a fixed number of concurrent virtual users replaying a mix of the wizard's requests.
+Reports per-endpoint p50/p99 latency, throughput, error counts and peak RSS.
+"""
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from backend.services.address_parser import parse_address
+from backend.services.excel_loader import get_indexes
+
+from benchmarks.micro import summarize
+
+WINDOW_SUB_TYPE = "Window replacement - double glazing"
+
+
+async def asgi_request(
+    app, method: str, path: str, query: Optional[Dict[str, Any]] = None, body: Optional[Any] = None
+) -> Tuple[int, bytes]:
+    """Minimal ASGI client: one http request, returns (status, body)."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"bench")]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def _scenario(rng: random.Random, ids: List[str], rows: Dict[str, Dict[str, Any]]) -> List[Tuple[str, str, str, Any, Any]]:
+    """One wizard session: (label, method, path, query, body) steps."""
+    b = rng.choice(ids)
+    row = rows[b]
+    pc = str(row.get("postal_code") or "").split(".")[0]
+    address = str(row.get("address") or "")
+    street, _ = parse_address(address)
+    return [
+        ("postcodes", "GET", "/addresses/postcodes", {"prefix": pc[:2]}, None),
+        ("streets", "GET", "/addresses/streets", {"postcode": pc, "prefix": street[:2]}, None),
+        ("numbers", "GET", "/addresses/numbers", {"postcode": pc, "street": street}, None),
+        ("building_search", "GET", "/buildings/search", {"postcode": pc, "address": address}, None),
+        ("building", "GET", f"/buildings/{b}", None, None),
+        ("calculator", "POST", "/calculator", None, {"building_id": b, "sub_type_of_retrofit": WINDOW_SUB_TYPE}),
+        ("contractors", "GET", "/contractors", {"specialization": "Windows", "limit": 10}, None),
+    ]
+
+
+def peak_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+async def _run(app, users: int, sessions: int, seed: int) -> Dict[str, Any]:
+    indexes = get_indexes()
+    rows = indexes["buildings"]
+    ids = list(rows)
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    rng = random.Random(seed)
+    for _ in range(sessions):
+        queue.put_nowait(_scenario(rng, ids, rows))
+
+    async def user() -> None:
+        perf = time.perf_counter
+        while not queue.empty():
+            steps = queue.get_nowait()
+            for label, method, path, query, body in steps:
+                t0 = perf()
+                status, _ = await asgi_request(app, method, path, query, body)
+                samples.setdefault(label, []).append(perf() - t0)
+                if status >= 400 and status != 404:
+                    errors[label] = errors.get(label, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    elapsed = time.perf_counter() - start
+    total = sum(len(v) for v in samples.values())
+    return {
+        "users": users,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "errors": errors,
+        "endpoints": {label: summarize(v) for label, v in sorted(samples.items())},
+        "all": summarize([s for v in samples.values() for s in v]),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_load(users: int = 16, sessions: int = 200, seed: int = 0) -> Dict[str, Any]:
+    from backend.main import app
+
+    return asyncio.run(_run(app, users, sessions, seed))
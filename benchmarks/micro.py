@@ -0,0 +1,81 @@
+"""
+Micro-benchmarks for the hot service functions: address parsing, the postcode -> street -> number
+cascade, the calculator (cold and warm result cache) and the building serializer.
+Expects data to be loaded already (see benchmarks.run).
+"""
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from backend.services import address_parser, calculator_service, serializers
+from backend.services.excel_loader import get_indexes
+
+WINDOW_SUB_TYPE = "Window replacement - double glazing"
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p99/mean in microseconds plus ops/s for per-call durations given in seconds."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {"n": 0, "p50_us": 0.0, "p99_us": 0.0, "mean_us": 0.0, "ops_per_s": 0.0}
+    mean = statistics.fmean(ordered)
+    return {
+        "n": n,
+        "p50_us": round(ordered[n // 2] * 1e6, 2),
+        "p99_us": round(ordered[min(n - 1, int(n * 0.99))] * 1e6, 2),
+        "mean_us": round(mean * 1e6, 2),
+        "ops_per_s": round(1.0 / mean, 1) if mean > 0 else 0.0,
+    }
+
+
+def _time_calls(fn: Callable[[Any], Any], args: Sequence[Any]) -> Dict[str, float]:
+    samples: List[float] = []
+    perf = time.perf_counter
+    for a in args:
+        t0 = perf()
+        fn(a)
+        samples.append(perf() - t0)
+    return summarize(samples)
+
+
+def run_micro(iterations: int = 2000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    indexes = get_indexes()
+    rows = indexes["buildings"]
+    ids = list(rows)
+    sample_ids = [rng.choice(ids) for _ in range(iterations)]
+    addresses = [str(rows[b].get("address") or "") for b in sample_ids]
+    addr_index = indexes["addresses"]
+    postcodes = address_parser.get_postcodes(addr_index)
+    cascade = []
+    for b in sample_ids:
+        pc = str(rows[b].get("postal_code") or "").split(".")[0]
+        street, _ = address_parser.parse_address(rows[b].get("address") or "")
+        cascade.append((pc, street))
+
+    def _cascade(args):
+        pc, street = args
+        address_parser.get_streets(addr_index, pc)
+        address_parser.get_streets(addr_index, pc[:3], street[:2])
+        address_parser.get_numbers(addr_index, pc, street)
+
+    results = {
+        "parse_address": _time_calls(address_parser.parse_address, addresses),
+        "address_cascade": _time_calls(_cascade, cascade),
+        "get_postcodes_prefix": _time_calls(
+            lambda p: address_parser.get_postcodes(addr_index, p[:2]), [rng.choice(postcodes) for _ in range(iterations)]
+        ),
+        "row_to_building": _time_calls(lambda b: serializers.row_to_building(rows[b]), sample_ids),
+    }
+    # Cold: fresh cache for every call; warm: the same ids again, now served from the LRU cache
+    calculator_service._results_cache.clear()
+    unique_ids = list(dict.fromkeys(sample_ids))
+    results["run_calculator_cold"] = _time_calls(
+        lambda b: calculator_service.run_calculator(b, WINDOW_SUB_TYPE), unique_ids
+    )
+    results["run_calculator_warm"] = _time_calls(
+        lambda b: calculator_service.run_calculator(b, WINDOW_SUB_TYPE), unique_ids
+    )
+    return results
@@ -0,0 +1,121 @@
+"""
+Benchmark and load-test runner on synthetic data.
+
+    python -m benchmarks.run --scale 12k
+    python -m benchmarks.run --scale 120k --save-baseline bench-120k.json
+    python -m benchmarks.run --scale 120k --baseline bench-120k.json --threshold 0.25
+
+Generates the dataset in memory (benchmarks.generate), publishes it with excel_loader.load_frames,
+then runs the micro-benchmarks and the in-process load test. With --baseline the run exits
+non-zero when any p50/p99 latency regresses by more than --threshold, so it can gate CI.
+Baselines are machine-specific: record them on the machine that compares against them.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.services.excel_loader import get_load_info, load_frames
+
+from benchmarks.generate import SCALES, generate_frames
+from benchmarks.load import peak_rss_bytes, run_load
+from benchmarks.micro import run_micro
+
+# Regressions below this absolute change are noise at microsecond resolution
+MIN_DELTA_US = 5.0
+
+
+def run(scale: str, seed: int, energy_months: int, iterations: int, users: int, sessions: int) -> Dict[str, Any]:
+    n = SCALES.get(scale.lower()) or int(scale)
+    t0 = time.perf_counter()
+    frames = generate_frames(n, seed, energy_months)
+    generate_s = time.perf_counter() - t0
+    load_frames(frames, version=f"bench-{n}-{seed}")
+    del frames
+    info = get_load_info()
+    return {
+        "scale": scale,
+        "buildings": n,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "generate_seconds": round(generate_s, 3),
+        "load": {"seconds": info.get("seconds"), "memory_bytes": info.get("memory_bytes"), "rows": info.get("rows")},
+        "rss_after_load_bytes": peak_rss_bytes(),
+        "micro": run_micro(iterations, seed),
+        "load_test": run_load(users, sessions, seed),
+    }
+
+
+def _latencies(report: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten comparable latency figures: micro.<name>.<p50|p99>, load.<endpoint>.<p50|p99>."""
+    out = {}
+    for name, s in report.get("micro", {}).items():
+        for q in ("p50_us", "p99_us"):
+            out[f"micro.{name}.{q}"] = s[q]
+    for name, s in report.get("load_test", {}).get("endpoints", {}).items():
+        for q in ("p50_us", "p99_us"):
+            out[f"load.{name}.{q}"] = s[q]
+    return out
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Human-readable regressions of current vs baseline (empty if none)."""
+    regressions = []
+    base = _latencies(baseline)
+    for key, value in _latencies(current).items():
+        old = base.get(key)
+        if not old:
+            continue
+        if value > old * (1 + threshold) and value - old > MIN_DELTA_US:
+            regressions.append(f"{key}: {old:.1f}us -> {value:.1f}us (+{(value / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    print(f"scale={report['scale']} buildings={report['buildings']} load={report['load']['seconds']}s "
+          f"rss={report['rss_after_load_bytes'] / 2**20:.0f}MiB")
+    for name, s in report["micro"].items():
+        print(f"  micro {name:<24} p50={s['p50_us']:>10.1f}us p99={s['p99_us']:>10.1f}us {s['ops_per_s']:>12.1f}/s")
+    lt = report["load_test"]
+    print(f"  load  users={lt['users']} requests={lt['requests']} {lt['requests_per_s']}/s errors={lt['errors'] or 0}")
+    for name, s in lt["endpoints"].items():
+        print(f"  load  {name:<24} p50={s['p50_us']:>10.1f}us p99={s['p99_us']:>10.1f}us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="12k", help="12k, 120k, 1.2m or a number of buildings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--energy-months", type=int, default=12)
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per micro-benchmark")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users in the load test")
+    parser.add_argument("--sessions", type=int, default=200, help="Wizard sessions replayed in the load test")
+    parser.add_argument("--baseline", type=Path, help="Compare against this report and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed latency regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", type=Path, help="Write this run's report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.seed, args.energy_months, args.iterations, args.users, args.sessions)
+    _print_summary(report)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved report to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("buildings") != report["buildings"]:
+            print(f"Warning: baseline was recorded with {baseline.get('buildings')} buildings")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -63,43 +63,23 @@ function App() {
 
   useEffect(() => {
     if (step !== 2 || !building?.building_id) return;
-    const wt = (building.window_type || building.WindowType || "").toString().toLowerCase();
-    const options: { subType: string; label: string }[] = [];
-    if (wt.includes("single")) {
-      options.push({ subType: "Window replacement - double glazing", label: "Double Pane" });
-      options.push({ subType: "Window replacement - triple glazing", label: "Triple Pane" });
-    } else if (wt.includes("double")) {
-      options.push({ subType: "Window replacement - triple glazing", label: "Triple Pane" });
-    }
-    if (options.length === 0) {
-      setOptionCards([]);
-      setSelectedOption(null);
-      return;
-    }
-    const overrides = buildOverridesForApi();
-    Promise.all(
-      options.map((opt) =>
-        api.runCalculator({
-          building_id: building.building_id!,
-          sub_type_of_retrofit: opt.subType,
-          overrides,
-        })
-      )
-    )
-      .then((results) => {
+    // One request returns the options for the building's window type and the result for each
+    api
+      .bootstrap({ building_id: building.building_id, overrides: buildOverridesForApi() })
+      .then((r) => {
         setOptionCards(
-          results.map((r, i) => ({
-            subType: options[i].subType,
-            label: options[i].label,
-            savingsPct: r.EnergySavingsPct ?? 0,
-            RetrofitCostTotal: r.RetrofitCostTotal,
-            RetrofitCostTotalAfterSubsidy: r.RetrofitCostTotalAfterSubsidy,
+          r.options.map((opt) => ({
+            subType: opt.sub_type_of_retrofit,
+            label: opt.label,
+            savingsPct: opt.result.EnergySavingsPct ?? 0,
+            RetrofitCostTotal: opt.result.RetrofitCostTotal,
+            RetrofitCostTotalAfterSubsidy: opt.result.RetrofitCostTotalAfterSubsidy,
           }))
         );
         setSelectedOption(null);
       })
       .catch(() => setOptionCards([]));
-  }, [step, building?.building_id, building?.window_type, building?.WindowType, buildOverridesForApi]);
+  }, [step, building?.building_id, buildOverridesForApi]);
 
   const handleCalculateBreakEven = async () => {
     if (!building?.building_id || !selectedOption) return;
@@ -24,11 +24,17 @@ export const api = {
   getStreets: (postcode: string) => get<{ postcode: string; streets: string[] }>(`/addresses/streets?postcode=${encodeURIComponent(postcode)}`),
   getNumbers: (postcode: string, street: string) =>
     get<{ postcode: string; street: string; numbers: string[] }>(`/addresses/numbers?postcode=${encodeURIComponent(postcode)}&street=${encodeURIComponent(street)}`),
+  searchAddresses: (q: string, postcode?: string) =>
+    get<{ q: string; results: AddressMatch[]; truncated: boolean }>(
+      `/addresses/search?q=${encodeURIComponent(q)}${postcode ? `&postcode=${encodeURIComponent(postcode)}` : ""}`
+    ),
   searchBuilding: (postcode: string, address: string) =>
     get<Building>(`/buildings/search?postcode=${encodeURIComponent(postcode)}&address=${encodeURIComponent(address)}`),
   getBuilding: (buildingId: string) => get<Building>(`/buildings/${encodeURIComponent(buildingId)}`),
   runCalculator: (body: { building_id: string; sub_type_of_retrofit: string; overrides?: Record<string, unknown> }) =>
     post<CalculatorResult>("/calculator", body),
+  bootstrap: (body: { building_id?: string; postcode?: string; address?: string; overrides?: Record<string, unknown> }) =>
+    post<WizardBootstrap>("/wizard/bootstrap", body),
   getContractors: (specialization = "window") =>
     get<{ contractors: Contractor[] }>(`/contractors?specialization=${encodeURIComponent(specialization)}`),
 };
@@ -80,6 +86,27 @@ export interface CalculatorResult {
   months_until_break_even?: number;
 }
 
+export interface AddressMatch {
+  building_id: string;
+  address: string;
+  postal_code: string;
+  district?: string;
+  score: number;
+}
+
+export interface WizardOption {
+  sub_type_of_retrofit: string;
+  label: string;
+  result: CalculatorResult;
+}
+
+export interface WizardBootstrap {
+  version: string;
+  building: Building;
+  window_type: string;
+  options: WizardOption[];
+}
+
 export interface Contractor {
   contractor_id?: string;
   company_name?: string;
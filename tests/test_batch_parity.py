@@ -0,0 +1,55 @@
+"""
+POST /calculator/batch (and the export and rankings built on it) must return exactly what
+run_calculator returns, value and JSON type, for every building x option x override set.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from backend.services.calculator_service import run_calculator, run_calculator_batch
+from backend.services.excel_loader import load_frames
+from benchmarks.generate import generate_frames
+
+SUB_TYPES = ["Window replacement - double glazing", "Window replacement - triple glazing"]
+OVERRIDE_SETS = [
+    {},
+    {"EnergyBasis": "median"},
+    {"EnergyBasis": "last_12_months", "RentPerUnit": 0},
+    {"num_units": 0},
+    {"EnergyCostsPerMonth": 0, "RentPerUnit": 500},
+    {"TotalSqm": 5, "WindowToFloorRatio": 0.2, "window_type": "double"},
+]
+
+
+@pytest.fixture(scope="module")
+def building_ids():
+    frames = generate_frames(120, seed=7)
+    buildings = frames["buildings"]
+    # Edge cases: no area, no units, no energy readings
+    buildings["total_area_m2"] = buildings["total_area_m2"].astype(np.float64)
+    buildings.loc[buildings.index[0], "total_area_m2"] = np.nan
+    buildings.loc[buildings.index[1], "num_units"] = 0
+    energy = frames["energy_consumption"]
+    frames["energy_consumption"] = energy[energy["building_id"] != buildings["building_id"].iloc[2]]
+    load_frames(frames, version="test-batch-parity")
+    return buildings["building_id"].astype(str).tolist()
+
+
+def test_batch_matches_run_calculator(building_ids):
+    ids = building_ids + ["NOPE"]
+    results = run_calculator_batch(ids, SUB_TYPES, OVERRIDE_SETS)
+    assert len(results) == len(ids) * len(SUB_TYPES) * len(OVERRIDE_SETS)
+    i = 0
+    for building_id in ids:
+        for sub_type in SUB_TYPES:
+            for n, overrides in enumerate(OVERRIDE_SETS):
+                got = dict(results[i])
+                i += 1
+                assert got.pop("building_id") == building_id
+                assert got.pop("override_set") == n
+                expected = run_calculator(building_id, sub_type, overrides)
+                if "error" in expected:
+                    assert "error" in got
+                else:
+                    assert json.dumps(got) == json.dumps(expected), (building_id, sub_type, overrides)
@@ -0,0 +1,34 @@
+"""The load snapshot must round-trip the frames exactly, without pickle."""
+import numpy as np
+import pandas as pd
+
+from backend.services.columnar import read_frames, write_frames
+from backend.services.excel_loader import _is_snapshot_of
+
+
+def test_round_trip(tmp_path):
+    df = pd.DataFrame(
+        {
+            "n": np.array([1, 2, 3], dtype=np.int16),
+            "x": [1.5, np.nan, 3.0],
+            "t": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+            "c": pd.Categorical(["a", None, "b"]),
+            "s": pd.array(["ä", None, ""], dtype="str"),
+            "o": pd.Series([1, "x", None], dtype=object),
+        }
+    )
+    df.insert(0, "dup", [True, False, True], allow_duplicates=True)
+    df.insert(1, "dup", [0, 1, 2], allow_duplicates=True)
+    path = tmp_path / "snap.npz"
+    write_frames(path, {"a": df, "empty": df.iloc[:0]}, {"sha256": "abc"})
+    frames, meta = read_frames(path)
+    assert meta == {"sha256": "abc"}
+    pd.testing.assert_frame_equal(frames["a"], df)
+    pd.testing.assert_frame_equal(frames["empty"], df.iloc[:0])
+
+
+def test_prune_matches_full_stem():
+    assert _is_snapshot_of("data-0123456789abcdef-v5.npz", "data")
+    assert _is_snapshot_of("data-0123456789abcdef-v4.pkl", "data")
+    assert not _is_snapshot_of("data-2024-0123456789abcdef-v5.npz", "data")
+    assert not _is_snapshot_of("fingerprint.json", "data")
@@ -0,0 +1,22 @@
+"""The streaming xlsx reader must read the same frame as pd.read_excel."""
+import pandas as pd
+from openpyxl import Workbook
+
+from backend.services.ingest import read_frames
+
+
+def test_xlsx_matches_read_excel(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "data"
+    ws.append(["a", "b", "a", None, "a.1", "a"])
+    ws.append(["NA", 1, "x", 1.5, "q", "null"])
+    ws.append(["N/A", 2, "y", None, "r", "ok"])
+    ws.append(["z", None, "null", 3.0, "NULL", "n/a"])
+    path = tmp_path / "book.xlsx"
+    wb.save(path)
+
+    expected = pd.read_excel(path, sheet_name="data")
+    for chunk_rows in (1, 2, 100):
+        got = read_frames(path, ["data"], chunk_rows=chunk_rows)["data"]
+        pd.testing.assert_frame_equal(got, expected)
@@ -0,0 +1,41 @@
+"""The columnar building index must return the same rows as one dict per building, and pickle without per-row objects."""
+import math
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from backend.services.excel_loader import SHEETS
+from backend.services.indexes import _rows_by_id
+from backend.services.row_table import RowTable
+from backend.services.schema import normalize_frames
+from benchmarks.generate import generate_frames
+
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return type(a) is type(b) and a == b
+
+
+def test_rows_match_dicts():
+    frames, _ = normalize_frames(generate_frames(300, seed=5), SHEETS)
+    df = frames["buildings"]
+    df.loc[3, "total_area_m2"] = np.nan
+    df.loc[4, "district"] = np.nan
+    df = pd.concat([df, df.iloc[:2]], ignore_index=True)
+    expected = _rows_by_id(df)
+    table = RowTable.from_frame(df)
+    assert list(table) == list(expected)
+    for key, row in expected.items():
+        got = table[key]
+        assert list(got) == list(row)
+        assert all(_same(row[c], got[c]) for c in row), key
+    assert math.isnan(table.column("district")[4])
+    assert table.get("missing") is None and "missing" not in table
+
+    buffers = []
+    main = pickle.dumps(table, protocol=5, buffer_callback=buffers.append)
+    assert len(main) < 4096
+    restored = pickle.loads(main, buffers=buffers)
+    assert restored[next(iter(expected))] == table[next(iter(expected))]